@@ -1,5 +1,4 @@
 from .suppliers import (
-    SupplierTab,
     get_suppliers_with_balance,
     get_supplier_transactions,
     init_view as init_supplier_view,
@@ -11,3 +10,13 @@ __all__ = [
     "get_supplier_transactions",
     "init_supplier_view",
 ]
+
+
+def __getattr__(name):
+    # Widgets load PySide6; import them on first access only so the
+    # database layer stays usable without Qt.
+    if name == "SupplierTab":
+        from .suppliers import SupplierTab
+
+        return SupplierTab
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional
+
+from PySide6.QtCore import Qt
+from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QWidget
+
+from .db import AccountTotal
+
+
+class AccountTree(QTreeWidget):
+    """Collapsible chart of accounts showing rolled-up balances.
+
+    Rows come from :func:`~MOTEUR.compta.accounting.db.get_account_tree`;
+    each node is placed under the longest other code prefixing its own.
+    The three columns are code, name and balance.
+    """
+
+    def __init__(self, headers: List[str], parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.setColumnCount(3)
+        self.setHeaderLabels(headers)
+        self.setUniformRowHeights(True)
+        self._items: Dict[str, QTreeWidgetItem] = {}
+
+    # ------------------------------------------------------------------
+    def load(self, nodes: Iterable[AccountTotal]) -> None:
+        """Replace the tree with *nodes*, keeping expanded branches open."""
+        expanded = {c for c, item in self._items.items() if item.isExpanded()}
+        self.setUpdatesEnabled(False)
+        try:
+            self.clear()
+            self._items = {}
+            stack: List[QTreeWidgetItem] = []
+            for node in nodes:
+                while stack and not node.code.startswith(stack[-1].text(0)):
+                    stack.pop()
+                item = QTreeWidgetItem(stack[-1] if stack else self)
+                self._fill(item, node)
+                self._items[node.code] = item
+                stack.append(item)
+            for code in expanded:
+                if code in self._items:
+                    self._items[code].setExpanded(True)
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def update_nodes(self, nodes: Iterable[AccountTotal]) -> None:
+        """Repaint *nodes* in place, inserting the ones not shown yet."""
+        self.setUpdatesEnabled(False)
+        try:
+            for node in nodes:  # ordered by code, so parents come first
+                item = self._items.get(node.code)
+                if item is None:
+                    item = self._insert(node.code)
+                self._fill(item, node)
+        finally:
+            self.setUpdatesEnabled(True)
+
+    def selected_code(self) -> Optional[str]:
+        item = self.currentItem()
+        return item.data(0, Qt.UserRole) if item else None
+
+    # ------------------------------------------------------------------
+    def _insert(self, code: str) -> QTreeWidgetItem:
+        parent = None
+        for n in range(len(code) - 1, 0, -1):
+            parent = self._items.get(code[:n])
+            if parent is not None:
+                break
+        count = parent.childCount() if parent else self.topLevelItemCount()
+        child = parent.child if parent else self.topLevelItem
+        codes = [child(i).data(0, Qt.UserRole) for i in range(count)]
+        item = QTreeWidgetItem()
+        index = bisect_left(codes, code)
+        if parent:
+            parent.insertChild(index, item)
+        else:
+            self.insertTopLevelItem(index, item)
+        self._items[code] = item
+        return item
+
+    @staticmethod
+    def _fill(item: QTreeWidgetItem, node: AccountTotal) -> None:
+        item.setText(0, node.code)
+        item.setData(0, Qt.UserRole, node.code)
+        item.setText(1, node.name or "")
+        item.setText(2, f"{node.balance:.2f}")
+        item.setTextAlignment(2, Qt.AlignRight | Qt.AlignVCenter)
+        item.setForeground(2, Qt.darkGreen if node.balance > 0 else Qt.red)
@@ -1,11 +1,24 @@
 from __future__ import annotations
 
+import gzip
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import List
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from ..db import connect
-from ..models import EntryLine
-from ..achats.signals import signals as achat_signals
+from ..columnar import CATEGORY, CENTS, INT, Columns, fetch_columns
+from ..db import (
+    bootstrap,
+    connection,
+    db_cache,
+    db_key,
+    migrate_to_cents,
+    publish_after_commit,
+)
+from ..events import ENTRY_CHANGED, entry_changes
+from ..models import Entry, EntryLine, from_cents, to_cents
 
 SQL_CREATE_SEQUENCES = """
 CREATE TABLE IF NOT EXISTS sequences (
@@ -30,7 +43,9 @@ CREATE TABLE IF NOT EXISTS entries (
     ref TEXT,
     date TEXT NOT NULL,
     memo TEXT,
-    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    purchase_id INTEGER,
+    supplier_id INTEGER
 )"""
 
 SQL_CREATE_LINES = """
@@ -38,10 +53,28 @@ CREATE TABLE IF NOT EXISTS entry_lines (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
     account TEXT NOT NULL,
-    debit REAL NOT NULL DEFAULT 0 CHECK(debit>=0),
-    credit REAL NOT NULL DEFAULT 0 CHECK(credit>=0),
+    debit INTEGER NOT NULL DEFAULT 0 CHECK(debit>=0),
+    credit INTEGER NOT NULL DEFAULT 0 CHECK(credit>=0),
     description TEXT,
-    letter_code TEXT
+    letter_code TEXT,
+    purchase_id INTEGER,
+    supplier_id INTEGER
+)"""
+
+# Third-party links written by the purchase module and copied on every line
+# of the entry.  They are plain columns rather than foreign keys: the ledger
+# exists without the purchase tables, and deleting a purchase unlinks its
+# remaining entries explicitly.
+LINK_COLUMNS = (
+    ("entries", "purchase_id"),
+    ("entries", "supplier_id"),
+    ("entry_lines", "purchase_id"),
+    ("entry_lines", "supplier_id"),
+)
+
+SQL_CREATE_CLOSED_YEARS = """
+CREATE TABLE IF NOT EXISTS closed_years (
+    year INTEGER PRIMARY KEY
 )"""
 
 SQL_CREATE_JOURNALS = """
@@ -50,35 +83,355 @@ CREATE TABLE IF NOT EXISTS journals (
     name TEXT NOT NULL
 )"""
 
+SQL_CREATE_BALANCES = """
+CREATE TABLE IF NOT EXISTS account_balances (
+    account TEXT PRIMARY KEY,
+    debit INTEGER NOT NULL DEFAULT 0,
+    credit INTEGER NOT NULL DEFAULT 0
+)"""
+
+# account_balances holds the running debit/credit totals of every account so
+# that the trial balance reads one row per account instead of every line.
+SQL_BALANCE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_balance_ins
+    AFTER INSERT ON entry_lines
+    BEGIN
+        INSERT INTO account_balances (account, debit, credit)
+        VALUES (NEW.account, NEW.debit, NEW.credit)
+        ON CONFLICT(account) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_balance_del
+    AFTER DELETE ON entry_lines
+    BEGIN
+        UPDATE account_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_balance_upd
+    AFTER UPDATE OF account, debit, credit ON entry_lines
+    BEGIN
+        UPDATE account_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account;
+        INSERT INTO account_balances (account, debit, credit)
+        VALUES (NEW.account, NEW.debit, NEW.credit)
+        ON CONFLICT(account) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+]
+
+SQL_CREATE_PERIOD_BALANCES = """
+CREATE TABLE IF NOT EXISTS account_period_balances (
+    account TEXT NOT NULL,
+    period TEXT NOT NULL,
+    debit INTEGER NOT NULL DEFAULT 0,
+    credit INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, period)
+) WITHOUT ROWID"""
+
+SQL_IDX_PERIOD_BALANCES = (
+    "CREATE INDEX IF NOT EXISTS idx_apb_period "
+    "ON account_period_balances(period, account)"
+)
+
+# Monthly (``YYYY-MM``) debit/credit totals per account.  Line triggers look
+# up the month of their entry; entry triggers move the totals when an entry
+# is deleted (before its lines cascade) or changes month.
+SQL_PERIOD_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_period_ins
+    AFTER INSERT ON entry_lines
+    BEGIN
+        INSERT INTO account_period_balances (account, period, debit, credit)
+        SELECT NEW.account, substr(e.date, 1, 7), NEW.debit, NEW.credit
+        FROM entries e WHERE e.id = NEW.entry_id
+        ON CONFLICT(account, period) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_period_del
+    AFTER DELETE ON entry_lines
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account
+          AND period = (
+              SELECT substr(date, 1, 7) FROM entries WHERE id = OLD.entry_id
+          );
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_period_upd
+    AFTER UPDATE OF account, debit, credit, entry_id ON entry_lines
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account
+          AND period = (
+              SELECT substr(date, 1, 7) FROM entries WHERE id = OLD.entry_id
+          );
+        INSERT INTO account_period_balances (account, period, debit, credit)
+        SELECT NEW.account, substr(e.date, 1, 7), NEW.debit, NEW.credit
+        FROM entries e WHERE e.id = NEW.entry_id
+        ON CONFLICT(account, period) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_entries_period_del
+    BEFORE DELETE ON entries
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - (
+                SELECT IFNULL(SUM(el.debit), 0) FROM entry_lines el
+                WHERE el.entry_id = OLD.id
+                  AND el.account = account_period_balances.account
+            ),
+            credit = credit - (
+                SELECT IFNULL(SUM(el.credit), 0) FROM entry_lines el
+                WHERE el.entry_id = OLD.id
+                  AND el.account = account_period_balances.account
+            )
+        WHERE period = substr(OLD.date, 1, 7)
+          AND account IN (
+              SELECT account FROM entry_lines WHERE entry_id = OLD.id
+          );
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_entries_period_upd
+    AFTER UPDATE OF date ON entries
+    WHEN substr(OLD.date, 1, 7) <> substr(NEW.date, 1, 7)
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - (
+                SELECT IFNULL(SUM(el.debit), 0) FROM entry_lines el
+                WHERE el.entry_id = NEW.id
+                  AND el.account = account_period_balances.account
+            ),
+            credit = credit - (
+                SELECT IFNULL(SUM(el.credit), 0) FROM entry_lines el
+                WHERE el.entry_id = NEW.id
+                  AND el.account = account_period_balances.account
+            )
+        WHERE period = substr(OLD.date, 1, 7)
+          AND account IN (
+              SELECT account FROM entry_lines WHERE entry_id = NEW.id
+          );
+        INSERT INTO account_period_balances (account, period, debit, credit)
+        SELECT account, substr(NEW.date, 1, 7), SUM(debit), SUM(credit)
+        FROM entry_lines WHERE entry_id = NEW.id
+        GROUP BY account
+        ON CONFLICT(account, period) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+]
+
+SQL_REBUILD_PERIOD_BALANCES = (
+    "INSERT INTO account_period_balances (account, period, debit, credit) "
+    "SELECT el.account, substr(e.date, 1, 7), SUM(el.debit), SUM(el.credit) "
+    "FROM entry_lines el JOIN entries e ON e.id = el.entry_id "
+    "GROUP BY el.account, substr(e.date, 1, 7)"
+)
+
+SQL_REBUILD_BALANCES = (
+    "INSERT INTO account_balances (account, debit, credit) "
+    "SELECT account, SUM(debit), SUM(credit) FROM entry_lines "
+    "GROUP BY account"
+)
+
+SQL_CHECK_BALANCES = """
+SELECT account, SUM(stored), SUM(actual) FROM (
+    SELECT account, debit - credit AS stored, 0 AS actual
+    FROM account_balances
+    UNION ALL
+    SELECT account, 0, debit - credit FROM entry_lines
+)
+GROUP BY account
+HAVING SUM(stored) <> SUM(actual)
+ORDER BY account
+"""
+
+# Chart of accounts hierarchy as a closure table.  Following the PCG, an
+# account rolls up into every prefix of its code (606300 -> 60630, 6063, 606,
+# 60, 6), so each code gets one row per prefix, itself included at depth 0.
+# Codes come from both the accounts table and account_balances, since lines
+# may be posted to accounts that were never declared.  A total at any level
+# is then one join on (ancestor) against account_balances.
+SQL_CREATE_CLOSURE = """
+CREATE TABLE IF NOT EXISTS account_closure (
+    ancestor TEXT NOT NULL,
+    descendant TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor, descendant)
+) WITHOUT ROWID"""
+
+SQL_IDX_CLOSURE_DESCENDANT = (
+    "CREATE INDEX IF NOT EXISTS idx_closure_descendant "
+    "ON account_closure(descendant)"
+)
+
+# Triggers cannot use recursive CTEs, so prefixes are generated from a
+# constant list of lengths; codes longer than CLOSURE_MAX_LENGTH only roll up
+# into their first CLOSURE_MAX_LENGTH prefixes.
+CLOSURE_MAX_LENGTH = 20
+_CLOSURE_PREFIXES = (
+    "INSERT OR IGNORE INTO account_closure (ancestor, descendant, depth) "
+    "SELECT substr({code}, 1, n.value), {code}, length({code}) - n.value "
+    "FROM {source}"
+    f"json_each('{list(range(1, CLOSURE_MAX_LENGTH + 1))}') n "
+    "WHERE n.value <= length({code})"
+)
+
+SQL_CLOSURE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_ins
+    AFTER INSERT ON accounts
+    BEGIN
+        {_CLOSURE_PREFIXES.format(code="NEW.code", source="")};
+    END""",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_balances_closure_ins
+    AFTER INSERT ON account_balances
+    BEGIN
+        {_CLOSURE_PREFIXES.format(code="NEW.account", source="")};
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_del
+    AFTER DELETE ON accounts
+    WHEN NOT EXISTS (SELECT 1 FROM account_balances WHERE account = OLD.code)
+    BEGIN
+        DELETE FROM account_closure WHERE descendant = OLD.code;
+    END""",
+]
+
+SQL_REBUILD_CLOSURE = _CLOSURE_PREFIXES.format(
+    code="c.code",
+    source="(SELECT code FROM accounts UNION "
+    "SELECT account FROM account_balances) c, ",
+)
+
+# Levels always shown in the account tree (class, chapter, main account),
+# whether or not an account row declares them.  Deeper prefixes only appear
+# when they are accounts themselves.
+ROLLUP_LEVELS = 3
+
+# ``{where}`` is empty or SQL_TREE_SUBSET; the last parameter is the
+# number of ROLLUP_LEVELS.
+SQL_ACCOUNT_TREE = """
+SELECT c.ancestor, a.name, IFNULL(SUM(b.debit), 0), IFNULL(SUM(b.credit), 0)
+FROM account_closure c
+LEFT JOIN account_balances b ON b.account = c.descendant
+LEFT JOIN accounts a ON a.code = c.ancestor
+{where}
+GROUP BY c.ancestor
+HAVING length(c.ancestor) <= ? OR MIN(c.depth) = 0
+ORDER BY c.ancestor
+"""
+# Nodes above the codes of a JSON array, to refresh them after a posting.
+SQL_TREE_SUBSET = (
+    "WHERE c.ancestor IN (SELECT ancestor FROM account_closure "
+    "WHERE descendant IN (SELECT value FROM json_each(?)))"
+)
+
+SQL_ACCOUNT_ROLLUP = (
+    "SELECT IFNULL(SUM(b.debit), 0), IFNULL(SUM(b.credit), 0) "
+    "FROM account_closure c "
+    "JOIN account_balances b ON b.account = c.descendant "
+    "WHERE c.ancestor = ?"
+)
+
 SQL_INSERT_ENTRY = (
-    "INSERT INTO entries (journal, ref, date, memo) VALUES (?,?,?,?)"
+    "INSERT INTO entries (journal, ref, date, memo, purchase_id, supplier_id)"
+    " VALUES (?,?,?,?,?,?)"
 )
 
 SQL_INSERT_LINE = (
-    "INSERT INTO entry_lines (entry_id, account, debit, credit, description)"
-    " VALUES (?,?,?,?,?)"
+    "INSERT INTO entry_lines (entry_id, account, debit, credit, description,"
+    " purchase_id, supplier_id) VALUES (?,?,?,?,?,?,?)"
 )
 
 SQL_IDX_ENTRIES_DATE = (
     "CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date)"
 )
 
+# Serves lookups by piece alone and by (journal, piece), and covers them
+# since the entry id is the rowid.
 SQL_IDX_ENTRIES_REF = (
-    "CREATE INDEX IF NOT EXISTS idx_entries_ref ON entries(ref)"
+    "CREATE INDEX IF NOT EXISTS idx_entries_ref_journal "
+    "ON entries(ref, journal)"
 )
 
+SQL_IDX_LINES_ENTRY = (
+    "CREATE INDEX IF NOT EXISTS idx_el_entry ON entry_lines(entry_id)"
+)
+
+SQL_IDX_LINES_LETTER = (
+    "CREATE INDEX IF NOT EXISTS idx_el_letter "
+    "ON entry_lines(account, letter_code)"
+)
+
+# Superseded by the indexes above: idx_entries_ref by idx_entries_ref_journal
+# and idx_el_account by the idx_el_letter prefix.
+OBSOLETE_INDEXES = ("idx_entries_ref", "idx_el_account")
+
 SQL_FETCH_LINES = (
     "SELECT account, debit, credit FROM entry_lines WHERE entry_id=?"
 )
 
+SQL_LAST_ENTRY_ID = "SELECT seq FROM sqlite_sequence WHERE name='entries'"
+
+SQL_ENTRY_HEADER = (
+    "SELECT date, ref, memo, purchase_id, supplier_id FROM entries WHERE id=?"
+)
+SQL_UPDATE_ENTRY = "UPDATE entries SET date=?, ref=?, memo=? WHERE id=?"
+SQL_ENTRY_LINE_IDS = (
+    "SELECT id, account, debit, credit, description FROM entry_lines "
+    "WHERE entry_id=? ORDER BY id"
+)
+# A lettered line whose account or amount changes no longer settles its
+# group: the whole group goes back to a partial (lowercase) code, which
+# auto_letter reconsiders.
+SQL_REOPEN_LETTER = (
+    "UPDATE entry_lines SET letter_code=lower(letter_code) "
+    "WHERE account=? AND letter_code=(SELECT letter_code FROM entry_lines WHERE id=?)"
+)
+# A letter code only makes sense on the account it was matched on.
+SQL_UPDATE_LINE = (
+    "UPDATE entry_lines SET account=?, debit=?, credit=?, description=?, "
+    "letter_code=CASE WHEN account=? THEN letter_code END WHERE id=?"
+)
+
+SQL_UNBALANCED_RANGE = (
+    "SELECT entry_id FROM entry_lines WHERE entry_id BETWEEN ? AND ? "
+    "GROUP BY entry_id HAVING SUM(debit) <> SUM(credit) "
+    "LIMIT 1"
+)
+SQL_RANGE_ACCOUNTS = (
+    "SELECT DISTINCT account FROM entry_lines WHERE entry_id BETWEEN ? AND ?"
+)
+
+BULK_CHUNK_SIZE = 5000
+FEC_BATCH_SIZE = 10000
+
 
 def _assert_balanced(conn, entry_id: int) -> None:
     cur = conn.execute(SQL_FETCH_LINES, (entry_id,))
-    debit = credit = 0.0
+    debit = credit = 0
     for _, d, c in cur.fetchall():
         debit += d
         credit += c
-    if round(debit - credit, 2) != 0.0:
+    if debit != credit:
         raise ValueError("Entry not balanced")
 
 
@@ -110,16 +463,139 @@ def next_sequence(conn, journal: str, fiscal_year: int) -> str:
 
 
 def init_db(db_path: Path | str) -> None:
-    """Create tables for accounting entries."""
-    with connect(db_path) as conn:
-        conn.execute(SQL_CREATE_ACCOUNTS)
-        conn.execute(SQL_CREATE_ENTRIES)
-        conn.execute(SQL_CREATE_LINES)
-        conn.execute(SQL_CREATE_SEQUENCES)
-        conn.execute(SQL_CREATE_JOURNALS)
-        conn.execute(SQL_IDX_ENTRIES_DATE)
-        conn.execute(SQL_IDX_ENTRIES_REF)
-        conn.commit()
+    """Create tables for accounting entries (once per process)."""
+    bootstrap(db_path, _create_schema)
+
+
+def _create_schema(conn) -> None:
+    """Create or upgrade the ledger schema within the caller's transaction."""
+    conn.execute(SQL_CREATE_ACCOUNTS)
+    conn.execute(SQL_CREATE_ENTRIES)
+    conn.execute(SQL_CREATE_LINES)
+    migrated = migrate_to_cents(
+        conn, "entry_lines", SQL_CREATE_LINES, ("debit", "credit")
+    )
+    _add_link_columns(conn)
+    conn.execute(SQL_CREATE_SEQUENCES)
+    conn.execute(SQL_CREATE_JOURNALS)
+    conn.execute(SQL_CREATE_CLOSED_YEARS)
+    conn.execute(SQL_IDX_ENTRIES_DATE)
+    conn.execute(SQL_IDX_ENTRIES_REF)
+    conn.execute(SQL_IDX_LINES_ENTRY)
+    conn.execute(SQL_IDX_LINES_LETTER)
+    for name in OBSOLETE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    existing = {
+        r[0]
+        for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name IN "
+            "('account_balances', 'account_period_balances', "
+            "'account_closure')"
+        )
+    }
+    conn.execute(SQL_CREATE_BALANCES)
+    conn.execute(SQL_CREATE_PERIOD_BALANCES)
+    conn.execute(SQL_IDX_PERIOD_BALANCES)
+    conn.execute(SQL_CREATE_CLOSURE)
+    conn.execute(SQL_IDX_CLOSURE_DESCENDANT)
+    triggers = SQL_BALANCE_TRIGGERS + SQL_PERIOD_TRIGGERS + SQL_CLOSURE_TRIGGERS
+    for sql in triggers:
+        conn.execute(sql)
+    balances = {"account_balances", "account_period_balances"}
+    if migrated or not balances <= existing:
+        _rebuild_account_balances(conn)
+    if "account_closure" not in existing:
+        conn.execute(SQL_REBUILD_CLOSURE)
+
+
+def _add_link_columns(conn) -> None:
+    for table, column in LINK_COLUMNS:
+        columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} INTEGER")
+
+
+def _rebuild_account_balances(conn) -> None:
+    conn.execute("DELETE FROM account_balances")
+    conn.execute(SQL_REBUILD_BALANCES)
+    conn.execute("DELETE FROM account_period_balances")
+    conn.execute(SQL_REBUILD_PERIOD_BALANCES)
+
+
+def rebuild_account_balances(db_path: Path | str) -> None:
+    """Recompute the total and monthly balance tables from every line."""
+    with connection(db_path) as conn:
+        _rebuild_account_balances(conn)
+
+
+def rebuild_account_closure(db_path: Path | str) -> None:
+    """Recompute :data:`account_closure` from the known account codes."""
+    with connection(db_path) as conn:
+        conn.execute("DELETE FROM account_closure")
+        conn.execute(SQL_REBUILD_CLOSURE)
+
+
+@dataclass(slots=True)
+class AccountTotal:
+    """Totals of an account and every account below it."""
+
+    code: str
+    name: Optional[str]
+    debit: float
+    credit: float
+    balance: float
+
+
+def _account_total(code: str, name, debit: int, credit: int) -> AccountTotal:
+    return AccountTotal(
+        code, name, from_cents(debit), from_cents(credit),
+        from_cents(debit - credit),
+    )
+
+
+def get_account_rollup(db_path: Path | str, code: str) -> AccountTotal:
+    """Return the totals of *code* rolled up over its sub-accounts.
+
+    *code* may be any prefix of the chart (``"6"``, ``"60"``, ``"601"``).
+    """
+    with connection(db_path) as conn:
+        debit, credit = conn.execute(SQL_ACCOUNT_ROLLUP, (code,)).fetchone()
+        row = conn.execute(
+            "SELECT name FROM accounts WHERE code=?", (code,)
+        ).fetchone()
+    return _account_total(code, row[0] if row else None, debit, credit)
+
+
+def get_account_tree(
+    db_path: Path | str, accounts: Optional[Iterable[str]] = None
+) -> List[AccountTotal]:
+    """Return the rolled-up totals of the chart of accounts, ordered by code.
+
+    Nodes are the first :data:`ROLLUP_LEVELS` prefix levels plus every known
+    account; a node's parent is the longest other node prefixing its code.
+    *accounts* restricts the result to the nodes above those codes, which is
+    what a view needs to refresh after they were posted to.
+    """
+    if accounts is None:
+        sql, params = SQL_ACCOUNT_TREE.format(where=""), (ROLLUP_LEVELS,)
+    else:
+        sql = SQL_ACCOUNT_TREE.format(where=SQL_TREE_SUBSET)
+        params = (json.dumps(sorted(set(accounts))), ROLLUP_LEVELS)
+    with connection(db_path) as conn:
+        return [_account_total(*r) for r in conn.execute(sql, params)]
+
+
+def check_account_balances(db_path: Path | str) -> List[tuple[str, float, float]]:
+    """Return accounts whose stored balance differs from their lines.
+
+    Each item is ``(account, stored_balance, actual_balance)``; an empty list
+    means :data:`account_balances` is consistent.
+    """
+    with connection(db_path) as conn:
+        cur = conn.execute(SQL_CHECK_BALANCES)
+        return [
+            (r[0], from_cents(r[1]), from_cents(r[2])) for r in cur.fetchall()
+        ]
 
 
 def create_entry(
@@ -131,10 +607,8 @@ def create_entry(
     lines: List[EntryLine],
 ) -> int:
     """Create an accounting entry and its lines."""
-    with connect(db_path) as conn:
-        entry_id = _create_entry(conn, journal, date, ref, memo, lines)
-        conn.commit()
-        return entry_id
+    with connection(db_path) as conn:
+        return _create_entry(conn, journal, date, ref, memo, lines)
 
 
 def _create_entry(
@@ -144,8 +618,13 @@ def _create_entry(
     ref: str,
     memo: str,
     lines: List[EntryLine],
+    purchase_id: Optional[int] = None,
+    supplier_id: Optional[int] = None,
 ) -> int:
-    cur = conn.execute(SQL_INSERT_ENTRY, (journal, ref, date, memo))
+    _assert_open_year(conn, date)
+    cur = conn.execute(
+        SQL_INSERT_ENTRY, (journal, ref, date, memo, purchase_id, supplier_id)
+    )
     entry_id = cur.lastrowid
     for line in lines:
         conn.execute(
@@ -153,80 +632,501 @@ def _create_entry(
             (
                 entry_id,
                 line.account,
-                line.debit,
-                line.credit,
+                to_cents(line.debit),
+                to_cents(line.credit),
                 line.description,
+                purchase_id,
+                supplier_id,
             ),
         )
     _assert_balanced(conn, entry_id)
-    achat_signals.entry_changed.emit()
+    publish_after_commit(
+        conn, ENTRY_CHANGED, entry_changes([entry_id], (l.account for l in lines))
+    )
     return entry_id
 
 
+def _update_entry(
+    conn,
+    entry_id: int,
+    date: str,
+    ref: str,
+    memo: str,
+    lines: List[EntryLine],
+) -> None:
+    """Rewrite entry *entry_id* in place so that it holds *lines*.
+
+    New lines are matched with the current ones on their account first,
+    then in order; only the rows that differ are updated, so the entry and
+    line ids are kept, and so are the letter codes of lines whose account
+    and amount do not change; a lettered line that changes reopens its group
+    as partial.  Missing lines are inserted, with the purchase links of the
+    entry, and surplus ones deleted.
+    """
+    header = conn.execute(SQL_ENTRY_HEADER, (entry_id,)).fetchone()
+    if header is None:
+        raise ValueError("Invalid entry id")
+    _assert_open_year(conn, header[0])
+    _assert_open_year(conn, date)
+    wanted = [
+        (line.account, to_cents(line.debit), to_cents(line.credit), line.description)
+        for line in lines
+    ]
+    if sum(w[1] for w in wanted) != sum(w[2] for w in wanted):
+        raise ValueError("Entry not balanced")
+
+    old = conn.execute(SQL_ENTRY_LINE_IDS, (entry_id,)).fetchall()
+    by_account: Dict[str, List[tuple]] = defaultdict(list)
+    for row in old:
+        by_account[row[1]].append(tuple(row))
+    pairs = []
+    unmatched = []
+    for new in wanted:
+        same = by_account.get(new[0])
+        if same:
+            pairs.append((same.pop(0), new))
+        else:
+            unmatched.append(new)
+    matched = {old_row[0] for old_row, _ in pairs}
+    rest = [tuple(r) for r in old if r[0] not in matched]
+    pairs += zip(rest, unmatched)
+
+    accounts = set()
+    for (line_id, *current), new in pairs:
+        if tuple(current[:3]) != new[:3]:
+            conn.execute(SQL_REOPEN_LETTER, (current[0], line_id))
+            conn.execute(SQL_UPDATE_LINE, (*new, new[0], line_id))
+            accounts.update((current[0], new[0]))
+        elif current[3] != new[3]:
+            conn.execute(SQL_UPDATE_LINE, (*new, new[0], line_id))
+    for new in unmatched[len(rest):]:
+        conn.execute(SQL_INSERT_LINE, (entry_id, *new, *header[3:]))
+        accounts.add(new[0])
+    for line_id, account, *_ in rest[len(unmatched):]:
+        conn.execute("DELETE FROM entry_lines WHERE id=?", (line_id,))
+        accounts.add(account)
+
+    if tuple(header[:3]) != (date, ref, memo):
+        conn.execute(SQL_UPDATE_ENTRY, (date, ref, memo, entry_id))
+        # Ledgers show the date and label of every line of the entry.
+        accounts.update(w[0] for w in wanted)
+    if accounts:
+        publish_after_commit(conn, ENTRY_CHANGED, entry_changes([entry_id], accounts))
+
+
+def create_entries_bulk(
+    db_path: Path | str,
+    entries: Iterable[Entry],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[int]:
+    """Insert *entries* in a single transaction and return their ids.
+
+    Entries and lines are written with ``executemany`` in chunks of
+    *chunk_size* entries.  The whole batch is checked for balance with one
+    grouped query and ``entry_changed`` is published once after the commit.
+    """
+    with connection(db_path, profile="bulk", immediate=True) as conn:
+        entry_ids = _create_entries_bulk(conn, entries, chunk_size)
+        accounts = (
+            [
+                r[0]
+                for r in conn.execute(
+                    SQL_RANGE_ACCOUNTS, (entry_ids[0], entry_ids[-1])
+                )
+            ]
+            if entry_ids
+            else []
+        )
+        if entry_ids:
+            publish_after_commit(
+                conn, ENTRY_CHANGED, entry_changes(entry_ids, accounts)
+            )
+    return entry_ids
+
+
+def _create_entries_bulk(
+    conn,
+    entries: Iterable[Entry],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> List[int]:
+    """Insert *entries* within the caller's transaction, without events."""
+    closed = _closed_years(conn)
+    entry_ids: List[int] = []
+    it = iter(entries)
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            break
+        if closed:
+            for e in chunk:
+                if int(e.date[:4]) in closed:
+                    raise ValueError(f"Fiscal year {e.date[:4]} is closed")
+        conn.executemany(
+            SQL_INSERT_ENTRY,
+            [
+                (e.journal, e.ref, e.date, e.memo, e.purchase_id, e.supplier_id)
+                for e in chunk
+            ],
+        )
+        # AUTOINCREMENT hands out consecutive ids while we hold the
+        # write lock, so the chunk ids end at the current sequence.
+        last = conn.execute(SQL_LAST_ENTRY_ID).fetchone()[0]
+        first = last - len(chunk) + 1
+        conn.executemany(
+            SQL_INSERT_LINE,
+            [
+                (
+                    entry_id,
+                    line.account,
+                    to_cents(line.debit),
+                    to_cents(line.credit),
+                    line.description,
+                    e.purchase_id,
+                    e.supplier_id,
+                )
+                for entry_id, e in enumerate(chunk, first)
+                for line in e.lines
+            ],
+        )
+        entry_ids.extend(range(first, last + 1))
+    if entry_ids:
+        row = conn.execute(
+            SQL_UNBALANCED_RANGE, (entry_ids[0], entry_ids[-1])
+        ).fetchone()
+        if row:
+            position = row[0] - entry_ids[0]
+            raise ValueError(f"Entry not balanced (batch position {position})")
+    return entry_ids
+
+
 def entry_balanced(db_path: Path | str, entry_id: int) -> bool:
     """Return True if the entry debits equal credits."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         cur = conn.execute(SQL_FETCH_LINES, (entry_id,))
-        debit = 0.0
-        credit = 0.0
+        debit = 0
+        credit = 0
         for row in cur.fetchall():
             debit += row[1]
             credit += row[2]
-        return round(debit - credit, 2) == 0.0
+        return debit == credit
 
 
-def close_fiscal_year(db_path: Path | str, year: int) -> None:
-    """Placeholder for fiscal year closing logic."""
-    # For demo purposes we only mark the year as closed in a table.
-    with connect(db_path) as conn:
-        conn.execute(
-            (
-                "CREATE TABLE IF NOT EXISTS closed_years "
-                "(year INTEGER PRIMARY KEY)"
-            )
-        )
-        conn.execute(
-            "INSERT OR IGNORE INTO closed_years(year) VALUES (?)",
-            (year,),
-        )
-        conn.commit()
-
-
-def export_fec(db_path: Path | str, year: int, dest: Path) -> None:
-    """Export entries for *year* to a simple FEC-like CSV file."""
-    header = [
-        "JournalCode",
-        "EcritureNum",
-        "EcritureDate",
-        "CompteNum",
-        "Libelle",
-        "Debit",
-        "Credit",
-    ]
-    with connect(db_path) as conn, dest.open("w", encoding="utf-8") as fh:
-        fh.write(";".join(header) + "\n")
-        cur = conn.execute(
-            (
-                "SELECT id, journal, ref, date FROM entries "
-                "WHERE substr(date,1,4)=?"
-            ),
-            (str(year),),
+# Closed fiscal years per database, loaded once and refreshed by
+# close_fiscal_year, so that posting does not query closed_years each time.
+# Closing the database's connections forgets them.
+_CLOSED_YEARS: Dict[str, FrozenSet[int]] = db_cache()
+
+RESULT_PROFIT_ACCOUNT = "120"
+RESULT_LOSS_ACCOUNT = "129"
+CARRY_FORWARD_JOURNAL = "AN"
+
+SQL_CLOSING_BALANCES = (
+    "SELECT account, SUM(debit) - SUM(credit) FROM account_period_balances "
+    "WHERE period BETWEEN ? AND ? AND account >= ? AND account < ? "
+    "GROUP BY account HAVING SUM(debit) <> SUM(credit) ORDER BY account"
+)
+
+SQL_CLOSING_RESULT = (
+    "SELECT IFNULL(SUM(credit) - SUM(debit), 0) FROM account_period_balances "
+    "WHERE period BETWEEN ? AND ? AND account >= ? AND account < ?"
+)
+
+# Accounts the carry-forward cannot place: neither balance sheet nor result.
+SQL_UNCLASSED_BALANCES = (
+    "SELECT account FROM account_period_balances "
+    "WHERE period BETWEEN ? AND ? AND (account < '1' OR account >= '8') "
+    "GROUP BY account HAVING SUM(debit) <> SUM(credit) ORDER BY account"
+)
+
+
+def _closed_years(conn) -> FrozenSet[int]:
+    key = getattr(conn, "db_key", None)
+    years = _CLOSED_YEARS.get(key) if key else None
+    if years is None:
+        years = frozenset(
+            r[0] for r in conn.execute("SELECT year FROM closed_years")
         )
-        for entry_id, journal, ref, date in cur.fetchall():
-            lcur = conn.execute(
-                (
-                    "SELECT account, debit, credit, description FROM "
-                    "entry_lines WHERE entry_id=?"
-                ),
-                (entry_id,),
+        if key:
+            _CLOSED_YEARS[key] = years
+    return years
+
+
+def _assert_open_year(conn, date: str) -> None:
+    if int(date[:4]) in _closed_years(conn):
+        raise ValueError(f"Fiscal year {date[:4]} is closed")
+
+
+def closed_years(db_path: Path | str) -> FrozenSet[int]:
+    """Return the closed fiscal years of *db_path*."""
+    with connection(db_path) as conn:
+        return _closed_years(conn)
+
+
+def close_fiscal_year(db_path: Path | str, year: int) -> Optional[int]:
+    """Close *year* and post its carry-forward (à-nouveaux) entry.
+
+    Balance-sheet accounts (classes 1 to 5) are totalled with one aggregate
+    query per class over the monthly balance snapshots, starting after the
+    previous closed year.  The result of classes 6 and 7 over the same
+    window is allocated to 120 (profit) or 129 (loss).  The ``AN`` entry is
+    dated January 1st of the following year.  Postings into *year* are
+    refused afterwards.  Return the carry-forward entry id, or None if the
+    year was already closed or had nothing to carry forward.
+
+    Years must be closed in order, and no account outside classes 1 to 7
+    may carry a balance over the window: both raise ``ValueError``.
+    """
+    with connection(db_path, immediate=True) as conn:
+        try:
+            closed = _closed_years(conn)
+            if year in closed:
+                return None
+            later = [y for y in closed if y > year]
+            if later:
+                raise ValueError(
+                    f"Fiscal year {max(later)} is already closed, "
+                    f"{year} can no longer be closed"
+                )
+            previous = max(closed, default=None)
+            start = f"{previous + 1:04d}-01" if previous is not None else "0000-01"
+            window = (start, f"{year:04d}-12")
+            unclassed = [r[0] for r in conn.execute(SQL_UNCLASSED_BALANCES, window)]
+            if unclassed:
+                raise ValueError(
+                    "Accounts outside classes 1 to 7 have a balance: "
+                    + ", ".join(unclassed)
+                )
+
+            lines: List[EntryLine] = []
+            for cls in "12345":
+                for account, balance in conn.execute(
+                    SQL_CLOSING_BALANCES, (*window, cls, chr(ord(cls) + 1))
+                ):
+                    lines.append(
+                        EntryLine(
+                            account,
+                            debit=from_cents(max(balance, 0)),
+                            credit=from_cents(max(-balance, 0)),
+                            description="A nouveau",
+                        )
+                    )
+            result = sum(
+                conn.execute(
+                    SQL_CLOSING_RESULT, (*window, cls, chr(ord(cls) + 1))
+                ).fetchone()[0]
+                for cls in "67"
             )
-            line_num = 1
-            for account, debit, credit, desc in lcur.fetchall():
-                fh.write(
-                    f"{journal};{entry_id}-{line_num};{date};{account};"
-                    f"{desc or ref};{debit:.2f};{credit:.2f}\n"
+            if result:
+                account = (
+                    RESULT_PROFIT_ACCOUNT if result > 0 else RESULT_LOSS_ACCOUNT
+                )
+                conn.execute(
+                    "INSERT OR IGNORE INTO accounts(code, name) VALUES (?, ?)",
+                    (account, "Résultat de l'exercice"),
+                )
+                lines.append(
+                    EntryLine(
+                        account,
+                        debit=from_cents(max(-result, 0)),
+                        credit=from_cents(max(result, 0)),
+                        description=f"Résultat {year}",
+                    )
+                )
+
+            entry_id = None
+            if lines:
+                conn.execute(
+                    "INSERT OR IGNORE INTO journals(code, name) VALUES (?, ?)",
+                    (CARRY_FORWARD_JOURNAL, "A nouveaux"),
+                )
+                entry_id = _create_entries_bulk(
+                    conn,
+                    [
+                        Entry(
+                            CARRY_FORWARD_JOURNAL,
+                            f"{year + 1:04d}-01-01",
+                            f"AN{year + 1}",
+                            f"A nouveaux {year + 1}",
+                            lines,
+                        )
+                    ],
+                )[0]
+            conn.execute("INSERT INTO closed_years(year) VALUES (?)", (year,))
+            if entry_id is not None:
+                publish_after_commit(
+                    conn,
+                    ENTRY_CHANGED,
+                    entry_changes([entry_id], (l.account for l in lines)),
                 )
-                line_num += 1
+        finally:
+            _CLOSED_YEARS.pop(db_key(db_path), None)
+    return entry_id
+
+
+FEC_HEADER = [
+    "JournalCode",
+    "JournalLib",
+    "EcritureNum",
+    "EcritureDate",
+    "CompteNum",
+    "CompteLib",
+    "CompAuxNum",
+    "CompAuxLib",
+    "PieceRef",
+    "PieceDate",
+    "EcritureLib",
+    "Debit",
+    "Credit",
+    "EcritureLet",
+    "DateLet",
+    "ValidDate",
+    "Montantdevise",
+    "Idevise",
+]
+
+SQL_FEC_LINES = """
+SELECT e.journal, j.name, e.id, e.date, el.account, a.name, e.ref,
+       COALESCE(el.description, e.memo, e.ref), el.debit, el.credit,
+       el.letter_code,
+       CASE WHEN el.letter_code IS NOT NULL THEN (
+           SELECT MAX(e2.date) FROM entry_lines l2
+           JOIN entries e2 ON e2.id = l2.entry_id
+           WHERE l2.account = el.account AND l2.letter_code = el.letter_code
+       ) END,
+       substr(IFNULL(e.created_at, e.date), 1, 10), el.supplier_id
+FROM entries e
+JOIN entry_lines el ON el.entry_id = e.id
+LEFT JOIN journals j ON j.code = e.journal
+LEFT JOIN accounts a ON a.code = el.account
+WHERE e.date BETWEEN ? AND ?
+ORDER BY e.date, e.id, el.id
+"""
+
+SQL_LEDGER_COLUMNS = """
+SELECT e.id, e.date, e.journal, el.account, el.debit, el.credit
+FROM entries e
+JOIN entry_lines el ON el.entry_id = e.id
+WHERE e.date BETWEEN ? AND ?
+ORDER BY e.date, e.id, el.id
+"""
+
+LEDGER_COLUMNS = (
+    ("entry_id", INT),
+    ("date", CATEGORY),
+    ("journal", CATEGORY),
+    ("account", CATEGORY),
+    ("debit", CENTS),
+    ("credit", CENTS),
+)
+
+# Separators and line breaks are not allowed inside FEC fields.
+_FEC_CLEAN = str.maketrans({"\t": " ", "|": " ", "\n": " ", "\r": " "})
+
+
+def _supplier_names(conn) -> Dict[int, str]:
+    """Return supplier names by id; empty when the ledger has no suppliers."""
+    if not conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='suppliers'"
+    ).fetchone():
+        return {}
+    return {r[0]: r[1] for r in conn.execute("SELECT id, name FROM suppliers")}
+
+
+def _fec_lines(rows, sep: str, suppliers: Dict[int, str]):
+    """Yield FEC lines for rows of :data:`SQL_FEC_LINES`.
+
+    The auxiliary account columns name the supplier on third-party lines.
+    """
+    for (
+        journal, journal_name, entry_id, date, account, account_name,
+        ref, label, debit, credit, letter, lettered, created, supplier_id,
+    ) in rows:
+        day = date.replace("-", "")
+        ref = (ref or "").translate(_FEC_CLEAN)
+        aux = supplier_id is not None and account.startswith(THIRD_PARTY_ACCOUNTS)
+        yield sep.join(
+            (
+                journal,
+                (journal_name or "").translate(_FEC_CLEAN),
+                str(entry_id),
+                day,
+                account,
+                (account_name or "").translate(_FEC_CLEAN),
+                str(supplier_id) if aux else "",
+                suppliers.get(supplier_id, "").translate(_FEC_CLEAN) if aux else "",
+                ref,
+                day,
+                (label or "").translate(_FEC_CLEAN),
+                f"{debit // 100},{debit % 100:02d}",
+                f"{credit // 100},{credit % 100:02d}",
+                letter or "",
+                lettered.replace("-", "") if lettered else "",
+                created.replace("-", ""),
+                "",
+                "",
+            )
+        ) + "\n"
+
+
+def get_ledger_columns(
+    db_path: Path | str, start: str = "0000-01-01", end: str = "9999-12-31"
+) -> Columns:
+    """Return the lines dated *start* to *end* as :data:`LEDGER_COLUMNS`.
+
+    Amounts stay in cents; dates, journals and accounts are dictionary
+    encoded, so a million lines take a few integer arrays rather than a
+    million row objects.
+    """
+    with connection(db_path, profile="bulk") as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(SQL_LEDGER_COLUMNS, (start, end))
+        return fetch_columns(cur, LEDGER_COLUMNS, FEC_BATCH_SIZE)
+
+
+def export_fec(
+    db_path: Path | str,
+    year: int,
+    dest: Path,
+    sep: str = "\t",
+    compress: bool | None = None,
+) -> int:
+    """Export entries for *year* as a Fichier des Écritures Comptables.
+
+    The 18 regulatory columns are produced by one ordered query over the
+    year's date range and streamed to *dest* in batches.  Supplier lines
+    carry the supplier id and name as auxiliary account, and lettered lines
+    the date of the latest line of their letter group.  *sep* is a tab or
+    ``|``.  The file is gzip-compressed when *compress* is true, or when it
+    is ``None`` and *dest* ends with ``.gz``.  *dest* is only created once
+    the query runs.  Return the number of lines written.
+    """
+    if sep not in ("\t", "|"):
+        raise ValueError("FEC separator must be a tab or '|'")
+    dest = Path(dest)
+    if compress is None:
+        compress = dest.suffix == ".gz"
+    count = 0
+    with connection(db_path, profile="bulk") as conn:
+        suppliers = _supplier_names(conn)
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(SQL_FEC_LINES, (f"{year}-01-01", f"{year}-12-31"))
+        if compress:
+            fh = gzip.open(
+                dest, "wt", compresslevel=6, encoding="utf-8", newline=""
+            )
+        else:
+            fh = dest.open("w", encoding="utf-8", newline="", buffering=1 << 20)
+        with fh:
+            fh.write(sep.join(FEC_HEADER) + "\n")
+            while True:
+                rows = cur.fetchmany(FEC_BATCH_SIZE)
+                if not rows:
+                    break
+                fh.write("".join(_fec_lines(rows, sep, suppliers)))
+                count += len(rows)
+    return count
 
 
 def apply_letter(db_path: Path | str, code: str, entry_ids: list[int]) -> None:
@@ -234,7 +1134,7 @@ def apply_letter(db_path: Path | str, code: str, entry_ids: list[int]) -> None:
     if not entry_ids:
         return
     qmarks = ",".join("?" for _ in entry_ids)
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute(
             (
                 "UPDATE entry_lines SET letter_code=? WHERE entry_id "
@@ -242,7 +1142,129 @@ def apply_letter(db_path: Path | str, code: str, entry_ids: list[int]) -> None:
             ),
             [code, *entry_ids],
         )
-        conn.commit()
+
+
+THIRD_PARTY_ACCOUNTS = ("401", "408", "4091")
+
+# Both are formatted with one placeholder per account.
+SQL_LETTER_CODES = (
+    "SELECT DISTINCT letter_code FROM entry_lines "
+    "WHERE account IN ({qmarks}) AND letter_code IS NOT NULL"
+)
+SQL_OPEN_LINES = (
+    "SELECT el.id, el.account, e.ref, el.debit, el.credit, "
+    "el.letter_code, el.supplier_id FROM entry_lines el "
+    "JOIN entries e ON e.id = el.entry_id "
+    "WHERE el.account IN ({qmarks}) AND (el.letter_code IS NULL "
+    "OR el.letter_code GLOB '[a-z]*') ORDER BY el.id"
+)
+
+
+@dataclass(slots=True)
+class LetteringResult:
+    """Outcome of :func:`auto_letter`."""
+
+    full: int = 0
+    partial: int = 0
+    lines: int = 0
+
+
+def _letter_code(n: int) -> str:
+    """Return the *n*-th letter code (1 -> ``A``, 27 -> ``AA``)."""
+    code = ""
+    while n:
+        n, rem = divmod(n - 1, 26)
+        code = chr(65 + rem) + code
+    return code
+
+
+def _letter_index(code: str) -> int:
+    """Inverse of :func:`_letter_code`; 0 for codes it did not produce."""
+    n = 0
+    for ch in code.upper():
+        if not "A" <= ch <= "Z":
+            return 0
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def auto_letter(
+    db_path: Path | str,
+    accounts: Iterable[str] = THIRD_PARTY_ACCOUNTS,
+) -> LetteringResult:
+    """Letter the open lines of third-party *accounts* in one transaction.
+
+    Unlettered and partially lettered lines are grouped by account, supplier
+    and piece reference, so that two suppliers sharing a collective account
+    never settle each other's pieces.  Groups whose debits equal their
+    credits receive the next uppercase code; groups holding both debits and
+    credits that do not balance receive a lowercase (partial) code and are
+    reconsidered on the next run.  Remaining one-sided lines are then paired
+    by account, supplier and amount.
+    """
+    accounts = tuple(accounts)
+    if not accounts:
+        return LetteringResult()
+    qmarks = ",".join("?" for _ in accounts)
+    result = LetteringResult()
+    with connection(db_path, immediate=True) as conn:
+        last = 0
+        for (code,) in conn.execute(
+            SQL_LETTER_CODES.format(qmarks=qmarks), accounts
+        ):
+            last = max(last, _letter_index(code))
+        rows = conn.execute(
+            SQL_OPEN_LINES.format(qmarks=qmarks), accounts
+        ).fetchall()
+
+        groups: Dict[Tuple[str, Optional[int], str], list] = defaultdict(list)
+        for row in rows:
+            groups[(row[1], row[6], row[2] or "")].append(row)
+        updates: List[Tuple[str, int]] = []
+        one_sided: list = []
+        for lines in groups.values():
+            has_debit = any(r[3] for r in lines)
+            has_credit = any(r[4] for r in lines)
+            if not (has_debit and has_credit):
+                one_sided.extend(lines)
+                continue
+            if sum(r[3] - r[4] for r in lines) == 0:
+                last += 1
+                code = _letter_code(last)
+                result.full += 1
+            else:
+                codes = {r[5] for r in lines}
+                if len(codes) == 1 and None not in codes:
+                    continue
+                code = next((c for c in codes if c), None)
+                if code is None:
+                    last += 1
+                    code = _letter_code(last).lower()
+                result.partial += 1
+            updates.extend((code, r[0]) for r in lines)
+
+        credits: Dict[Tuple[str, Optional[int], int], List[int]] = defaultdict(list)
+        for r in one_sided:
+            if r[4] and r[5] is None:
+                credits[(r[1], r[6], r[4])].append(r[0])
+        for r in one_sided:
+            if not r[3] or r[5] is not None:
+                continue
+            match = credits.get((r[1], r[6], r[3]))
+            if match:
+                last += 1
+                code = _letter_code(last)
+                updates.append((code, match.pop(0)))
+                updates.append((code, r[0]))
+                result.full += 1
+
+        conn.executemany(
+            "UPDATE entry_lines SET letter_code=? WHERE id=?", updates
+        )
+        if updates:
+            publish_after_commit(conn, ENTRY_CHANGED, entry_changes((), accounts))
+    result.lines = len(updates)
+    return result
 
 
 def add_account(
@@ -252,12 +1274,11 @@ def add_account(
     parent_code: str | None = None,
 ) -> None:
     """Insert or replace an account."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute(
             "INSERT OR REPLACE INTO accounts(code, name, parent_code) VALUES (?,?,?)",
             (code, name, parent_code),
         )
-        conn.commit()
 
 
 def update_account(
@@ -267,24 +1288,22 @@ def update_account(
     parent_code: str | None = None,
 ) -> None:
     """Update the *name* or *parent_code* of an account."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute(
             "UPDATE accounts SET name=?, parent_code=? WHERE code=?",
             (name, parent_code, code),
         )
-        conn.commit()
 
 
 def delete_account(db_path: Path | str, code: str) -> None:
     """Remove account with given *code*."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute("DELETE FROM accounts WHERE code=?", (code,))
-        conn.commit()
 
 
 def fetch_accounts(db_path: Path | str, prefix: str | None = None):
     """Return all accounts, optionally filtered by *prefix*."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         if prefix:
             cur = conn.execute(
                 "SELECT code, name FROM accounts WHERE code LIKE ? ORDER BY code",
@@ -300,34 +1319,31 @@ def fetch_accounts(db_path: Path | str, prefix: str | None = None):
 
 def add_journal(db_path: Path | str, code: str, name: str) -> None:
     """Insert or replace a journal."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute(
             "INSERT OR REPLACE INTO journals(code, name) VALUES (?, ?)",
             (code, name),
         )
-        conn.commit()
 
 
 def update_journal(db_path: Path | str, code: str, name: str) -> None:
     """Update the *name* of a journal."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute(
             "UPDATE journals SET name=? WHERE code=?",
             (name, code),
         )
-        conn.commit()
 
 
 def delete_journal(db_path: Path | str, code: str) -> None:
     """Delete journal with *code*."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         conn.execute("DELETE FROM journals WHERE code=?", (code,))
-        conn.commit()
 
 
 def fetch_journals(db_path: Path | str):
     """Return list of journals as (code, name)."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         cur = conn.execute(
             "SELECT code, name FROM journals ORDER BY code"
         )
@@ -11,17 +11,17 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTreeWidgetItem,
     QMessageBox,
 )
 
+from .account_tree import AccountTree
 from .db import (
     init_db,
     add_account,
     update_account,
     delete_account,
-    fetch_accounts,
+    get_account_tree,
 )
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -61,34 +61,19 @@ class AccountWidget(QWidget):
         btn_layout.addWidget(self.del_btn)
         layout.addLayout(btn_layout)
 
-        self.table = QTableWidget(0, 2)
-        self.table.setHorizontalHeaderLabels(["Numéro", "Libellé"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.cellClicked.connect(self.fill_fields_from_row)
-        layout.addWidget(self.table)
+        self.tree = AccountTree(["Numéro", "Libellé", "Solde"])
+        self.tree.itemClicked.connect(self.fill_fields_from_item)
+        layout.addWidget(self.tree)
 
         self.load_accounts()
 
     # ------------------------------------------------------------------
     def get_selected_code(self) -> str | None:
-        row = self.table.currentRow()
-        if row < 0:
-            return None
-        item = self.table.item(row, 0)
-        if not item:
-            return None
-        return item.text()
+        return self.tree.selected_code()
 
     # ------------------------------------------------------------------
     def load_accounts(self) -> None:
-        self.table.setRowCount(0)
-        for code, name in fetch_accounts(db_path):
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            self.table.setItem(row, 0, QTableWidgetItem(code))
-            self.table.setItem(row, 1, QTableWidgetItem(name))
+        self.tree.load(get_account_tree(db_path))
         self.code_edit.clear()
         self.name_edit.clear()
 
@@ -131,13 +116,10 @@ class AccountWidget(QWidget):
         self.account_changed()
 
     # ------------------------------------------------------------------
-    @Slot(int, int)
-    def fill_fields_from_row(self, row: int, column: int) -> None:
-        item_code = self.table.item(row, 0)
-        item_name = self.table.item(row, 1)
-        if item_code and item_name:
-            self.code_edit.setText(item_code.text())
-            self.name_edit.setText(item_name.text())
+    @Slot(QTreeWidgetItem, int)
+    def fill_fields_from_item(self, item: QTreeWidgetItem, column: int) -> None:
+        self.code_edit.setText(item.text(0))
+        self.name_edit.setText(item.text(1))
 
     # Signal used to notify other widgets that the accounts have changed
     def account_changed(self) -> None:
@@ -1,16 +1,36 @@
 from __future__ import annotations
 
+import json
+from dataclasses import fields
 from pathlib import Path
-from typing import List
-
-from .signals import signals
-
-from ..db import connect
-from ..models import EntryLine, Purchase, PurchaseFilter, VatLine
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+from ..db import bootstrap, connection, migrate_to_cents, publish_after_commit
+from ..events import (
+    ENTRY_CHANGED,
+    SUPPLIER_CHANGED,
+    entry_changes,
+    supplier_changes,
+)
+from ..models import (
+    DuePurchase,
+    Entry,
+    EntryLine,
+    PaymentRun,
+    Purchase,
+    PurchaseCursor,
+    PurchaseFilter,
+    PurchasePage,
+    VatLine,
+    from_cents,
+    to_cents,
+)
 
 from ..accounting.db import (
+    _create_entries_bulk,
     _create_entry,
-    init_db as init_accounting,
+    _create_schema as _create_accounting_schema,
+    _update_entry,
     next_sequence,
 )
 
@@ -23,7 +43,7 @@ def _ensure_account(conn, code: str) -> None:
 
 
 def _insert_supplier(conn, name: str) -> int:
-    """Insert a supplier and return its id without emitting signals."""
+    """Insert a supplier and return its id without publishing events."""
     cur = conn.execute("INSERT INTO suppliers(name) VALUES (?)", (name,))
     return cur.lastrowid
 
@@ -44,7 +64,7 @@ CREATE TABLE IF NOT EXISTS purchases (
     piece TEXT NOT NULL,
     supplier_id INTEGER NOT NULL REFERENCES suppliers(id),
     label TEXT NOT NULL,
-    ttc_amount REAL NOT NULL CHECK(ttc_amount >= 0),
+    ttc_amount INTEGER NOT NULL CHECK(ttc_amount >= 0),
     vat_rate REAL NOT NULL CHECK(vat_rate IN (0,2.1,5.5,10,20)),
     account_code TEXT NOT NULL REFERENCES accounts(code),
     due_date TEXT NOT NULL,
@@ -57,20 +77,179 @@ CREATE TABLE IF NOT EXISTS purchases (
     is_invoice_received INTEGER DEFAULT 1 CHECK(is_invoice_received IN (0,1)),
     attachment_path TEXT,
     created_by TEXT,
-    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    paid_amount INTEGER NOT NULL DEFAULT 0
+)"""
+
+# One row per payment, with the bank entry that records it.
+SQL_CREATE_PAYMENTS = """
+CREATE TABLE IF NOT EXISTS purchase_payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    purchase_id INTEGER NOT NULL REFERENCES purchases(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    method TEXT,
+    amount INTEGER NOT NULL CHECK(amount >= 0),
+    entry_id INTEGER REFERENCES entries(id) ON DELETE CASCADE
 )"""
 
+SQL_PAYMENT_INDEXES = [
+    (
+        "CREATE INDEX IF NOT EXISTS idx_payments_purchase "
+        "ON purchase_payments(purchase_id, date)"
+    ),
+    # Lets SQLite check the foreign key when an entry is deleted.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_payments_entry "
+        "ON purchase_payments(entry_id)"
+    ),
+    # Payments after a date, for the aged payables of a past day.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_payments_date "
+        "ON purchase_payments(date)"
+    ),
+]
+
+# purchases.paid_amount and the payment status follow purchase_payments.
+SQL_PAYMENT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payments_ins
+    AFTER INSERT ON purchase_payments
+    BEGIN
+        UPDATE purchases SET
+            paid_amount = paid_amount + NEW.amount,
+            payment_status = CASE
+                WHEN paid_amount + NEW.amount >= ttc_amount THEN 'PAYE'
+                ELSE 'PARTIEL' END,
+            payment_date = NEW.date,
+            payment_method = NEW.method
+        WHERE id = NEW.purchase_id;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payments_del
+    AFTER DELETE ON purchase_payments
+    BEGIN
+        UPDATE purchases SET
+            paid_amount = paid_amount - OLD.amount,
+            payment_status = CASE
+                WHEN paid_amount - OLD.amount <= 0 THEN 'A_PAYER'
+                WHEN paid_amount - OLD.amount >= ttc_amount THEN 'PAYE'
+                ELSE 'PARTIEL' END
+        WHERE id = OLD.purchase_id;
+    END""",
+]
+
+# Payments made before purchase_payments existed: one per bank entry linked
+# to a purchase, for the third-party amount it settled.
+SQL_BACKFILL_PAYMENTS = """
+INSERT INTO purchase_payments (purchase_id, date, method, amount, entry_id)
+SELECT e.purchase_id, e.date, p.payment_method, SUM(el.debit), e.id
+FROM entries e
+JOIN purchases p ON p.id = e.purchase_id
+JOIN entry_lines el ON el.entry_id = e.id
+WHERE e.journal = 'BQ' AND e.purchase_id IS NOT NULL
+  AND el.account IN ('401','408','4091')
+GROUP BY e.id
+ORDER BY e.id
+"""
+
+SQL_INSERT_PAYMENT = (
+    "INSERT INTO purchase_payments (purchase_id, date, method, amount, entry_id)"
+    " VALUES (?,?,?,?,?)"
+)
+
+# Purchases due by a date with their remaining amount, served by the partial
+# idx_purchases_due.  ``{where}`` is empty or SQL_WHERE_SUPPLIERS.
+SQL_DUE_PURCHASES = """
+SELECT id, supplier_id, piece, due_date, ttc_amount - paid_amount,
+       is_advance, is_invoice_received
+FROM purchases
+WHERE payment_status IN ('A_PAYER','PARTIEL') AND due_date <= ?
+  AND ttc_amount > paid_amount {where}
+ORDER BY due_date, id
+"""
+SQL_WHERE_SUPPLIERS = "AND supplier_id IN (SELECT value FROM json_each(?))"
+
+# Purchase listings select explicit columns (those of the Purchase model by
+# default) and page through the (date, id) order: each filter index below
+# holds the rowid after the date, so a page is one index range however far
+# into the listing it starts.
+PURCHASE_COLUMNS = tuple(f.name for f in fields(Purchase))
+AMOUNT_COLUMNS = ("ttc_amount", "paid_amount")
+LIST_COLUMNS = ("id", "date", "label", "ttc_amount", "due_date", "payment_status")
+PURCHASE_PAGE_SIZE = 500
+
 SQL_CREATE_INDEXES = [
     (
         "CREATE UNIQUE INDEX IF NOT EXISTS unq_supplier_piece "
         "ON purchases(supplier_id, piece)"
     ),
     "CREATE INDEX IF NOT EXISTS idx_purchases_date ON purchases(date)",
+    # Filters of fetch_purchases, each returning rows already in date order.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_purchases_supplier_date "
+        "ON purchases(supplier_id, date)"
+    ),
     (
-        "CREATE INDEX IF NOT EXISTS idx_purchases_supplier "
-        "ON purchases(supplier_id)"
+        "CREATE INDEX IF NOT EXISTS idx_purchases_status_date "
+        "ON purchases(payment_status, date)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_purchases_due ON purchases(due_date) "
+        "WHERE payment_status IN ('A_PAYER','PARTIEL')"
     ),
 ]
+# Superseded by idx_purchases_supplier_date.
+OBSOLETE_INDEXES = ("idx_purchases_supplier",)
+
+# Entries and lines carry the purchase and supplier they belong to.  The
+# indexes are partial: journal entries unrelated to purchases stay out of
+# them and cost nothing more to insert.
+SQL_LINK_INDEXES = [
+    (
+        "CREATE INDEX IF NOT EXISTS idx_entries_purchase "
+        "ON entries(purchase_id) WHERE purchase_id IS NOT NULL"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_el_purchase "
+        "ON entry_lines(purchase_id) WHERE purchase_id IS NOT NULL"
+    ),
+    # Covers the supplier balances and transactions.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_el_supplier "
+        "ON entry_lines(supplier_id, account, debit, credit) "
+        "WHERE supplier_id IS NOT NULL"
+    ),
+]
+
+# Links of the entries written before the columns existed, found as before
+# by matching their reference with a piece; a piece shared by several
+# suppliers goes to its first purchase.
+SQL_LINK_ENTRIES = """
+UPDATE entries SET purchase_id = p.id, supplier_id = p.supplier_id
+FROM (SELECT MIN(id) AS id FROM purchases GROUP BY piece) m
+JOIN purchases p ON p.id = m.id
+WHERE p.piece = entries.ref AND entries.purchase_id IS NULL
+"""
+SQL_LINK_LINES = """
+UPDATE entry_lines SET purchase_id = e.purchase_id, supplier_id = e.supplier_id
+FROM entries e
+WHERE e.id = entry_lines.entry_id AND e.purchase_id IS NOT NULL
+  AND entry_lines.purchase_id IS NULL
+"""
+
+SQL_PURCHASE_ENTRY = (
+    "SELECT id FROM entries WHERE purchase_id=? AND journal='ACH'"
+)
+
+SQL_RELINK_ENTRIES = "UPDATE entries SET supplier_id=? WHERE purchase_id=?"
+SQL_RELINK_LINES = "UPDATE entry_lines SET supplier_id=? WHERE purchase_id=?"
+SQL_UNLINK_ENTRIES = (
+    "UPDATE entries SET purchase_id=NULL, supplier_id=NULL WHERE purchase_id=?"
+)
+SQL_UNLINK_LINES = (
+    "UPDATE entry_lines SET purchase_id=NULL, supplier_id=NULL "
+    "WHERE purchase_id=?"
+)
 
 
 SQL_INSERT_PURCHASE = """
@@ -82,23 +261,61 @@ SQL_INSERT_PURCHASE = """
     ) VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
     """
 
+# Payment fields belong to purchase_payments and its triggers: an edit only
+# re-derives the status from the amount already paid and the new total.
 SQL_UPDATE_PURCHASE = """
     UPDATE purchases SET
         date=?, piece=?, supplier_id=?, label=?, ttc_amount=?,
-        vat_rate=?, account_code=?, due_date=?,
-        payment_status=?, payment_date=?, payment_method=?, is_advance=?,
+        vat_rate=?, account_code=?, due_date=?, is_advance=?,
         is_invoice_received=?, attachment_path=?, updated_at=CURRENT_TIMESTAMP
     WHERE id=?
     """
+SQL_PAYMENT_STATUS = """
+    UPDATE purchases SET payment_status = CASE
+        WHEN paid_amount <= 0 THEN 'A_PAYER'
+        WHEN paid_amount >= ttc_amount THEN 'PAYE'
+        ELSE 'PARTIEL' END
+    WHERE id=?
+    """
+
+# HT amount in cents rounded half up with integer arithmetic only:
+# ttc * 1000 / (1000 + rate * 10), the rate having at most one decimal.
+SQL_HT_CENTS = (
+    "((ttc_amount * 2000 + 1000 + CAST(ROUND(vat_rate * 10) AS INTEGER)) "
+    "/ (2 * (1000 + CAST(ROUND(vat_rate * 10) AS INTEGER))))"
+)
 
 SQL_VAT_SUMMARY = (
     "SELECT vat_rate, "
-    "SUM(ROUND(ttc_amount/(1+vat_rate/100),2)) as base, "
-    "SUM(ttc_amount - ROUND(ttc_amount/(1+vat_rate/100),2)) as vat "
+    f"SUM({SQL_HT_CENTS}) as base, "
+    f"SUM(ttc_amount - {SQL_HT_CENTS}) as vat "
     "FROM purchases WHERE date BETWEEN ? AND ? GROUP BY vat_rate"
 )
 
 
+def _split_ttc(ttc_cents: int, vat_rate: float) -> tuple[int, int]:
+    """Return the (HT, VAT) cents of *ttc_cents*, matching SQL_HT_CENTS."""
+    rate = 1000 + round(vat_rate * 10)
+    ht = (ttc_cents * 2000 + rate) // (2 * rate)
+    return ht, ttc_cents - ht
+
+
+def _credit_account(is_advance: int, is_invoice_received: int) -> str:
+    """Return the third-party account of a purchase."""
+    return "4091" if is_advance else ("408" if not is_invoice_received else "401")
+
+
+def _purchase_lines(pur: Purchase, ttc: int, ht: int, vat: int) -> List[EntryLine]:
+    """Return the ``ACH`` entry lines of *pur* from its cent amounts."""
+    credit_account = _credit_account(pur.is_advance, pur.is_invoice_received)
+    vat_account = "44562" if pur.account_code.startswith("2") else "44566"
+    return [
+        EntryLine(account=pur.account_code, debit=from_cents(ht), credit=0.0),
+        EntryLine(account=vat_account, debit=from_cents(vat), credit=0.0),
+        EntryLine(account=credit_account, debit=0.0, credit=from_cents(ttc)),
+    ]
+
+
 def _column_exists(conn, table: str, column: str) -> bool:
     """Return True if *column* exists in *table*."""
     cur = conn.execute(f"PRAGMA table_info({table})")
@@ -135,15 +352,46 @@ def _migrate_schema(conn) -> None:
 
 
 def init_db(db_path: Path | str) -> None:
-    """Create purchase related tables and migrate old schema if needed."""
-    init_accounting(db_path)
-    with connect(db_path) as conn:
-        conn.execute(SQL_CREATE_SUPPLIERS)
-        conn.execute(SQL_CREATE_PURCHASES)
-        _migrate_schema(conn)
-        for sql in SQL_CREATE_INDEXES:
-            conn.execute(sql)
-        conn.commit()
+    """Create purchase related tables and migrate old schema if needed.
+
+    The work is done once per process; later calls return immediately.
+    """
+    bootstrap(db_path, _create_accounting_schema, _create_schema)
+
+
+def _create_schema(conn) -> None:
+    """Create or upgrade the purchase tables within the caller's transaction."""
+    conn.execute(SQL_CREATE_SUPPLIERS)
+    conn.execute(SQL_CREATE_PURCHASES)
+    _migrate_schema(conn)
+    migrate_to_cents(conn, "purchases", SQL_CREATE_PURCHASES, ("ttc_amount",))
+    for sql in SQL_CREATE_INDEXES:
+        conn.execute(sql)
+    for name in OBSOLETE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+    linked = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' "
+        "AND name='idx_entries_purchase'"
+    ).fetchone()
+    if not linked:
+        conn.execute(SQL_LINK_ENTRIES)
+        conn.execute(SQL_LINK_LINES)
+    for sql in SQL_LINK_INDEXES:
+        conn.execute(sql)
+    if not _column_exists(conn, "purchases", "paid_amount"):
+        conn.execute(
+            "ALTER TABLE purchases ADD COLUMN "
+            "paid_amount INTEGER NOT NULL DEFAULT 0"
+        )
+    payments = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' "
+        "AND name='purchase_payments'"
+    ).fetchone()
+    conn.execute(SQL_CREATE_PAYMENTS)
+    for sql in SQL_PAYMENT_INDEXES + SQL_PAYMENT_TRIGGERS:
+        conn.execute(sql)
+    if not payments:
+        conn.execute(SQL_BACKFILL_PAYMENTS)
 
 
 def add_supplier(
@@ -153,149 +401,121 @@ def add_supplier(
     address: str | None = None,
 ) -> int:
     """Insert a supplier and return its id."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         cur = conn.execute(
             "INSERT INTO suppliers (name, vat_number, address) VALUES (?,?,?)",
             (name, vat_number, address),
         )
-        conn.commit()
-        signals.supplier_changed.emit()
+        publish_after_commit(conn, SUPPLIER_CHANGED, supplier_changes([cur.lastrowid]))
         return cur.lastrowid
 
 
 def add_purchase(db_path: Path | str, pur: Purchase) -> int:
-    """Insert *pur* and generate accounting entry."""
-    ht = round(pur.ttc_amount / (1 + pur.vat_rate / 100), 2)
-    vat = round(pur.ttc_amount - ht, 2)
-    with connect(db_path) as conn:
-        conn.execute("BEGIN")
-        try:
-            if pur.piece == "AUTO":
-                pur.piece = next_sequence(
-                    conn, "AC", int(pur.date[:4])
-                )
-            _ensure_account(conn, pur.account_code)
-            cur = conn.execute(
-                SQL_INSERT_PURCHASE,
-                (
-                    pur.date,
-                    pur.piece,
-                    pur.supplier_id,
-                    pur.label,
-                    pur.ttc_amount,
-                    pur.vat_rate,
-                    pur.account_code,
-                    pur.due_date,
-                    pur.payment_status,
-                    pur.payment_date,
-                    pur.payment_method,
-                    pur.is_advance,
-                    pur.is_invoice_received,
-                    pur.attachment_path,
-                    pur.created_by,
-                ),
-            )
-            pur.id = cur.lastrowid
-            credit_account = (
-                "4091"
-                if pur.is_advance
-                else ("408" if not pur.is_invoice_received else "401")
-            )
-            vat_account = (
-                "44562" if pur.account_code.startswith("2") else "44566"
+    """Insert *pur* and generate accounting entry.
+
+    New purchases are always ``A_PAYER``: their paid amount and status only
+    change through :func:`pay_purchase`, which posts the bank entry.
+    """
+    if pur.payment_status != "A_PAYER":
+        raise ValueError(
+            f"Status {pur.payment_status} not allowed, record the payment instead"
+        )
+    ttc = to_cents(pur.ttc_amount)
+    ht, vat = _split_ttc(ttc, pur.vat_rate)
+    with connection(db_path) as conn:
+        if pur.piece == "AUTO":
+            pur.piece = next_sequence(
+                conn, "AC", int(pur.date[:4])
             )
-            lines = [
-                EntryLine(account=pur.account_code, debit=ht, credit=0.0),
-                EntryLine(account=vat_account, debit=vat, credit=0.0),
-                EntryLine(
-                    account=credit_account,
-                    debit=0.0,
-                    credit=pur.ttc_amount,
-                ),
-            ]
-            _create_entry(
-                conn,
-                "ACH",
+        _ensure_account(conn, pur.account_code)
+        cur = conn.execute(
+            SQL_INSERT_PURCHASE,
+            (
                 pur.date,
                 pur.piece,
+                pur.supplier_id,
                 pur.label,
-                lines,
-            )
-            conn.commit()
-            signals.supplier_changed.emit()
-            return pur.id
-        except Exception:
-            conn.rollback()
-            raise
+                ttc,
+                pur.vat_rate,
+                pur.account_code,
+                pur.due_date,
+                pur.payment_status,
+                pur.payment_date,
+                pur.payment_method,
+                pur.is_advance,
+                pur.is_invoice_received,
+                pur.attachment_path,
+                pur.created_by,
+            ),
+        )
+        pur.id = cur.lastrowid
+        lines = _purchase_lines(pur, ttc, ht, vat)
+        _create_entry(
+            conn,
+            "ACH",
+            pur.date,
+            pur.piece,
+            pur.label,
+            lines,
+            purchase_id=pur.id,
+            supplier_id=pur.supplier_id,
+        )
+        publish_after_commit(
+            conn, SUPPLIER_CHANGED, supplier_changes([pur.supplier_id], [pur.id])
+        )
+        return pur.id
 
 
 def update_purchase(db_path: Path | str, pur: Purchase) -> None:
-    """Update *pur* and recreate its accounting entry."""
+    """Update *pur* and rewrite its accounting entry in place.
+
+    The ``ACH`` entry keeps its id; only the lines whose account or amount
+    changed are written, so letter codes survive an edit of the label or
+    the date.  A change of supplier moves every entry of the purchase.
+    """
     if pur.id is None:
         raise ValueError("Purchase id required")
-    ht = round(pur.ttc_amount / (1 + pur.vat_rate / 100), 2)
-    vat = round(pur.ttc_amount - ht, 2)
-    with connect(db_path) as conn:
-        conn.execute("BEGIN")
-        try:
-            if pur.piece == "AUTO":
-                pur.piece = next_sequence(
-                    conn, "AC", int(pur.date[:4])
-                )
-            _ensure_account(conn, pur.account_code)
-            conn.execute(
-                SQL_UPDATE_PURCHASE,
-                (
-                    pur.date,
-                    pur.piece,
-                    pur.supplier_id,
-                    pur.label,
-                    pur.ttc_amount,
-                    pur.vat_rate,
-                    pur.account_code,
-                    pur.due_date,
-                    pur.payment_status,
-                    pur.payment_date,
-                    pur.payment_method,
-                    pur.is_advance,
-                    pur.is_invoice_received,
-                    pur.attachment_path,
-                    pur.id,
-                ),
-            )
-            # delete previous entry
-            cur = conn.execute(
-                "SELECT id FROM entries WHERE journal='ACH' AND ref=?",
-                (pur.piece,),
-            )
-            row = cur.fetchone()
-            if row:
-                entry_id = row[0]
-                conn.execute(
-                    "DELETE FROM entry_lines WHERE entry_id=?",
-                    (entry_id,),
-                )
-                conn.execute(
-                    "DELETE FROM entries WHERE id=?",
-                    (entry_id,),
-                )
-            credit_account = (
-                "4091"
-                if pur.is_advance
-                else ("408" if not pur.is_invoice_received else "401")
+    ttc = to_cents(pur.ttc_amount)
+    ht, vat = _split_ttc(ttc, pur.vat_rate)
+    with connection(db_path) as conn:
+        old = conn.execute(
+            "SELECT supplier_id FROM purchases WHERE id=?", (pur.id,)
+        ).fetchone()
+        if old is None:
+            raise ValueError(f"Purchase {pur.id} not found")
+        if pur.piece == "AUTO":
+            pur.piece = next_sequence(
+                conn, "AC", int(pur.date[:4])
             )
-            vat_account = (
-                "44562" if pur.account_code.startswith("2") else "44566"
+        _ensure_account(conn, pur.account_code)
+        conn.execute(
+            SQL_UPDATE_PURCHASE,
+            (
+                pur.date,
+                pur.piece,
+                pur.supplier_id,
+                pur.label,
+                ttc,
+                pur.vat_rate,
+                pur.account_code,
+                pur.due_date,
+                pur.is_advance,
+                pur.is_invoice_received,
+                pur.attachment_path,
+                pur.id,
+            ),
+        )
+        conn.execute(SQL_PAYMENT_STATUS, (pur.id,))
+        if old[0] != pur.supplier_id:
+            conn.execute(SQL_RELINK_ENTRIES, (pur.supplier_id, pur.id))
+            conn.execute(SQL_RELINK_LINES, (pur.supplier_id, pur.id))
+        lines = _purchase_lines(pur, ttc, ht, vat)
+        entry = conn.execute(SQL_PURCHASE_ENTRY, (pur.id,)).fetchone()
+        if entry:
+            _update_entry(
+                conn, entry[0], pur.date, pur.piece, pur.label, lines
             )
-            lines = [
-                EntryLine(account=pur.account_code, debit=ht, credit=0.0),
-                EntryLine(account=vat_account, debit=vat, credit=0.0),
-                EntryLine(
-                    account=credit_account,
-                    debit=0.0,
-                    credit=pur.ttc_amount,
-                ),
-            ]
+        else:
             _create_entry(
                 conn,
                 "ACH",
@@ -303,12 +523,14 @@ def update_purchase(db_path: Path | str, pur: Purchase) -> None:
                 pur.piece,
                 pur.label,
                 lines,
+                purchase_id=pur.id,
+                supplier_id=pur.supplier_id,
             )
-            conn.commit()
-            signals.supplier_changed.emit()
-        except Exception:
-            conn.rollback()
-            raise
+        publish_after_commit(
+            conn,
+            SUPPLIER_CHANGED,
+            supplier_changes([pur.supplier_id, old[0]], [pur.id]),
+        )
 
 
 def pay_purchase(
@@ -318,112 +540,194 @@ def pay_purchase(
     method: str,
     amount: float,
 ) -> None:
-    """Register a payment entry for the purchase."""
-    with connect(db_path) as conn:
-        conn.execute("BEGIN")
-        try:
-            cur = conn.execute(
-                (
-                    "SELECT ttc_amount, vat_rate, piece, "
-                    "payment_status, is_advance, is_invoice_received "
-                    "FROM purchases WHERE id=?"
-                ),
-                (purchase_id,),
-            )
-            row = cur.fetchone()
-            if not row:
-                raise ValueError("Invalid purchase id")
-            total = row[0]
-            paid = conn.execute(
-                (
-                    "SELECT COALESCE(SUM(credit),0) FROM entry_lines "
-                    "WHERE account='512' AND entry_id IN "
-                    "(SELECT id FROM entries WHERE journal='BQ' AND ref=?)"
-                ),
-                (row[2],),
-            ).fetchone()[0]
-            status = "PAYE" if amount + paid >= total else "PARTIEL"
-            conn.execute(
-                (
-                    "UPDATE purchases SET payment_status=?, payment_date=?, "
-                    "payment_method=? WHERE id=?"
-                ),
-                (
-                    status,
-                    payment_date,
-                    method,
-                    purchase_id,
-                ),
+    """Register a payment entry for the purchase.
+
+    The ``purchase_payments`` triggers update its paid amount and status.
+    """
+    with connection(db_path) as conn:
+        cur = conn.execute(
+            (
+                "SELECT piece, is_advance, is_invoice_received, "
+                "supplier_id FROM purchases WHERE id=?"
+            ),
+            (purchase_id,),
+        )
+        row = cur.fetchone()
+        if not row:
+            raise ValueError("Invalid purchase id")
+        credit_account = _credit_account(row[1], row[2])
+        lines = [
+            EntryLine(account=credit_account, debit=amount, credit=0.0),
+            EntryLine(account="512", debit=0.0, credit=amount),
+        ]
+        entry_id = _create_entry(
+            conn,
+            "BQ",
+            payment_date,
+            row[0],
+            f"Paiement facture {row[0]}",
+            lines,
+            purchase_id=purchase_id,
+            supplier_id=row[3],
+        )
+        conn.execute(
+            SQL_INSERT_PAYMENT,
+            (purchase_id, payment_date, method, to_cents(amount), entry_id),
+        )
+        publish_after_commit(
+            conn, SUPPLIER_CHANGED, supplier_changes([row[3]], [purchase_id])
+        )
+
+
+def _due_purchases(
+    conn, due_before: str, supplier_ids: Optional[Iterable[int]]
+) -> List[DuePurchase]:
+    if supplier_ids is None:
+        sql, params = SQL_DUE_PURCHASES.format(where=""), (due_before,)
+    else:
+        sql = SQL_DUE_PURCHASES.format(where=SQL_WHERE_SUPPLIERS)
+        params = (due_before, json.dumps(sorted(supplier_ids)))
+    return [
+        DuePurchase(
+            id=r[0],
+            supplier_id=r[1],
+            piece=r[2],
+            due_date=r[3],
+            amount=from_cents(r[4]),
+            account=_credit_account(r[5], r[6]),
+        )
+        for r in conn.execute(sql, params).fetchall()
+    ]
+
+
+def get_due_purchases(
+    db_path: Path | str,
+    due_before: str,
+    supplier_ids: Optional[Iterable[int]] = None,
+) -> List[DuePurchase]:
+    """Return the purchases due by *due_before* that are not fully paid."""
+    with connection(db_path) as conn:
+        return _due_purchases(conn, due_before, supplier_ids)
+
+
+def pay_due_purchases(
+    db_path: Path | str,
+    payment_date: str,
+    method: str = "VIR",
+    due_before: Optional[str] = None,
+    supplier_ids: Optional[Iterable[int]] = None,
+) -> PaymentRun:
+    """Pay the remaining amount of every purchase due by *due_before*.
+
+    *due_before* defaults to *payment_date*; *supplier_ids* restricts the
+    run to those suppliers.  The selection and one ``BQ`` entry and payment
+    per purchase are written in a single transaction, and one event per
+    name is published for the whole run.
+    """
+    run = PaymentRun(payment_date)
+    with connection(db_path, immediate=True) as conn:
+        due = _due_purchases(conn, due_before or payment_date, supplier_ids)
+        entries = [
+            Entry(
+                "BQ",
+                payment_date,
+                d.piece,
+                f"Paiement facture {d.piece}",
+                [
+                    EntryLine(account=d.account, debit=d.amount),
+                    EntryLine(account="512", credit=d.amount),
+                ],
+                purchase_id=d.id,
+                supplier_id=d.supplier_id,
             )
-            credit_account = (
-                "4091" if row[4] else ("408" if not row[5] else "401")
+            for d in due
+        ]
+        run.entry_ids = _create_entries_bulk(conn, entries)
+        conn.executemany(
+            SQL_INSERT_PAYMENT,
+            [
+                (d.id, payment_date, method, to_cents(d.amount), entry_id)
+                for d, entry_id in zip(due, run.entry_ids)
+            ],
+        )
+        if due:
+            run.purchase_ids = [d.id for d in due]
+            run.total = from_cents(sum(to_cents(d.amount) for d in due))
+            publish_after_commit(
+                conn,
+                ENTRY_CHANGED,
+                entry_changes(run.entry_ids, {"512"} | {d.account for d in due}),
             )
-            lines = [
-                EntryLine(account=credit_account, debit=amount, credit=0.0),
-                EntryLine(account="512", debit=0.0, credit=amount),
-            ]
-            _create_entry(
+            publish_after_commit(
                 conn,
-                "BQ",
-                payment_date,
-                row[2],
-                f"Paiement facture {row[2]}",
-                lines,
+                SUPPLIER_CHANGED,
+                supplier_changes({d.supplier_id for d in due}, run.purchase_ids),
             )
-            conn.commit()
-            signals.supplier_changed.emit()
-        except Exception:
-            conn.rollback()
-            raise
+    return run
 
 
 def delete_purchase(db_path: Path | str, purchase_id: int) -> None:
     """Delete the purchase and its accounting entry."""
-    with connect(db_path) as conn:
-        conn.execute("BEGIN")
-        try:
-            cur = conn.execute(
-                "SELECT piece FROM purchases WHERE id=?",
-                (purchase_id,),
-            )
-            row = cur.fetchone()
-            if not row:
-                raise ValueError("Invalid purchase id")
-            piece = row[0]
-
-            conn.execute(
-                "DELETE FROM purchases WHERE id=?",
-                (purchase_id,),
-            )
+    with connection(db_path) as conn:
+        cur = conn.execute(
+            "SELECT piece, supplier_id FROM purchases WHERE id=?",
+            (purchase_id,),
+        )
+        row = cur.fetchone()
+        if not row:
+            raise ValueError("Invalid purchase id")
 
-            cur = conn.execute(
-                "SELECT id FROM entries WHERE journal='ACH' AND ref=?",
-                (piece,),
-            )
-            row = cur.fetchone()
-            if row:
-                entry_id = row[0]
-                conn.execute(
-                    "DELETE FROM entry_lines WHERE entry_id=?",
-                    (entry_id,),
-                )
-                conn.execute(
-                    "DELETE FROM entries WHERE id=?",
-                    (entry_id,),
-                )
-            conn.commit()
-            signals.supplier_changed.emit()
-        except Exception:
-            conn.rollback()
-            raise
+        conn.execute(
+            "DELETE FROM purchases WHERE id=?",
+            (purchase_id,),
+        )
+        _delete_purchase_entry(conn, purchase_id)
+        # Payments stay in the ledger but no longer count for the supplier.
+        conn.execute(SQL_UNLINK_ENTRIES, (purchase_id,))
+        conn.execute(SQL_UNLINK_LINES, (purchase_id,))
+        publish_after_commit(
+            conn, SUPPLIER_CHANGED, supplier_changes([row[1]], [purchase_id])
+        )
 
 
-def fetch_purchases(
-    db_path: Path | str,
+def _delete_purchase_entry(conn, purchase_id: int) -> None:
+    """Delete the ``ACH`` entry of a purchase and publish the accounts it left."""
+    row = conn.execute(SQL_PURCHASE_ENTRY, (purchase_id,)).fetchone()
+    if not row:
+        return
+    entry_id = row[0]
+    accounts = [
+        r[0]
+        for r in conn.execute(
+            "SELECT DISTINCT account FROM entry_lines WHERE entry_id=?",
+            (entry_id,),
+        )
+    ]
+    conn.execute("DELETE FROM entry_lines WHERE entry_id=?", (entry_id,))
+    conn.execute("DELETE FROM entries WHERE id=?", (entry_id,))
+    publish_after_commit(conn, ENTRY_CHANGED, entry_changes([entry_id], accounts))
+
+
+def _purchase_columns(columns: Sequence[str]) -> str:
+    unknown = [c for c in columns if c not in PURCHASE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown purchase columns: {', '.join(unknown)}")
+    return ", ".join(columns)
+
+
+def _purchase_query(
     flt: PurchaseFilter,
-) -> List[Purchase]:
-    """Return purchases filtered according to *flt*."""
-    query = "SELECT * FROM purchases WHERE 1=1"
+    columns: Optional[Sequence[str]] = None,
+    after: Optional[PurchaseCursor] = None,
+    limit: Optional[int] = None,
+) -> tuple[str, List]:
+    """Return the SQL and parameters selecting the purchases of *flt*.
+
+    *columns* restricts the select list; *after* and *limit* cut one page
+    out of the (date, id) order.
+    """
+    select = _purchase_columns(columns) if columns else "*"
+    query = f"SELECT {select} FROM purchases WHERE 1=1"
     params: List = []
     if flt.start:
         query += " AND date >= ?"
@@ -437,33 +741,92 @@ def fetch_purchases(
     if flt.status:
         query += " AND payment_status = ?"
         params.append(flt.status)
-    query += " ORDER BY date"
-    with connect(db_path) as conn:
-        cur = conn.execute(query, params)
-        rows = cur.fetchall()
-        return [Purchase(**dict(row)) for row in rows]
+    if after is not None:
+        query += " AND (date, id) > (?, ?)"
+        params += [after.date, after.id]
+    query += " ORDER BY date, id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return query, params
+
+
+def _purchase_rows(columns: Optional[Sequence[str]], rows) -> list:
+    """Convert *rows* of *columns* to euros: Purchase objects when every
+    column was selected, plain tuples otherwise."""
+    names = columns or PURCHASE_COLUMNS
+    amounts = [i for i, c in enumerate(names) if c in AMOUNT_COLUMNS]
+    result = []
+    for row in rows:
+        values = list(row)
+        for i in amounts:
+            values[i] = from_cents(values[i])
+        result.append(tuple(values) if columns else Purchase(*values))
+    return result
+
+
+def fetch_purchases(
+    db_path: Path | str,
+    flt: PurchaseFilter,
+    columns: Optional[Sequence[str]] = None,
+) -> list:
+    """Return purchases filtered according to *flt*.
+
+    Without *columns* each purchase is a :class:`Purchase`; with them, a
+    tuple of those columns.  Long listings should use
+    :func:`iter_purchases` or :func:`fetch_purchase_page` instead.
+    """
+    query, params = _purchase_query(flt, columns or PURCHASE_COLUMNS)
+    with connection(db_path) as conn:
+        return _purchase_rows(columns, conn.execute(query, params))
+
+
+def fetch_purchase_page(
+    db_path: Path | str,
+    flt: PurchaseFilter,
+    cursor: Optional[PurchaseCursor] = None,
+    limit: int = PURCHASE_PAGE_SIZE,
+    columns: Optional[Sequence[str]] = None,
+) -> PurchasePage:
+    """Return at most *limit* purchases of *flt* after *cursor*.
+
+    Pages follow the (date, id) order and each one resumes from the
+    ``next_cursor`` of the previous page, which is ``None`` on the last.
+    """
+    names = columns or PURCHASE_COLUMNS
+    query, params = _purchase_query(flt, ("date", "id", *names), cursor, limit + 1)
+    with connection(db_path) as conn:
+        rows = conn.execute(query, params).fetchall()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = PurchaseCursor(rows[-1][0], rows[-1][1])
+    return PurchasePage(_purchase_rows(columns, (r[2:] for r in rows)), next_cursor)
+
+
+def iter_purchases(
+    db_path: Path | str,
+    flt: PurchaseFilter,
+    columns: Optional[Sequence[str]] = None,
+    page_size: int = PURCHASE_PAGE_SIZE,
+) -> Iterator:
+    """Yield the purchases of *flt* page by page.
+
+    Only one page is held in memory and no read stays open between two
+    pages, so callers may write to the database while iterating.
+    """
+    cursor = None
+    while True:
+        page = fetch_purchase_page(db_path, flt, cursor, page_size, columns)
+        yield from page.rows
+        cursor = page.next_cursor
+        if cursor is None:
+            return
 
 
 def fetch_all_purchases(db_path: Path | str):
     """Return purchases as (id, date, label, ttc, due_date, status)."""
-    with connect(db_path) as conn:
-        cur = conn.execute(
-            (
-                "SELECT id, date, label, ttc_amount, due_date, payment_status "
-                "FROM purchases ORDER BY date"
-            )
-        )
-        return [
-            (
-                r["id"],
-                r["date"],
-                r["label"],
-                r["ttc_amount"],
-                r["due_date"],
-                r["payment_status"],
-            )
-            for r in cur.fetchall()
-        ]
+    return list(iter_purchases(db_path, PurchaseFilter(), LIST_COLUMNS))
 
 
 def get_vat_summary(
@@ -472,8 +835,9 @@ def get_vat_summary(
     end: str,
 ) -> List[VatLine]:
     """Return VAT summary per rate between *start* and *end*."""
-    with connect(db_path) as conn:
+    with connection(db_path) as conn:
         cur = conn.execute(SQL_VAT_SUMMARY, (start, end))
         return [
-            VatLine(rate=r[0], base=r[1], vat=r[2]) for r in cur.fetchall()
+            VatLine(rate=r[0], base=from_cents(r[1]), vat=from_cents(r[2]))
+            for r in cur.fetchall()
         ]
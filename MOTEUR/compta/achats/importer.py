@@ -0,0 +1,389 @@
+"""Bulk import of purchases from CSV or XLSX files.
+
+Rows are streamed from the file, validated against in-memory caches of the
+suppliers, accounts and existing pieces loaded once, and written in chunks:
+one transaction per chunk inserts the purchases with ``executemany`` and
+their ``ACH`` entries through
+:func:`~MOTEUR.compta.accounting.db._create_entries_bulk`.  Suppliers are
+resolved by name (case-insensitive) and created when unknown; accounts are
+ensured once per chunk.
+
+With ``dry_run=True`` nothing is written and the report lists what the
+import would do and every invalid row.  Otherwise invalid rows are skipped
+and reported, valid ones imported.
+"""
+
+from __future__ import annotations
+
+import csv
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import date as Date, datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from ..accounting.db import _closed_years, _create_entries_bulk, next_sequence
+from ..db import connection
+from ..events import (
+    ENTRY_CHANGED,
+    SUPPLIER_CHANGED,
+    batched,
+    entry_changes,
+    publish,
+    supplier_changes,
+)
+from ..models import Entry, Purchase, from_cents, to_cents
+from .db import (
+    SQL_INSERT_PURCHASE,
+    _insert_supplier,
+    _purchase_lines,
+    _split_ttc,
+    init_db,
+)
+
+IMPORT_CHUNK_SIZE = 5000
+
+REQUIRED_COLUMNS = ("date", "piece", "fournisseur", "libelle", "ttc", "tva", "compte")
+OPTIONAL_COLUMNS = ("echeance", "statut", "avance", "facture_recue")
+# Accepted alternative headers, after lower-casing and accent removal.
+COLUMN_ALIASES = {
+    "montant_ttc": "ttc",
+    "montant": "ttc",
+    "taux_tva": "tva",
+    "compte_charge": "compte",
+    "date_echeance": "echeance",
+}
+VAT_RATES = (0.0, 2.1, 5.5, 10.0, 20.0)
+# Paid amounts come from purchase_payments and their bank entries, which an
+# import does not write: rows can only be imported as still to pay.
+STATUSES = ("A_PAYER",)
+DEFAULT_DUE_DAYS = 30
+
+SQL_LAST_PURCHASE_ID = "SELECT seq FROM sqlite_sequence WHERE name='purchases'"
+
+
+@dataclass(slots=True)
+class ImportIssue:
+    """Invalid row of an import file; *line* is 1-based, header included."""
+
+    line: int
+    message: str
+
+
+@dataclass(slots=True)
+class ImportReport:
+    """Outcome of :func:`import_purchases`."""
+
+    dry_run: bool
+    rows: int = 0
+    valid: int = 0
+    imported: int = 0
+    new_suppliers: int = 0
+    new_accounts: int = 0
+    issues: List[ImportIssue] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.issues
+
+
+# ----------------------------------------------------------------------
+# Readers
+def _header(name) -> str:
+    text = unicodedata.normalize("NFKD", str(name or "").strip().lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.replace(" ", "_").replace("-", "_")
+    return COLUMN_ALIASES.get(text, text)
+
+
+def _sniff_delimiter(line: str) -> str:
+    return max(";,\t", key=line.count)
+
+
+def _read_csv(path: Path, delimiter: Optional[str]) -> Iterator[Tuple[int, Dict]]:
+    with path.open(newline="", encoding="utf-8-sig") as fh:
+        if delimiter is None:
+            delimiter = _sniff_delimiter(fh.readline())
+            fh.seek(0)
+        reader = csv.reader(fh, delimiter=delimiter)
+        header = [_header(h) for h in next(reader, [])]
+        for line, values in enumerate(reader, 2):
+            if any(v.strip() for v in values):
+                yield line, dict(zip(header, values))
+
+
+def _read_xlsx(path: Path) -> Iterator[Tuple[int, Dict]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:  # optional dependency
+        raise ImportError(
+            "Reading .xlsx files requires openpyxl (pip install openpyxl)"
+        ) from exc
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = [_header(h) for h in next(rows, ())]
+        for line, values in enumerate(rows, 2):
+            if any(v not in (None, "") for v in values):
+                yield line, dict(zip(header, values))
+    finally:
+        wb.close()
+
+
+def read_purchase_rows(
+    source: Path | str, delimiter: Optional[str] = None
+) -> Iterator[Tuple[int, Dict]]:
+    """Yield ``(line, row)`` from a ``.csv`` or ``.xlsx`` file.
+
+    Headers are normalised (lower case, no accents, aliases applied); the
+    CSV delimiter is guessed from the header line unless given.
+    """
+    path = Path(source)
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        return _read_xlsx(path)
+    return _read_csv(path, delimiter)
+
+
+# ----------------------------------------------------------------------
+# Validation
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _date(value) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, Date):
+        return value.isoformat()
+    text = _text(value)
+    if "/" in text:
+        return datetime.strptime(text, "%d/%m/%Y").date().isoformat()
+    return Date.fromisoformat(text).isoformat()
+
+
+def _number(value) -> str:
+    if isinstance(value, (int, float)):
+        return str(value)
+    text = _text(value)
+    for space in (" ", "\u00a0", "\u202f"):  # thousands separators
+        text = text.replace(space, "")
+    return text.replace(",", ".")
+
+
+def _flag(value, default: int) -> int:
+    text = _text(value).lower()
+    if not text:
+        return default
+    if text in ("1", "oui", "o", "true", "vrai", "x"):
+        return 1
+    if text in ("0", "non", "n", "false", "faux"):
+        return 0
+    raise ValueError(f"invalid yes/no value {text!r}")
+
+
+class _Row:
+    __slots__ = ("purchase", "supplier", "ttc")
+
+    def __init__(self, purchase: Purchase, supplier: str, ttc: int) -> None:
+        self.purchase = purchase
+        self.supplier = supplier
+        self.ttc = ttc
+
+
+def _parse(row: Dict) -> _Row:
+    missing = [c for c in REQUIRED_COLUMNS if not _text(row.get(c))]
+    if missing:
+        raise ValueError(f"empty columns: {', '.join(missing)}")
+    try:
+        day = _date(row["date"])
+    except ValueError:
+        raise ValueError(f"invalid date {row['date']!r}") from None
+    try:
+        due = _date(row["echeance"]) if _text(row.get("echeance")) else (
+            (Date.fromisoformat(day) + timedelta(days=DEFAULT_DUE_DAYS)).isoformat()
+        )
+    except ValueError:
+        raise ValueError(f"invalid due date {row['echeance']!r}") from None
+    try:
+        ttc = to_cents(_number(row["ttc"]))
+        rate = float(_number(row["tva"]))
+    except ArithmeticError:
+        raise ValueError(f"invalid amount {row['ttc']!r}") from None
+    except ValueError:
+        raise ValueError(f"invalid VAT rate {row['tva']!r}") from None
+    if ttc < 0:
+        raise ValueError("negative amount")
+    if rate not in VAT_RATES:
+        raise ValueError(f"VAT rate {rate:g} not allowed")
+    status = _text(row.get("statut")).upper() or "A_PAYER"
+    if status not in STATUSES:
+        raise ValueError(f"status {status} not importable, record the payment instead")
+    purchase = Purchase(
+        id=None,
+        date=day,
+        piece=_text(row["piece"]),
+        supplier_id=0,
+        label=_text(row["libelle"]),
+        ttc_amount=from_cents(ttc),
+        vat_rate=rate,
+        account_code=_text(row["compte"]),
+        due_date=due,
+        payment_status=status,
+        is_advance=_flag(row.get("avance"), 0),
+        is_invoice_received=_flag(row.get("facture_recue"), 1),
+    )
+    return _Row(purchase, _text(row["fournisseur"]), ttc)
+
+
+class _Caches:
+    """Suppliers, accounts and pieces known to the database, loaded once."""
+
+    def __init__(self, conn) -> None:
+        self.suppliers: Dict[str, int] = {}
+        for sid, name in conn.execute("SELECT id, name FROM suppliers ORDER BY id"):
+            self.suppliers.setdefault(name.strip().casefold(), sid)
+        self.accounts: Set[str] = {
+            r[0] for r in conn.execute("SELECT code FROM accounts")
+        }
+        self.pieces: Set[Tuple[str, str]] = set()
+        names = {sid: key for key, sid in self.suppliers.items()}
+        for sid, piece in conn.execute("SELECT supplier_id, piece FROM purchases"):
+            if sid in names:
+                self.pieces.add((names[sid], piece))
+        self.closed = _closed_years(conn)
+        self.new_suppliers: Set[str] = set()
+        self.new_accounts: Set[str] = set()
+
+    def check(self, parsed: _Row) -> None:
+        """Validate *parsed* against the database and the rows seen so far."""
+        pur = parsed.purchase
+        if int(pur.date[:4]) in self.closed:
+            raise ValueError(f"fiscal year {pur.date[:4]} is closed")
+        key = parsed.supplier.casefold()
+        if pur.piece != "AUTO":
+            if (key, pur.piece) in self.pieces:
+                raise ValueError(f"piece {pur.piece} already exists for {parsed.supplier}")
+            self.pieces.add((key, pur.piece))
+        if key not in self.suppliers:
+            self.new_suppliers.add(key)
+        if pur.account_code not in self.accounts:
+            self.new_accounts.add(pur.account_code)
+
+
+# ----------------------------------------------------------------------
+# Writing
+def _write_chunk(conn, chunk: List[_Row], caches: _Caches) -> Tuple[List[int], List[int], Set[str]]:
+    """Insert *chunk* in one transaction; return purchase ids, entry ids, accounts."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for parsed in chunk:
+            key = parsed.supplier.casefold()
+            if key not in caches.suppliers:
+                caches.suppliers[key] = _insert_supplier(conn, parsed.supplier)
+            parsed.purchase.supplier_id = caches.suppliers[key]
+        accounts = {p.purchase.account_code for p in chunk} - caches.accounts
+        conn.executemany(
+            "INSERT OR IGNORE INTO accounts(code, name) VALUES (?, '')",
+            [(code,) for code in sorted(accounts)],
+        )
+        for parsed in chunk:
+            pur = parsed.purchase
+            if pur.piece == "AUTO":
+                pur.piece = next_sequence(conn, "AC", int(pur.date[:4]))
+        conn.executemany(
+            SQL_INSERT_PURCHASE,
+            [
+                (
+                    p.date, p.piece, p.supplier_id, p.label, parsed.ttc,
+                    p.vat_rate, p.account_code, p.due_date, p.payment_status,
+                    p.payment_date, p.payment_method, p.is_advance,
+                    p.is_invoice_received, p.attachment_path, p.created_by,
+                )
+                for parsed in chunk
+                for p in (parsed.purchase,)
+            ],
+        )
+        # AUTOINCREMENT ids are consecutive while we hold the write lock.
+        last = conn.execute(SQL_LAST_PURCHASE_ID).fetchone()[0]
+        purchase_ids = list(range(last - len(chunk) + 1, last + 1))
+        entries = []
+        posted: Set[str] = set()
+        for pid, parsed in zip(purchase_ids, chunk):
+            pur = parsed.purchase
+            pur.id = pid
+            lines = _purchase_lines(pur, parsed.ttc, *_split_ttc(parsed.ttc, pur.vat_rate))
+            posted.update(line.account for line in lines)
+            entries.append(
+                Entry(
+                    "ACH", pur.date, pur.piece, pur.label, lines,
+                    purchase_id=pid, supplier_id=pur.supplier_id,
+                )
+            )
+        entry_ids = _create_entries_bulk(conn, entries)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    caches.accounts |= accounts
+    return purchase_ids, entry_ids, posted
+
+
+def import_purchases(
+    db_path: Path | str,
+    source: Path | str,
+    dry_run: bool = False,
+    chunk_size: int = IMPORT_CHUNK_SIZE,
+    delimiter: Optional[str] = None,
+) -> ImportReport:
+    """Import the purchases of the CSV/XLSX file *source*.
+
+    Expected columns: ``date`` (ISO or JJ/MM/AAAA), ``piece`` (``AUTO`` for
+    a numbered piece), ``fournisseur``, ``libelle``, ``ttc``, ``tva``,
+    ``compte``, and optionally ``echeance`` (date + 30 days by default),
+    ``statut`` (``A_PAYER`` only: payments are recorded with
+    :func:`~MOTEUR.compta.achats.db.pay_purchase`), ``avance`` and
+    ``facture_recue``.  Each chunk of
+    *chunk_size* valid rows is committed on its own, so an unexpected
+    database error leaves the earlier chunks imported.  Change events are
+    coalesced into one per name for the whole file.
+    """
+    init_db(db_path)
+    report = ImportReport(dry_run=dry_run)
+    start = time.perf_counter()
+    rows = read_purchase_rows(source, delimiter)
+    with connection(db_path, profile="bulk") as conn, batched():
+        caches = _Caches(conn)
+        valid = _valid_rows(rows, caches, report)
+        while True:
+            chunk = list(islice(valid, chunk_size))
+            if not chunk:
+                break
+            if dry_run:
+                continue
+            purchase_ids, entry_ids, accounts = _write_chunk(conn, chunk, caches)
+            report.imported += len(chunk)
+            publish(ENTRY_CHANGED, entry_changes(entry_ids, accounts))
+            publish(
+                SUPPLIER_CHANGED,
+                supplier_changes({p.purchase.supplier_id for p in chunk}, purchase_ids),
+            )
+    report.new_suppliers = len(caches.new_suppliers)
+    report.new_accounts = len(caches.new_accounts)
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def _valid_rows(rows, caches: _Caches, report: ImportReport) -> Iterator[_Row]:
+    for line, row in rows:
+        report.rows += 1
+        try:
+            parsed = _parse(row)
+            caches.check(parsed)
+        except ValueError as exc:
+            report.issues.append(ImportIssue(line, str(exc)))
+            continue
+        report.valid += 1
+        yield parsed
@@ -1,11 +1,20 @@
 from PySide6.QtCore import QObject, Signal
 
+from ..events import QtDispatcher, set_dispatcher
+
 
 class AchatSignals(QObject):
-    """Signals emitted by the purchases module."""
+    """Signals emitted by the purchases module.
+
+    Both carry the :class:`~MOTEUR.compta.events.ChangeSet` of the change,
+    or ``None`` when listeners should reload everything.
+    """
 
-    supplier_changed = Signal()
-    entry_changed = Signal()
+    supplier_changed = Signal(object)
+    entry_changed = Signal(object)
 
 
 signals = AchatSignals()
+
+# Route database change events to the Qt signals now that something listens.
+set_dispatcher(QtDispatcher(signals))
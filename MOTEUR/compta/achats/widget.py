@@ -31,13 +31,17 @@ from .db import (
     add_supplier,
     update_purchase,
     delete_purchase,
-    fetch_all_purchases,
+    LIST_COLUMNS,
+    fetch_purchase_page,
+    get_due_purchases,
+    pay_due_purchases,
     _insert_supplier,
 )
+from .importer import import_purchases
 from .signals import signals
-from ..models import Purchase
+from ..models import Purchase, PurchaseCursor, PurchaseFilter
 from ..accounting.db import next_sequence, fetch_journals
-from ..db import connect
+from ..db import connection
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 # Default path to the SQLite database
@@ -117,6 +121,12 @@ class AchatWidget(QWidget):
         self.del_btn = QPushButton("Supprimer")
         self.del_btn.clicked.connect(self.remove_purchase)
         btn_layout.addWidget(self.del_btn)
+        self.import_btn = QPushButton("Importer…")
+        self.import_btn.clicked.connect(self.import_file)
+        btn_layout.addWidget(self.import_btn)
+        self.pay_btn = QPushButton("Régler les échéances…")
+        self.pay_btn.clicked.connect(self.pay_due)
+        btn_layout.addWidget(self.pay_btn)
         layout.addLayout(btn_layout)
 
         self.table = QTableWidget(0, 3)
@@ -131,7 +141,10 @@ class AchatWidget(QWidget):
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.table.cellClicked.connect(self.fill_fields_from_row)
+        self.table.verticalScrollBar().valueChanged.connect(self._on_scroll)
         layout.addWidget(self.table)
+        self._cursor: Optional[PurchaseCursor] = None
+        self._more = False
 
         self.load_purchases()
         self.attachment_path = None
@@ -147,13 +160,13 @@ class AchatWidget(QWidget):
 
     def load_suppliers(self) -> None:
         self.supplier_combo.clear()
-        with connect(db_path) as conn:
+        with connection(db_path) as conn:
             for sid, name in conn.execute("SELECT id, name FROM suppliers"):
                 self.supplier_combo.addItem(name, sid)
 
     def load_expense_accounts(self) -> None:
         self.account_combo.clear()
-        with connect(db_path) as conn:
+        with connection(db_path) as conn:
             cur = conn.execute("SELECT code, name FROM accounts WHERE code LIKE '6%'")
             for code, name in cur.fetchall():
                 self.account_combo.addItem(f"{code} {name}", code)
@@ -164,7 +177,7 @@ class AchatWidget(QWidget):
         self.load_expense_accounts()
 
     def get_next_inv(self) -> str:
-        with connect(db_path) as conn:
+        with connection(db_path) as conn:
             return next_sequence(conn, "AC", QDate.currentDate().year())
 
     def choose_file(self) -> None:
@@ -225,10 +238,9 @@ class AchatWidget(QWidget):
             if not name:
                 QMessageBox.warning(self, "Achat", "Fournisseur manquant")
                 return
-            with connect(db_path) as conn:
+            with connection(db_path) as conn:
                 supplier_id = _insert_supplier(conn, name)
-                conn.commit()
-            signals.supplier_changed.emit()
+            signals.supplier_changed.emit(None)
             self.load_suppliers()
             idx = self.supplier_combo.findData(supplier_id)
             if idx >= 0:
@@ -285,10 +297,9 @@ class AchatWidget(QWidget):
             if not name:
                 QMessageBox.warning(self, "Achat", "Fournisseur manquant")
                 return
-            with connect(db_path) as conn:
+            with connection(db_path) as conn:
                 supplier_id = _insert_supplier(conn, name)
-                conn.commit()
-            signals.supplier_changed.emit()
+            signals.supplier_changed.emit(None)
             self.load_suppliers()
             idx = self.supplier_combo.findData(supplier_id)
             if idx >= 0:
@@ -326,28 +337,99 @@ class AchatWidget(QWidget):
         delete_purchase(db_path, purchase_id)
         self.load_purchases()
 
+    @Slot()
+    def pay_due(self) -> None:
+        """Règle en une fois les achats échus à ce jour."""
+        today = QDate.currentDate().toString("yyyy-MM-dd")
+        due = get_due_purchases(db_path, today)
+        if not due:
+            QMessageBox.information(self, "Règlement", "Aucune échéance à régler")
+            return
+        total = sum(d.amount for d in due)
+        answer = QMessageBox.question(
+            self,
+            "Règlement",
+            f"Régler {len(due)} facture(s) pour {total:.2f} € par virement ?",
+        )
+        if answer != QMessageBox.Yes:
+            return
+        run = pay_due_purchases(db_path, today, "VIR")
+        QMessageBox.information(
+            self, "Règlement", f"{len(run.purchase_ids)} facture(s) réglée(s)"
+        )
+        self.load_purchases()
+
+    @Slot()
+    def import_file(self) -> None:
+        """Importe un fichier CSV/XLSX après une simulation à blanc."""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Importer des achats", str(Path.home()), "Achats (*.csv *.xlsx)"
+        )
+        if not path:
+            return
+        try:
+            report = import_purchases(db_path, path, dry_run=True)
+        except (ImportError, OSError, UnicodeDecodeError) as exc:
+            QMessageBox.warning(self, "Import", str(exc))
+            return
+        lines = [
+            f"{report.valid} achat(s) valide(s) sur {report.rows}",
+            f"{report.new_suppliers} fournisseur(s) et "
+            f"{report.new_accounts} compte(s) à créer",
+        ]
+        if report.issues:
+            lines.append(f"{len(report.issues)} ligne(s) ignorée(s) :")
+            lines += [f"  ligne {i.line} : {i.message}" for i in report.issues[:20]]
+        if not report.valid:
+            QMessageBox.warning(self, "Import", "\n".join(lines))
+            return
+        lines.append("Importer ?")
+        if QMessageBox.question(self, "Import", "\n".join(lines)) != QMessageBox.Yes:
+            return
+        report = import_purchases(db_path, path)
+        QMessageBox.information(
+            self, "Import", f"{report.imported} achat(s) importé(s)"
+        )
+        self.load_purchases()
+
     def load_purchases(self) -> None:
+        """Recharge la liste depuis sa première page."""
         self.table.setRowCount(0)
+        self._cursor, self._more = None, True
+        self.fetch_more()
+
+    def fetch_more(self) -> None:
+        """Ajoute la page d'achats suivante au tableau."""
+        if not self._more:
+            return
+        page = fetch_purchase_page(
+            db_path, PurchaseFilter(), self._cursor, columns=LIST_COLUMNS
+        )
+        self._cursor = page.next_cursor
+        self._more = page.next_cursor is not None
         today = QDate.currentDate()
-        for (
-            purchase_id,
-            date,
-            label,
-            amount,
-            due,
-            status,
-        ) in fetch_all_purchases(db_path):
+        self.table.setUpdatesEnabled(False)
+        try:
             row = self.table.rowCount()
-            self.table.insertRow(row)
-            item_date = QTableWidgetItem(date)
-            item_date.setData(Qt.UserRole, purchase_id)
-            self.table.setItem(row, 0, item_date)
-            self.table.setItem(row, 1, QTableWidgetItem(label))
-            amt_item = QTableWidgetItem(f"{amount:.2f}")
-            if QDate.fromString(due, "yyyy-MM-dd") < today and status == "A_PAYER":
-                for col in range(3):
-                    self.table.item(row, col).setForeground(Qt.red)
-            self.table.setItem(row, 2, amt_item)
+            self.table.setRowCount(row + len(page.rows))
+            for purchase_id, date, label, amount, due, status in page.rows:
+                item_date = QTableWidgetItem(date)
+                item_date.setData(Qt.UserRole, purchase_id)
+                self.table.setItem(row, 0, item_date)
+                self.table.setItem(row, 1, QTableWidgetItem(label))
+                self.table.setItem(row, 2, QTableWidgetItem(f"{amount:.2f}"))
+                if QDate.fromString(due, "yyyy-MM-dd") < today and status == "A_PAYER":
+                    for col in range(3):
+                        self.table.item(row, col).setForeground(Qt.red)
+                row += 1
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    @Slot(int)
+    def _on_scroll(self, value: int) -> None:
+        bar = self.table.verticalScrollBar()
+        if value >= bar.maximum() - bar.pageStep():
+            self.fetch_more()
 
     @Slot(int, int)
     def fill_fields_from_row(self, row: int, column: int) -> None:
@@ -360,7 +442,7 @@ class AchatWidget(QWidget):
             self.amount_spin.setValue(float(item_amount.text()))
             # restore other fields from DB
             pid = item_date.data(Qt.UserRole)
-            with connect(db_path) as conn:
+            with connection(db_path) as conn:
                 cur = conn.execute(
                     "SELECT supplier_id, piece, vat_rate, "
                     "account_code, due_date, attachment_path "
@@ -0,0 +1,154 @@
+"""Columnar result batches for large ledger queries.
+
+Reading a million lines as dataclass instances allocates a million objects
+plus their attribute storage.  :class:`Columns` keeps each column in one
+container instead:
+
+``"cents"`` / ``"int"``
+    ``array('q')`` of integers (amounts stay in cents).
+``"category"``
+    Dictionary-encoded text for low-cardinality columns such as accounts
+    and journals: an ``array('l')`` of codes plus the list of distinct
+    values.
+``"text"``
+    Plain list of strings.
+
+Aggregations (:meth:`Columns.sum_by`, :meth:`Columns.total`) walk the
+arrays directly.  :meth:`Columns.to_numpy` converts the batch when NumPy is
+installed; it is optional and only imported there.
+"""
+
+from __future__ import annotations
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+CENTS = "cents"
+INT = "int"
+CATEGORY = "category"
+TEXT = "text"
+KINDS = (CENTS, INT, CATEGORY, TEXT)
+
+FETCH_CHUNK_SIZE = 10000
+
+Column = Union[array, List[str]]
+
+
+class Columns:
+    """Named columns of equal length built from query rows."""
+
+    __slots__ = ("names", "kinds", "data", "categories", "_index")
+
+    def __init__(self, spec: Sequence[Tuple[str, str]]) -> None:
+        for name, kind in spec:
+            if kind not in KINDS:
+                raise ValueError(f"Unknown column kind {kind!r} for {name!r}")
+        self.names: Tuple[str, ...] = tuple(name for name, _ in spec)
+        self.kinds: Dict[str, str] = dict(spec)
+        self.data: Dict[str, Column] = {}
+        self.categories: Dict[str, List[str]] = {}
+        self._index: Dict[str, Dict[str, int]] = {}
+        for name, kind in spec:
+            if kind in (CENTS, INT):
+                self.data[name] = array("q")
+            elif kind == CATEGORY:
+                self.data[name] = array("l")
+                self.categories[name] = []
+                self._index[name] = {}
+            else:
+                self.data[name] = []
+
+    # ------------------------------------------------------------------
+    def extend(self, rows: Sequence[Sequence]) -> None:
+        """Append *rows*, tuples ordered like the column spec."""
+        for i, name in enumerate(self.names):
+            column = self.data[name]
+            if self.kinds[name] == CATEGORY:
+                index = self._index[name]
+                values = self.categories[name]
+                codes = []
+                for r in rows:
+                    value = r[i]
+                    code = index.get(value)
+                    if code is None:
+                        code = index[value] = len(values)
+                        values.append(value)
+                    codes.append(code)
+                column.extend(codes)
+            elif self.kinds[name] == TEXT:
+                column.extend(r[i] for r in rows)
+            else:
+                column.extend(r[i] or 0 for r in rows)
+
+    def __len__(self) -> int:
+        return len(self.data[self.names[0]]) if self.names else 0
+
+    def __getitem__(self, name: str) -> Column:
+        return self.data[name]
+
+    def values(self, name: str) -> List[str]:
+        """Return the decoded values of column *name*."""
+        if self.kinds[name] == CATEGORY:
+            values = self.categories[name]
+            return [values[c] for c in self.data[name]]
+        return list(self.data[name])
+
+    def rows(self) -> Iterator[tuple]:
+        """Yield the rows as tuples, decoding categories (for exports)."""
+        return zip(*(self._decoded(name) for name in self.names))
+
+    def _decoded(self, name: str) -> Iterable:
+        if self.kinds[name] == CATEGORY:
+            values = self.categories[name]
+            return (values[c] for c in self.data[name])
+        return iter(self.data[name])
+
+    # ------------------------------------------------------------------
+    def total(self, name: str) -> int:
+        """Return the sum of the integer column *name*."""
+        return sum(self.data[name])
+
+    def sum_by(self, key: str, *names: str) -> Dict[str, Tuple[int, ...]]:
+        """Return the totals of *names* per value of the category *key*."""
+        if self.kinds[key] != CATEGORY:
+            raise ValueError(f"{key!r} is not a category column")
+        categories = self.categories[key]
+        sums = [[0] * len(categories) for _ in names]
+        codes = self.data[key]
+        for acc, name in zip(sums, names):
+            for code, value in zip(codes, self.data[name]):
+                acc[code] += value
+        return {
+            value: tuple(acc[code] for acc in sums)
+            for code, value in enumerate(categories)
+        }
+
+    def to_numpy(self):
+        """Return a dict of NumPy arrays; categories stay encoded.
+
+        Integer columns are read-only views sharing the arrays' memory.
+
+        Raises :class:`ImportError` when NumPy is not installed.
+        """
+        import numpy as np
+
+        out = {}
+        for name in self.names:
+            column = self.data[name]
+            if self.kinds[name] == TEXT:
+                out[name] = np.array(column, dtype=object)
+            else:
+                out[name] = np.frombuffer(column, dtype=column.typecode)
+        return out
+
+
+def fetch_columns(
+    cursor, spec: Sequence[Tuple[str, str]], chunk_size: int = FETCH_CHUNK_SIZE
+) -> Columns:
+    """Drain the executed *cursor* into :class:`Columns`, *chunk_size* rows at a time."""
+    columns = Columns(spec)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return columns
+        columns.extend(rows)
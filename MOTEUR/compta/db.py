@@ -1,18 +1,354 @@
 from __future__ import annotations
 
+import atexit
+import os
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .events import BatchedDispatcher, ChangeSet, publish
 
 MEM_URI = "file:memdb1?mode=memory&cache=shared"
 
 
-def connect(db_path: Path | str) -> sqlite3.Connection:
-    """Return a SQLite connection with foreign keys enabled."""
+@dataclass(frozen=True)
+class StorageProfile:
+    """PRAGMA settings applied to a connection for a given workload."""
+
+    name: str
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size: int = -20000  # negative values are KiB
+    temp_store: str = "MEMORY"
+    wal_autocheckpoint: int = 1000
+
+
+# ``interactive`` lets the Qt views keep reading while a writer runs (WAL)
+# without paying a full fsync on every commit.  ``bulk`` is meant for imports
+# and exports: bigger cache and rarer checkpoints.  Both keep WAL with
+# ``synchronous=NORMAL`` so a crash during an import never corrupts the file,
+# and readers are never blocked by a long write.
+PROFILES: Dict[str, StorageProfile] = {
+    "interactive": StorageProfile("interactive"),
+    "bulk": StorageProfile(
+        "bulk",
+        cache_size=-200000,
+        wal_autocheckpoint=10000,
+    ),
+}
+DEFAULT_PROFILE = "interactive"
+
+# Pooled connections keyed by (thread id, database key).  Each entry holds the
+# connection, the nesting depth of :func:`connection` blocks using it and the
+# name of the storage profile currently applied.
+_pool: Dict[Tuple[int, str], list] = {}
+_pool_lock = threading.Lock()
+
+# Schema steps already run in this process, per database key.  See
+# :func:`bootstrap`.
+_bootstrapped: Dict[str, Set[Callable]] = {}
+_bootstrap_lock = threading.Lock()
+
+# Per-database caches of other modules, see :func:`db_cache`.
+_caches: List[Dict[str, Any]] = [_bootstrapped]
+
+
+class Connection(sqlite3.Connection):
+    """SQLite connection remembering which database it was opened on.
+
+    ``db_key`` identifies the database file (or shared memory URI) so that
+    per-database caches can be looked up from a connection alone.
+    ``pending_events`` holds the events of the open :func:`connection`
+    block, see :func:`publish_after_commit`.
+    """
+
+    db_key: str = ""
+    pending_events: Optional[BatchedDispatcher] = None
+
+
+def db_key(db_path: Path | str) -> str:
+    """Return the key identifying *db_path* in per-database caches."""
+    return _target(db_path)[0]
+
+
+def db_cache() -> Dict[str, Any]:
+    """Return a new cache keyed by :func:`db_key`, emptied by :func:`close`.
+
+    Whatever a module caches about a database must go once its connections
+    are closed: the file may be replaced and an in-memory database is gone.
+    """
+    cache: Dict[str, Any] = {}
+    _caches.append(cache)
+    return cache
+
+
+def _target(db_path: Path | str) -> Tuple[str, bool]:
+    """Return the sqlite3 target string and whether it is a URI."""
     db_str = str(db_path)
     if db_str == ":memory:":
-        conn = sqlite3.connect(MEM_URI, uri=True)
-    else:
-        conn = sqlite3.connect(db_str, uri=db_str.startswith("file:"))
+        return MEM_URI, True
+    if db_str.startswith("file:"):
+        return db_str, True
+    return os.path.abspath(db_str), False
+
+
+def _open(db_path: Path | str, *, check_same_thread: bool = True) -> sqlite3.Connection:
+    target, uri = _target(db_path)
+    conn = sqlite3.connect(
+        target,
+        uri=uri,
+        check_same_thread=check_same_thread,
+        factory=Connection,
+    )
+    conn.db_key = target
     conn.execute("PRAGMA foreign_keys = ON")
     conn.row_factory = sqlite3.Row
     return conn
+
+
+def apply_profile(conn: sqlite3.Connection, profile: str | StorageProfile) -> None:
+    """Apply the PRAGMA settings of *profile* to *conn*.
+
+    In-memory databases silently keep their ``memory`` journal mode.
+    """
+    if isinstance(profile, str):
+        try:
+            profile = PROFILES[profile]
+        except KeyError:
+            raise ValueError(f"Unknown storage profile: {profile}") from None
+    conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+    conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    conn.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+    conn.execute(f"PRAGMA wal_autocheckpoint = {int(profile.wal_autocheckpoint)}")
+
+
+def connect(db_path: Path | str) -> sqlite3.Connection:
+    """Return a SQLite connection with foreign keys enabled."""
+    return _open(db_path)
+
+
+def _prune_dead_threads() -> None:
+    """Close pooled connections owned by threads that have exited."""
+    alive = {t.ident for t in threading.enumerate()}
+    for key in [k for k in _pool if k[0] not in alive]:
+        _pool.pop(key)[0].close()
+
+
+@contextmanager
+def connection(
+    db_path: Path | str, profile: Optional[str] = None, *, immediate: bool = False
+) -> Iterator[sqlite3.Connection]:
+    """Yield the pooled connection of the calling thread for *db_path*.
+
+    The connection is opened on first use and kept for later calls, so the
+    ``PRAGMA`` setup runs once per thread and database.  Blocks may be nested:
+    only the outermost one commits on success or rolls back on error, so
+    code inside a block never commits itself.
+
+    With *immediate*, a block that does not already run in a transaction
+    opens one with ``BEGIN IMMEDIATE``: what it reads cannot be changed by
+    another writer before it commits.
+
+    *profile* selects a :data:`PROFILES` entry for the duration of the
+    outermost block; the previous profile is restored afterwards.  Nested
+    blocks always run with the profile of the outer one.
+    """
+    key = (threading.get_ident(), _target(db_path)[0])
+    with _pool_lock:
+        entry = _pool.get(key)
+        if entry is None:
+            _prune_dead_threads()
+            conn = _open(db_path, check_same_thread=False)
+            apply_profile(conn, DEFAULT_PROFILE)
+            entry = [conn, 0, DEFAULT_PROFILE]
+            _pool[key] = entry
+    conn = entry[0]
+    previous = entry[2]
+    switch = entry[1] == 0 and profile is not None and profile != previous
+    if switch:
+        apply_profile(conn, profile)
+        entry[2] = profile
+    if entry[1] == 0:
+        conn.pending_events = BatchedDispatcher()
+    entry[1] += 1
+    try:
+        if immediate and not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        yield conn
+    except BaseException:
+        if entry[1] == 1:
+            conn.pending_events = None
+            if conn.in_transaction:
+                conn.rollback()
+        raise
+    else:
+        if entry[1] == 1:
+            if conn.in_transaction:
+                conn.commit()
+            pending, conn.pending_events = conn.pending_events, None
+            pending.flush()
+    finally:
+        entry[1] -= 1
+        if switch:
+            apply_profile(conn, previous)
+            entry[2] = previous
+
+
+def publish_after_commit(
+    conn: sqlite3.Connection, event: str, changes: Optional[ChangeSet] = None
+) -> None:
+    """Publish *event* once the outermost :func:`connection` block commits.
+
+    Listeners reload from the database, so they must not hear of rows that
+    are not committed yet or that a rollback discards.  The events of one
+    block are merged per name and dropped if it fails.  Outside a pooled
+    block, *event* is published at once.
+    """
+    pending = getattr(conn, "pending_events", None)
+    if pending is None:
+        publish(event, changes)
+    else:
+        pending.publish(event, changes)
+
+
+def storage_diagnostics(db_path: Path | str) -> Dict[str, object]:
+    """Return the storage settings in effect for this thread's connection."""
+    with connection(db_path) as conn:
+        info: Dict[str, object] = {
+            "profile": _pool[(threading.get_ident(), _target(db_path)[0])][2],
+        }
+        for pragma in (
+            "journal_mode",
+            "synchronous",
+            "mmap_size",
+            "cache_size",
+            "page_size",
+            "temp_store",
+            "wal_autocheckpoint",
+        ):
+            info[pragma] = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        return info
+
+
+def bootstrap(db_path: Path | str, *steps: Callable) -> None:
+    """Run each schema *step* on *db_path* once per process.
+
+    A step is a callable taking a connection and issuing idempotent DDL
+    (the ``_create_schema``/``_create_view`` helpers).  Steps already run
+    against the database are skipped without opening a connection, so the
+    ``init_db``/``init_view`` wrappers cost a dictionary lookup after the
+    first call and may sit on read paths.
+    """
+    key = db_key(db_path)
+    done = _bootstrapped.get(key)
+    if done is not None and done.issuperset(steps):
+        return
+    with _bootstrap_lock:
+        done = _bootstrapped.setdefault(key, set())
+        pending = [s for s in steps if s not in done]
+        if not pending:
+            return
+        with connection(db_path) as conn:
+            for step in pending:
+                step(conn)
+        done.update(pending)
+
+
+def mark_bootstrapped(db_path: Path | str, steps: Iterable[Callable]) -> None:
+    """Record *steps* as run on *db_path*, e.g. after a migration."""
+    with _bootstrap_lock:
+        _bootstrapped.setdefault(db_key(db_path), set()).update(steps)
+
+
+def close(db_path: Path | str) -> None:
+    """Close every pooled connection to *db_path*.
+
+    The bootstrap cache and the :func:`db_cache` entries of the database
+    are dropped as well, since an in-memory database does not outlive its
+    connections.
+    """
+    target = _target(db_path)[0]
+    for cache in _caches:
+        cache.pop(target, None)
+    with _pool_lock:
+        for key in [k for k in _pool if k[1] == target]:
+            _pool.pop(key)[0].close()
+
+
+def close_all() -> None:
+    """Close all pooled connections.  Called automatically at exit."""
+    for cache in _caches:
+        cache.clear()
+    with _pool_lock:
+        while _pool:
+            _pool.popitem()[1][0].close()
+
+
+atexit.register(close_all)
+
+
+def migrate_to_cents(
+    conn: sqlite3.Connection,
+    table: str,
+    create_sql: str,
+    money_columns: Tuple[str, ...],
+) -> bool:
+    """Rebuild *table* so that *money_columns* hold integer cents.
+
+    Tables created before amounts were stored as cents declare those columns
+    ``REAL``.  SQLite cannot change a column type in place, so the table is
+    recreated from *create_sql*, rows are copied with amounts multiplied by
+    100 and the AUTOINCREMENT sequence is preserved.  Views are dropped
+    while the table is replaced and recreated from their stored definition
+    afterwards: :func:`bootstrap` may already have recorded their
+    ``init_view`` helpers as run.  Return True if the table was rebuilt.
+    """
+    info = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    types = {r[1]: r[2].upper() for r in info}
+    if not any(types.get(c) == "REAL" for c in money_columns):
+        return False
+    views = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type='view' ORDER BY rowid"
+    ).fetchall()
+    for view, _ in views:
+        conn.execute(f"DROP VIEW IF EXISTS {view}")
+    tmp = f"{table}_cents"
+    conn.execute(f"DROP TABLE IF EXISTS {tmp}")
+    conn.execute(
+        create_sql.replace(
+            f"CREATE TABLE IF NOT EXISTS {table}", f"CREATE TABLE {tmp}"
+        )
+    )
+    new_cols = [r[1] for r in conn.execute(f"PRAGMA table_info({tmp})")]
+    cols = [c for c in new_cols if c in types]
+    select = ", ".join(
+        f"CAST(ROUND({c} * 100) AS INTEGER)" if c in money_columns else c
+        for c in cols
+    )
+    conn.execute(
+        f"INSERT INTO {tmp} ({', '.join(cols)}) SELECT {select} FROM {table}"
+    )
+    seq = conn.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name=?", (table,)
+    ).fetchone()
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {tmp} RENAME TO {table}")
+    if seq:
+        cur = conn.execute(
+            "UPDATE sqlite_sequence SET seq=MAX(seq, ?) WHERE name=?",
+            (seq[0], table),
+        )
+        if not cur.rowcount:
+            conn.execute(
+                "INSERT INTO sqlite_sequence(name, seq) VALUES (?, ?)",
+                (table, seq[0]),
+            )
+    for _, sql in views:
+        conn.execute(sql)
+    return True
@@ -0,0 +1,175 @@
+"""Change notifications published by the database layer.
+
+The ledger and purchase functions report changes through the process wide
+dispatcher returned by :func:`get_dispatcher` instead of talking to Qt
+directly, so they can be imported and run without PySide6.  Three backends
+are provided:
+
+``NullDispatcher``
+    Drops every event.  Default for headless jobs.
+``QtDispatcher``
+    Re-emits events on the ``achats.signals`` QObject.  Installed when that
+    module is imported, i.e. as soon as a widget listens for changes.
+``BatchedDispatcher``
+    Collects events and forwards one per name on :meth:`flush`.  Use it
+    through :func:`batched` around bulk jobs.
+
+Functions writing inside a transaction do not publish directly: they hand
+their events to :func:`MOTEUR.compta.db.publish_after_commit`, which holds
+them until the outermost ``connection()`` block commits.
+
+Each event carries a :class:`ChangeSet` naming what was touched, or
+``None`` when the scope is unknown and listeners should reload everything.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, Optional, Set
+
+ENTRY_CHANGED = "entry_changed"
+SUPPLIER_CHANGED = "supplier_changed"
+EVENTS = (ENTRY_CHANGED, SUPPLIER_CHANGED)
+
+
+@dataclass
+class ChangeSet:
+    """Rows affected by a change, so views can refresh only those."""
+
+    entries: Set[int] = field(default_factory=set)
+    accounts: Set[str] = field(default_factory=set)
+    suppliers: Set[int] = field(default_factory=set)
+    purchases: Set[int] = field(default_factory=set)
+
+    def update(self, other: "ChangeSet") -> "ChangeSet":
+        """Add the ids of *other* to this change set and return it."""
+        self.entries |= other.entries
+        self.accounts |= other.accounts
+        self.suppliers |= other.suppliers
+        self.purchases |= other.purchases
+        return self
+
+
+def entry_changes(entry_ids: Iterable[int], accounts: Iterable[str]) -> ChangeSet:
+    """Return the change set of entries posted or removed on *accounts*."""
+    return ChangeSet(entries=set(entry_ids), accounts=set(accounts))
+
+
+def supplier_changes(
+    supplier_ids: Iterable[Optional[int]], purchase_ids: Iterable[int] = ()
+) -> ChangeSet:
+    """Return the change set of *supplier_ids*, ignoring missing ones."""
+    return ChangeSet(
+        suppliers={s for s in supplier_ids if s is not None},
+        purchases=set(purchase_ids),
+    )
+
+
+class NullDispatcher:
+    """Dispatcher discarding every event."""
+
+    def publish(self, event: str, changes: Optional[ChangeSet] = None) -> None:
+        pass
+
+
+class QtDispatcher:
+    """Dispatcher forwarding events to the Qt signals of *target*.
+
+    *target* is a QObject exposing one ``Signal(object)`` per event name;
+    the change set is passed as the signal argument.
+    """
+
+    def __init__(self, target) -> None:
+        self.target = target
+
+    def publish(self, event: str, changes: Optional[ChangeSet] = None) -> None:
+        getattr(self.target, event).emit(changes)
+
+
+class BatchedDispatcher:
+    """Dispatcher coalescing events until :meth:`flush` is called.
+
+    However many times an event is published, *target* receives it once,
+    in order of first publication, with the union of the change sets.  A
+    ``None`` change set makes the merged one ``None`` too.  Without
+    *target*, flushed events go back through :func:`publish`.
+    """
+
+    def __init__(self, target=None) -> None:
+        self.target = target
+        self._pending: Dict[str, Optional[ChangeSet]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event: str, changes: Optional[ChangeSet] = None) -> None:
+        with self._lock:
+            if event not in self._pending:
+                self._pending[event] = (
+                    ChangeSet().update(changes) if changes is not None else None
+                )
+            elif changes is None:
+                self._pending[event] = None
+            elif self._pending[event] is not None:
+                self._pending[event].update(changes)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        target = self.target
+        for event, changes in pending.items():
+            if target is None:
+                publish(event, changes)
+            else:
+                target.publish(event, changes)
+
+
+_dispatcher = NullDispatcher()
+_dispatcher_lock = threading.Lock()
+# Batch opened by :func:`batched` in the current thread, if any.
+_local = threading.local()
+
+
+def get_dispatcher():
+    """Return the dispatcher receiving database change events."""
+    return _dispatcher
+
+
+def set_dispatcher(dispatcher: Optional[object]) -> object:
+    """Install *dispatcher* (``None`` for a null one) and return the previous."""
+    global _dispatcher
+    with _dispatcher_lock:
+        previous = _dispatcher
+        _dispatcher = dispatcher if dispatcher is not None else NullDispatcher()
+    return previous
+
+
+def publish(event: str, changes: Optional[ChangeSet] = None) -> None:
+    """Publish *event* with its *changes* through the current dispatcher.
+
+    Inside a :func:`batched` block of the calling thread the event goes to
+    that batch instead.
+    """
+    batch = getattr(_local, "batch", None)
+    (batch if batch is not None else _dispatcher).publish(event, changes)
+
+
+@contextmanager
+def batched() -> Iterator[BatchedDispatcher]:
+    """Coalesce the events published by this thread inside the block.
+
+    They are collected in a :class:`BatchedDispatcher` and the current
+    dispatcher gets one event per name when the block exits, even on error
+    since part of the work may have been committed.  Other threads keep
+    publishing directly.  Nested blocks simply add to the outer batch.
+    """
+    batch = getattr(_local, "batch", None)
+    if batch is not None:
+        yield batch
+        return
+    batch = _local.batch = BatchedDispatcher()
+    try:
+        yield batch
+    finally:
+        _local.batch = None
+        batch.flush()
@@ -1,10 +1,34 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from typing import List, Optional, Union
 
+Amount = Union[int, float, str, Decimal]
 
-@dataclass
+
+def to_cents(amount: Optional[Amount]) -> int:
+    """Convert an amount in euros to integer cents, rounding half up.
+
+    Amounts are stored as cents in the database; this and :func:`from_cents`
+    are the only places where money changes representation.
+    """
+    if amount is None:
+        return 0
+    return int((Decimal(str(amount)) * 100).quantize(Decimal(1), ROUND_HALF_UP))
+
+
+def from_cents(cents: Optional[int]) -> float:
+    """Convert integer *cents* from the database back to euros."""
+    return (cents or 0) / 100
+
+
+def to_decimal(cents: Optional[int]) -> Decimal:
+    """Return *cents* as an exact :class:`~decimal.Decimal` amount in euros."""
+    return Decimal(cents or 0).scaleb(-2)
+
+
+@dataclass(slots=True)
 class Supplier:
     """Supplier information."""
 
@@ -14,7 +38,7 @@ class Supplier:
     address: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Purchase:
     """Purchase record.
 
@@ -42,9 +66,10 @@ class Purchase:
     attachment_path: Optional[str] = None
     created_by: Optional[str] = None
     updated_at: Optional[str] = None
+    paid_amount: float = 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class EntryLine:
     """Accounting entry line."""
 
@@ -54,7 +79,20 @@ class EntryLine:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
+class Entry:
+    """Accounting entry with its lines, used for bulk ingestion."""
+
+    journal: str
+    date: str
+    ref: Optional[str] = None
+    memo: Optional[str] = None
+    lines: List[EntryLine] = field(default_factory=list)
+    purchase_id: Optional[int] = None
+    supplier_id: Optional[int] = None
+
+
+@dataclass(slots=True)
 class PurchaseFilter:
     """Filters for querying purchases."""
 
@@ -64,7 +102,45 @@ class PurchaseFilter:
     status: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
+class PurchaseCursor:
+    """Position after the last purchase of a page, in (date, id) order."""
+
+    date: str
+    id: int
+
+
+@dataclass(slots=True)
+class PurchasePage:
+    """One page of purchases; ``next_cursor`` is ``None`` on the last page."""
+
+    rows: List = field(default_factory=list)
+    next_cursor: Optional[PurchaseCursor] = None
+
+
+@dataclass(slots=True)
+class DuePurchase:
+    """Purchase left to pay, with the third-party account it was booked on."""
+
+    id: int
+    supplier_id: int
+    piece: str
+    due_date: str
+    amount: float
+    account: str
+
+
+@dataclass(slots=True)
+class PaymentRun:
+    """Outcome of a batch payment run."""
+
+    payment_date: str
+    purchase_ids: List[int] = field(default_factory=list)
+    entry_ids: List[int] = field(default_factory=list)
+    total: float = 0.0
+
+
+@dataclass(slots=True)
 class VatLine:
     """VAT summary line."""
 
@@ -0,0 +1,35 @@
+from .statements import (
+    BALANCE_SHEET,
+    INCOME_STATEMENT,
+    FinancialStatement,
+    StatementRow,
+    export_statements,
+    get_balance_sheet,
+    get_financial_statements,
+    get_income_statement,
+)
+
+__all__ = [
+    "BALANCE_SHEET",
+    "INCOME_STATEMENT",
+    "FinancialStatement",
+    "StatementRow",
+    "StatementWidget",
+    "export_statements",
+    "get_balance_sheet",
+    "get_financial_statements",
+    "get_income_statement",
+]
+
+_WIDGETS = {
+    "StatementWidget": "statement_widget",
+}
+
+
+def __getattr__(name):
+    # Widgets load PySide6; import them on first access only.
+    if name in _WIDGETS:
+        from importlib import import_module
+
+        return getattr(import_module(f".{_WIDGETS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
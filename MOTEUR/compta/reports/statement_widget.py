@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from PySide6.QtCore import Qt, Slot
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from ..achats.signals import signals as achat_signals
+from .statements import (
+    BALANCE_SHEET,
+    FinancialStatement,
+    export_statements,
+    get_financial_statements,
+)
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DB_PATH = BASE_DIR / "compta.db"
+
+TITLES = {BALANCE_SHEET: "Bilan", "resultat": "Compte de résultat"}
+
+
+class StatementWidget(QWidget):
+    """Bilan ou compte de résultat d'un exercice, comparé au précédent.
+
+    Les écritures passées pendant que la page est cachée ne sont prises en
+    compte qu'à son prochain affichage.
+    """
+
+    def __init__(self, kind: str, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.kind = kind
+        self._stale = False
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addWidget(QLabel(TITLES[kind]))
+        top.addStretch()
+        top.addWidget(QLabel("Exercice :"))
+        self.year_spin = QSpinBox()
+        self.year_spin.setRange(1900, 2999)
+        self.year_spin.setValue(date.today().year)
+        self.year_spin.valueChanged.connect(self.refresh)
+        top.addWidget(self.year_spin)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, 3)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        btn_row = QHBoxLayout()
+        export_btn = QPushButton("Exporter CSV")
+        export_btn.clicked.connect(self.export_csv)
+        refresh_btn = QPushButton("Rafraîchir")
+        refresh_btn.clicked.connect(self.refresh)
+        btn_row.addStretch()
+        btn_row.addWidget(export_btn)
+        btn_row.addWidget(refresh_btn)
+        layout.addLayout(btn_row)
+
+        achat_signals.entry_changed.connect(self.on_entry_changed)
+        self.refresh()
+
+    # ------------------------------------------------------------------
+    @Slot()
+    def refresh(self) -> None:
+        """Recalcule l'état de l'exercice choisi."""
+        self._stale = False
+        year = self.year_spin.value()
+        statements = get_financial_statements(DB_PATH, year)
+        self.show_statement(statements[0 if self.kind == BALANCE_SHEET else 1])
+
+    @Slot(object)
+    def on_entry_changed(self, changes) -> None:
+        if self.isVisible():
+            self.refresh()
+        else:
+            self._stale = True
+
+    def showEvent(self, event) -> None:  # noqa: N802 - Qt override
+        if self._stale:
+            self.refresh()
+        super().showEvent(event)
+
+    def show_statement(self, statement: FinancialStatement) -> None:
+        year = statement.year
+        self.table.setHorizontalHeaderLabels(["Poste", str(year), str(year - 1)])
+        self.table.setRowCount(0)
+        section = None
+        for row in statement.rows:
+            if row.section != section:
+                if section is not None:
+                    self._add_row(f"Total {section.lower()}", *statement.total(section), bold=True)
+                section = row.section
+                self._add_row(section, bold=True)
+            self._add_row(row.label, row.current, row.previous)
+        if section is not None:
+            self._add_row(f"Total {section.lower()}", *statement.total(section), bold=True)
+        if statement.kind != BALANCE_SHEET:
+            self._add_row("Résultat", *statement.result(), bold=True)
+        self.table.resizeColumnToContents(0)
+
+    def _add_row(
+        self,
+        label: str,
+        current: Optional[float] = None,
+        previous: Optional[float] = None,
+        bold: bool = False,
+    ) -> None:
+        r = self.table.rowCount()
+        self.table.insertRow(r)
+        items = [QTableWidgetItem(label)]
+        for value in (current, previous):
+            item = QTableWidgetItem("" if value is None else f"{value:.2f}")
+            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            items.append(item)
+        for c, item in enumerate(items):
+            if bold:
+                font = QFont(item.font())
+                font.setBold(True)
+                item.setFont(font)
+            self.table.setItem(r, c, item)
+
+    # ------------------------------------------------------------------
+    @Slot()
+    def export_csv(self) -> None:
+        year = self.year_spin.value()
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Exporter CSV", str(Path.home() / f"etats_{year}.csv"), "CSV (*.csv)"
+        )
+        if path:
+            export_statements(DB_PATH, year, path)
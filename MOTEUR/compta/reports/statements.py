@@ -0,0 +1,268 @@
+"""Balance sheet (bilan) and income statement (compte de résultat).
+
+Both statements of a fiscal year and of the previous one come from a single
+aggregate query over the monthly ``account_period_balances`` snapshots of
+classes 1 to 7, grouped by account.  Each account is then assigned to the
+layout line with the longest matching code prefix; lines restricted to a
+debit or credit balance split the third-party and bank accounts between
+assets and liabilities.
+
+Balance-sheet amounts start after the last fiscal year closed before the
+one reported, whose carry-forward entry already holds the earlier years,
+the same window :func:`~MOTEUR.compta.accounting.db.close_fiscal_year` uses.
+The result of classes 6 and 7 over that window is shown on the
+"Résultat de l'exercice" line, so both sides always balance.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..accounting.db import closed_years
+from ..db import connection
+from ..models import from_cents
+
+BALANCE_SHEET = "bilan"
+INCOME_STATEMENT = "resultat"
+
+ACTIF = "Actif"
+PASSIF = "Passif"
+CHARGES = "Charges"
+PRODUITS = "Produits"
+
+
+@dataclass(frozen=True, slots=True)
+class LayoutLine:
+    """Line of a statement layout.
+
+    *sign* is 1 for lines read as debit minus credit, -1 for the opposite.
+    *only* restricts the line to accounts with a ``"debit"`` or ``"credit"``
+    balance.
+    """
+
+    section: str
+    label: str
+    prefixes: Tuple[str, ...]
+    sign: int
+    only: Optional[str] = None
+
+
+RESULT_LABEL = "Résultat de l'exercice"
+
+BALANCE_SHEET_LAYOUT: Tuple[LayoutLine, ...] = (
+    LayoutLine(ACTIF, "Immobilisations incorporelles", ("20", "280", "290"), 1),
+    LayoutLine(ACTIF, "Immobilisations corporelles", ("2", "281", "291"), 1),
+    LayoutLine(ACTIF, "Immobilisations financières", ("26", "27", "296", "297"), 1),
+    LayoutLine(ACTIF, "Stocks et en-cours", ("3",), 1),
+    LayoutLine(ACTIF, "Créances clients", ("41",), 1, "debit"),
+    LayoutLine(ACTIF, "Autres créances", ("4",), 1, "debit"),
+    LayoutLine(ACTIF, "Disponibilités", ("5",), 1, "debit"),
+    LayoutLine(PASSIF, "Capital et réserves", ("1", "10", "11"), -1),
+    LayoutLine(PASSIF, RESULT_LABEL, ("12",), -1),
+    LayoutLine(PASSIF, "Provisions", ("14", "15"), -1),
+    LayoutLine(PASSIF, "Emprunts et dettes financières", ("16", "17"), -1),
+    LayoutLine(PASSIF, "Dettes fournisseurs", ("40",), -1, "credit"),
+    LayoutLine(PASSIF, "Dettes fiscales et sociales", ("42", "43", "44"), -1, "credit"),
+    LayoutLine(PASSIF, "Autres dettes", ("4",), -1, "credit"),
+    LayoutLine(PASSIF, "Concours bancaires", ("5",), -1, "credit"),
+)
+
+INCOME_STATEMENT_LAYOUT: Tuple[LayoutLine, ...] = (
+    LayoutLine(CHARGES, "Achats de marchandises", ("607", "6037"), 1),
+    LayoutLine(CHARGES, "Achats et charges externes", ("60", "61", "62"), 1),
+    LayoutLine(CHARGES, "Impôts et taxes", ("63",), 1),
+    LayoutLine(CHARGES, "Charges de personnel", ("64",), 1),
+    LayoutLine(CHARGES, "Dotations aux amortissements et provisions", ("68",), 1),
+    LayoutLine(CHARGES, "Autres charges", ("6", "65"), 1),
+    LayoutLine(CHARGES, "Charges financières", ("66", "686"), 1),
+    LayoutLine(CHARGES, "Charges exceptionnelles", ("67", "687"), 1),
+    LayoutLine(CHARGES, "Impôt sur les bénéfices", ("69",), 1),
+    LayoutLine(PRODUITS, "Ventes de marchandises", ("707",), -1),
+    LayoutLine(PRODUITS, "Production vendue", ("70",), -1),
+    LayoutLine(PRODUITS, "Subventions d'exploitation", ("74",), -1),
+    LayoutLine(PRODUITS, "Autres produits", ("7", "71", "72", "75", "78"), -1),
+    LayoutLine(PRODUITS, "Produits financiers", ("76", "786"), -1),
+    LayoutLine(PRODUITS, "Produits exceptionnels", ("77", "787"), -1),
+)
+
+# One pass over the monthly snapshots of both years.  Columns are the net
+# (debit - credit) cents of the balance-sheet window and of the fiscal year,
+# for the reported year then the previous one.
+SQL_STATEMENT_TOTALS = """
+SELECT account,
+       SUM(CASE WHEN period >= ? THEN debit - credit ELSE 0 END),
+       SUM(CASE WHEN period >= ? THEN debit - credit ELSE 0 END),
+       SUM(CASE WHEN period BETWEEN ? AND ? THEN debit - credit ELSE 0 END),
+       SUM(CASE WHEN period BETWEEN ? AND ? THEN debit - credit ELSE 0 END)
+FROM account_period_balances
+WHERE period BETWEEN ? AND ? AND account >= '1' AND account < '8'
+GROUP BY account
+"""
+
+
+@dataclass(slots=True)
+class StatementRow:
+    section: str
+    label: str
+    current: float
+    previous: float
+
+
+@dataclass(slots=True)
+class FinancialStatement:
+    """Rows of a statement for *year*, with the previous year alongside."""
+
+    kind: str
+    year: int
+    rows: List[StatementRow]
+
+    def total(self, section: str) -> Tuple[float, float]:
+        """Return the (current, previous) totals of *section*."""
+        rows = [r for r in self.rows if r.section == section]
+        return (
+            round(sum(r.current for r in rows), 2),
+            round(sum(r.previous for r in rows), 2),
+        )
+
+    def result(self) -> Tuple[float, float]:
+        """Return the (current, previous) result of an income statement."""
+        income, charges = self.total(PRODUITS), self.total(CHARGES)
+        return (
+            round(income[0] - charges[0], 2),
+            round(income[1] - charges[1], 2),
+        )
+
+
+def _window_start(year: int, closed) -> str:
+    previous = max((y for y in closed if y < year), default=None)
+    return f"{previous + 1:04d}-01" if previous is not None else "0000-01"
+
+
+def _statement_params(year: int, closed) -> Tuple[str, ...]:
+    start, prev_start = _window_start(year, closed), _window_start(year - 1, closed)
+    end, prev_end = f"{year:04d}-12", f"{year - 1:04d}-12"
+    return (
+        start,
+        f"{year:04d}-01",
+        prev_start, prev_end,
+        f"{year - 1:04d}-01", prev_end,
+        prev_start, end,
+    )
+
+
+class _Classifier:
+    """Assign accounts to the layout line with the longest matching prefix."""
+
+    def __init__(self, layout: Sequence[LayoutLine]) -> None:
+        self.layout = layout
+        self._cache: Dict[Tuple[str, str], Optional[int]] = {}
+
+    def line(self, account: str, cents: int) -> Optional[int]:
+        side = "debit" if cents >= 0 else "credit"
+        key = (account, side)
+        if key not in self._cache:
+            best, best_len = None, 0
+            for i, line in enumerate(self.layout):
+                if line.only not in (None, side):
+                    continue
+                for prefix in line.prefixes:
+                    if len(prefix) > best_len and account.startswith(prefix):
+                        best, best_len = i, len(prefix)
+            self._cache[key] = best
+        return self._cache[key]
+
+
+def _build(
+    kind: str, year: int, layout: Sequence[LayoutLine], amounts
+) -> FinancialStatement:
+    """Fold ``(account, current_cents, previous_cents)`` into *layout*."""
+    totals = [[0, 0] for _ in layout]
+    classifier = _Classifier(layout)
+    for account, *cents in amounts:
+        for col, value in enumerate(cents):
+            if not value:
+                continue
+            i = classifier.line(account, value)
+            if i is not None:
+                totals[i][col] += value
+    rows = [
+        StatementRow(
+            line.section,
+            line.label,
+            from_cents(line.sign * cur),
+            from_cents(line.sign * prev),
+        )
+        for line, (cur, prev) in zip(layout, totals)
+    ]
+    return FinancialStatement(kind, year, rows)
+
+
+def get_financial_statements(
+    db_path: Path | str, year: int
+) -> Tuple[FinancialStatement, FinancialStatement]:
+    """Return the balance sheet and income statement of *year*.
+
+    Each row carries the amount of *year* and of ``year - 1``.
+    """
+    closed = closed_years(db_path)
+    with connection(db_path) as conn:
+        rows = conn.execute(
+            SQL_STATEMENT_TOTALS, _statement_params(year, closed)
+        ).fetchall()
+    sheet, income = [], []
+    window_result = [0, 0]
+    for account, bs_cur, pl_cur, bs_prev, pl_prev in rows:
+        if account[0] in "67":
+            income.append((account, pl_cur, pl_prev))
+            window_result[0] += bs_cur
+            window_result[1] += bs_prev
+        else:
+            sheet.append((account, bs_cur, bs_prev))
+    # Result of the window, booked on 12 like the closing entry would do.
+    sheet.append(("12", *window_result))
+    return (
+        _build(BALANCE_SHEET, year, BALANCE_SHEET_LAYOUT, sheet),
+        _build(INCOME_STATEMENT, year, INCOME_STATEMENT_LAYOUT, income),
+    )
+
+
+def get_balance_sheet(db_path: Path | str, year: int) -> FinancialStatement:
+    """Return the balance sheet of *year* (see :func:`get_financial_statements`)."""
+    return get_financial_statements(db_path, year)[0]
+
+
+def get_income_statement(db_path: Path | str, year: int) -> FinancialStatement:
+    """Return the income statement of *year* (see :func:`get_financial_statements`)."""
+    return get_financial_statements(db_path, year)[1]
+
+
+STATEMENT_CSV_HEADER = ["Etat", "Rubrique", "Poste", "N", "N-1"]
+
+
+def export_statements(db_path: Path | str, year: int, dest: Path | str) -> int:
+    """Write both statements of *year* to the CSV file *dest*.
+
+    Meant for headless use (scripts, scheduled jobs); return the number of
+    rows written, totals excluded.
+    """
+    count = 0
+    with open(dest, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh, delimiter=";")
+        writer.writerow(STATEMENT_CSV_HEADER)
+        for statement in get_financial_statements(db_path, year):
+            for row in statement.rows:
+                writer.writerow(
+                    [statement.kind, row.section, row.label,
+                     f"{row.current:.2f}", f"{row.previous:.2f}"]
+                )
+                count += 1
+            for section in dict.fromkeys(r.section for r in statement.rows):
+                cur, prev = statement.total(section)
+                writer.writerow(
+                    [statement.kind, section, f"Total {section.lower()}",
+                     f"{cur:.2f}", f"{prev:.2f}"]
+                )
+    return count
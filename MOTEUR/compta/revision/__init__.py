@@ -1,17 +1,45 @@
-from .revision_tab import RevisionTab
 from .revision_services import (
     get_accounts_with_balance,
     get_account_transactions,
+    get_trial_balance,
+    get_ledger_page,
+    iter_ledger,
     init_view,
     AccTransaction,
+    LedgerCursor,
+    LedgerPage,
+    TrialBalanceLine,
 )
-from .transactions_dialog import AccountTransactionsDialog
 
 __all__ = [
     "RevisionTab",
     "get_accounts_with_balance",
     "get_account_transactions",
+    "get_trial_balance",
+    "get_ledger_page",
+    "iter_ledger",
     "init_view",
     "AccTransaction",
+    "LedgerCursor",
+    "LedgerPage",
+    "TrialBalanceLine",
     "AccountTransactionsDialog",
+    "GrandLivreWidget",
+    "LedgerTable",
 ]
+
+_WIDGETS = {
+    "RevisionTab": "revision_tab",
+    "AccountTransactionsDialog": "transactions_dialog",
+    "GrandLivreWidget": "grand_livre",
+    "LedgerTable": "ledger_table",
+}
+
+
+def __getattr__(name):
+    # Widgets load PySide6; import them on first access only.
+    if name in _WIDGETS:
+        from importlib import import_module
+
+        return getattr(import_module(f".{_WIDGETS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
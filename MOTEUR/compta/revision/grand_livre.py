@@ -0,0 +1,56 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox
+
+from ..achats.signals import signals as achat_signals
+from ..events import ChangeSet
+from .ledger_table import LedgerTable
+from .revision_services import get_accounts_with_balance
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DB_PATH = BASE_DIR / "compta.db"
+
+
+class GrandLivreWidget(QWidget):
+    """Grand livre d'un compte, lu page par page au défilement."""
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        top.addWidget(QLabel("Compte :"))
+        self.account_combo = QComboBox()
+        self.account_combo.currentIndexChanged.connect(self.show_account)
+        top.addWidget(self.account_combo, 1)
+        layout.addLayout(top)
+        self.table = LedgerTable(self)
+        layout.addWidget(self.table)
+
+        achat_signals.entry_changed.connect(self.on_entry_changed)
+        self.load_accounts()
+
+    # ------------------------------------------------
+    def load_accounts(self) -> None:
+        current = self.account_combo.currentData()
+        self.account_combo.blockSignals(True)
+        self.account_combo.clear()
+        for code, name, _ in get_accounts_with_balance(DB_PATH):
+            self.account_combo.addItem(f"{code} – {name}", code)
+        index = self.account_combo.findData(current)
+        self.account_combo.setCurrentIndex(max(index, 0))
+        self.account_combo.blockSignals(False)
+        self.show_account()
+
+    @Slot()
+    def show_account(self) -> None:
+        code = self.account_combo.currentData()
+        if code is not None:
+            self.table.set_account(DB_PATH, code)
+
+    @Slot(object)
+    def on_entry_changed(self, changes: Optional[ChangeSet]) -> None:
+        code = self.account_combo.currentData()
+        if changes is None or code in changes.accounts:
+            self.show_account()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Optional
+from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QTableWidget, QTableWidgetItem, QWidget
+
+from .revision_services import LEDGER_PAGE_SIZE, LedgerCursor, get_ledger_page
+
+HEADERS = ["Date", "Journal", "Pièce", "Libellé", "Débit", "Crédit", "Solde"]
+
+
+class LedgerTable(QTableWidget):
+    """Mouvements d'un compte chargés page par page au défilement.
+
+    Une nouvelle page est lue quand la barre de défilement approche du bas ;
+    la première suffit à remplir la vue.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None, page_size: int = LEDGER_PAGE_SIZE) -> None:
+        super().__init__(0, len(HEADERS), parent)
+        self.setHorizontalHeaderLabels(HEADERS)
+        self.verticalHeader().setVisible(False)
+        self.setSelectionBehavior(QTableWidget.SelectRows)
+        self.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.page_size = page_size
+        self.db: Path | str | None = None
+        self.code: Optional[str] = None
+        self.opening_balance = 0.0
+        self._cursor: Optional[LedgerCursor] = None
+        self._more = False
+        self.verticalScrollBar().valueChanged.connect(self._on_scroll)
+
+    # ------------------------------------------------
+    def set_account(self, db: Path | str, code: str) -> None:
+        """Affiche le compte *code* depuis sa première page."""
+        self.db, self.code = db, code
+        self.setRowCount(0)
+        self._cursor, self._more = None, True
+        page = self.fetch_more()
+        self.opening_balance = page.opening_balance if page else 0.0
+
+    def can_fetch_more(self) -> bool:
+        return self._more and self.code is not None
+
+    def fetch_more(self):
+        """Ajoute la page suivante ; retourne la page lue ou ``None``."""
+        if not self.can_fetch_more():
+            return None
+        page = get_ledger_page(self.db, self.code, self._cursor, self.page_size)
+        self._cursor = page.next_cursor
+        self._more = page.next_cursor is not None
+        self.setUpdatesEnabled(False)
+        try:
+            i = self.rowCount()
+            self.setRowCount(i + len(page.lines))
+            for r in page.lines:
+                for c, text in enumerate((r.date, r.journal, r.ref, r.label,
+                                          f"{r.debit:.2f}", f"{r.credit:.2f}", f"{r.balance:.2f}")):
+                    self.setItem(i, c, QTableWidgetItem(text))
+                i += 1
+        finally:
+            self.setUpdatesEnabled(True)
+        return page
+
+    @Slot(int)
+    def _on_scroll(self, value: int) -> None:
+        bar = self.verticalScrollBar()
+        if value >= bar.maximum() - bar.pageStep():
+            self.fetch_more()
@@ -1,41 +1,99 @@
 from __future__ import annotations
+import calendar
+import json
+from datetime import date as Date, timedelta
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
-from ..db import connect
+from ..db import bootstrap, connection
+from ..models import from_cents
 
 # --------------------------------------------------
 SQL_CREATE_VIEW = """
 CREATE VIEW IF NOT EXISTS account_balance_v AS
 SELECT a.code                  AS account_code,
        a.name                  AS account_name,
-       ROUND(IFNULL(SUM(el.debit - el.credit), 0), 2) AS balance
+       IFNULL(SUM(el.debit - el.credit), 0) AS balance
 FROM   accounts a
 LEFT JOIN entry_lines el ON el.account = a.code
 GROUP BY a.code;
 """
-SQL_IDX_ENTRY_LINES_ACC = "CREATE INDEX IF NOT EXISTS idx_el_account ON entry_lines(account)"
-SQL_IDX_ENTRIES_REF     = "CREATE INDEX IF NOT EXISTS idx_entries_ref  ON entries(ref)"
+# Trial balance read from the trigger-maintained account_balances table:
+# one row per account whatever the number of entry lines.
+SQL_ACCOUNTS_WITH_BALANCE = """
+SELECT a.code, a.name, IFNULL(b.debit - b.credit, 0)
+FROM   accounts a
+LEFT JOIN account_balances b ON b.account = a.code
+{where}
+ORDER BY a.code
+"""
+# Restricts a query to the codes of a JSON array bound as one parameter,
+# whatever their number.
+SQL_WHERE_CODES = "WHERE a.code IN (SELECT value FROM json_each(?))"
+# Solde progressif calculé par SQLite sur tout l'historique jusqu'à la date
+# de fin, avant le filtre de début et la pagination : chaque ligne garde son
+# solde cumulé quel que soit le décalage demandé.
+SQL_ACCOUNT_TRANSACTIONS = """
+SELECT date, journal, ref, memo, debit, credit, balance FROM (
+    SELECT e.date, e.id AS eid, el.id AS lid, e.journal, e.ref, e.memo,
+           el.debit, el.credit,
+           SUM(el.debit - el.credit) OVER (
+               ORDER BY e.date, e.id, el.id ROWS UNBOUNDED PRECEDING
+           ) AS balance
+    FROM entries e JOIN entry_lines el ON el.entry_id = e.id
+    WHERE el.account = ? AND e.date <= ?
+)
+WHERE date >= ?
+ORDER BY date, eid, lid
+LIMIT ? OFFSET ?
+"""
+# Solde progressif d'une page du grand livre : solde d'ouverture lié en
+# premier paramètre, cumul limité aux lignes de la page.
+SQL_RUNNING_PAGE = """
+SELECT date, eid, lid, journal, ref, memo, debit, credit,
+       ? + SUM(debit - credit) OVER (
+           ORDER BY date, eid, lid ROWS UNBOUNDED PRECEDING
+       )
+FROM ({page})
+ORDER BY date, eid, lid
+"""
 
 # --------------------------------------------------
+
+
 def init_view(db_path: Path | str) -> None:
-    with connect(db_path) as conn:
-        conn.execute(SQL_CREATE_VIEW)
-        conn.execute(SQL_IDX_ENTRY_LINES_ACC)
-        conn.execute(SQL_IDX_ENTRIES_REF)
-        conn.commit()
+    """Ensure the legacy view exists (once per process)."""
+    bootstrap(db_path, _create_view)
+
+
+def _create_view(conn) -> None:
+    conn.execute(SQL_CREATE_VIEW)
 
 # --------------------------------------------------
-def get_accounts_with_balance(db_path: Path | str) -> List[Tuple[str,str,float]]:
-    """Retourne (code, name, balance) trié par code."""
-    init_view(db_path)
-    with connect(db_path) as conn:
-        cur = conn.execute("SELECT account_code, account_name, balance FROM account_balance_v ORDER BY account_code")
-        return [(r[0], r[1], r[2]) for r in cur.fetchall()]
+
+
+def get_accounts_with_balance(
+    db_path: Path | str, accounts: Optional[Iterable[str]] = None
+) -> List[Tuple[str, str, float]]:
+    """Retourne (code, name, balance) trié par code.
+
+    *accounts* limite le résultat à ces codes, pour rafraîchir une vue après
+    un :class:`~MOTEUR.compta.events.ChangeSet`.
+    """
+    if accounts is None:
+        sql, params = SQL_ACCOUNTS_WITH_BALANCE.format(where=""), ()
+    else:
+        sql = SQL_ACCOUNTS_WITH_BALANCE.format(where=SQL_WHERE_CODES)
+        params = (json.dumps(sorted(accounts)),)
+    with connection(db_path) as conn:
+        cur = conn.execute(sql, params)
+        return [(r[0], r[1], from_cents(r[2])) for r in cur.fetchall()]
 
 # --------------------------------------------------
-@dataclass
+
+
+@dataclass(slots=True)
 class AccTransaction:
     date: str
     journal: str
@@ -46,18 +104,248 @@ class AccTransaction:
     balance: float
 
 # --------------------------------------------------
-def get_account_transactions(db_path: Path | str, code: str) -> List[AccTransaction]:
-    init_view(db_path)
-    sql = (
-        "SELECT e.date, e.journal, e.ref, e.memo, el.debit, el.credit "
-        "FROM entries e JOIN entry_lines el ON el.entry_id = e.id "
-        "WHERE el.account = ? ORDER BY e.date, e.id"
-    )
-    with connect(db_path) as conn:
-        rows = conn.execute(sql, (code,)).fetchall()
-    bal = 0.0
-    out: List[AccTransaction] = []
-    for d,j,r,m,de,cr in rows:
-        bal += de - cr
-        out.append(AccTransaction(d,j,r,m or "",de,cr,round(bal,2)))
-    return out
+
+
+def get_account_transactions(
+    db_path: Path | str,
+    code: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> List[AccTransaction]:
+    """Mouvements de *code* du *start* au *end* avec leur solde cumulé.
+
+    Le solde part du premier mouvement du compte, même quand *start*,
+    *offset* ou *limit* ne retiennent qu'une partie des lignes.
+    """
+    params = (code, end or _LEDGER_END, start or "", -1 if limit is None else limit, offset)
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_ACCOUNT_TRANSACTIONS, params).fetchall()
+    return [
+        AccTransaction(d, j, r, m or "", from_cents(de), from_cents(cr), from_cents(bal))
+        for d, j, r, m, de, cr, bal in rows
+    ]
+
+
+# --------------------------------------------------
+# Grand livre paginé par clé (date, écriture, ligne) : chaque page reprend
+# après la dernière ligne affichée sans relire ni compter les précédentes.
+# Deux plans selon la densité du compte : les comptes présents dans une
+# bonne part des écritures (512, 401...) suivent l'index des dates et
+# s'arrêtent après une page ; les autres partent de leurs lignes et ne
+# trient que celles-ci.
+LEDGER_PAGE_SIZE = 200
+LEDGER_DENSE_RATIO = 0.05
+
+SQL_LEDGER_PAGE = """
+SELECT e.date, e.id AS eid, el.id AS lid, e.journal, e.ref, e.memo,
+       el.debit, el.credit
+FROM entry_lines el JOIN entries e ON e.id = el.entry_id
+WHERE el.account = ? AND (e.date, e.id, el.id) > (?, ?, ?) AND e.date <= ?
+ORDER BY e.date, e.id, el.id
+LIMIT ?
+"""
+SQL_LEDGER_PAGE_BY_DATE = """
+SELECT e.date, e.id AS eid, el.id AS lid, e.journal, e.ref, e.memo,
+       el.debit, el.credit
+FROM entries e CROSS JOIN entry_lines el ON el.entry_id = e.id
+WHERE el.account = ? AND (e.date, e.id, el.id) > (?, ?, ?) AND e.date <= ?
+ORDER BY e.date, e.id, el.id
+LIMIT ?
+"""
+SQL_LEDGER_DENSITY = (
+    "SELECT (SELECT count(*) FROM entry_lines WHERE account = ?), "
+    "(SELECT IFNULL(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'entries')"
+)
+# Solde du compte avant une date : mois complets depuis les soldes
+# mensuels, début du mois entamé depuis les lignes.
+SQL_LEDGER_OPENING = """
+SELECT IFNULL(SUM(debit - credit), 0) FROM (
+    SELECT debit, credit FROM account_period_balances
+    WHERE account = ? AND period < ?
+    UNION ALL
+    SELECT el.debit, el.credit
+    FROM entries e JOIN entry_lines el ON el.entry_id = e.id
+    WHERE el.account = ? AND e.date >= ? AND e.date < ?
+)
+"""
+_LEDGER_END = "9999-12-31"
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerCursor:
+    """Position après la dernière ligne d'une page et solde (centimes) à ce point.
+
+    *by_date* retient le plan choisi à la première page.
+    """
+
+    date: str
+    entry_id: int
+    line_id: int
+    balance: int
+    by_date: bool = False
+
+
+@dataclass(slots=True)
+class LedgerPage:
+    account: str
+    opening_balance: float
+    lines: List[AccTransaction]
+    next_cursor: Optional[LedgerCursor]
+
+    @property
+    def closing_balance(self) -> float:
+        return self.lines[-1].balance if self.lines else self.opening_balance
+
+
+def _ledger_opening(conn, code: str, start: str) -> int:
+    month = start[:7]
+    return conn.execute(
+        SQL_LEDGER_OPENING, (code, month, code, f"{month}-01", start)
+    ).fetchone()[0]
+
+
+def _ledger_by_date(conn, code: str) -> bool:
+    lines, entries = conn.execute(SQL_LEDGER_DENSITY, (code,)).fetchone()
+    return entries > 0 and lines >= entries * LEDGER_DENSE_RATIO
+
+
+def get_ledger_page(
+    db_path: Path | str,
+    code: str,
+    cursor: Optional[LedgerCursor] = None,
+    limit: int = LEDGER_PAGE_SIZE,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> LedgerPage:
+    """Retourne au plus *limit* mouvements de *code* après *cursor*.
+
+    Sans *cursor* la page commence à *start* (ou au premier mouvement) avec
+    le solde du compte à cette date comme solde d'ouverture ; sinon elle
+    reprend au ``next_cursor`` de la page précédente, qui porte le solde.
+    ``next_cursor`` vaut ``None`` sur la dernière page.
+    """
+    with connection(db_path) as conn:
+        if cursor is None:
+            opening = _ledger_opening(conn, code, start) if start else 0
+            key = (start or "", 0, 0)
+            by_date = _ledger_by_date(conn, code)
+        else:
+            opening = cursor.balance
+            key = (cursor.date, cursor.entry_id, cursor.line_id)
+            by_date = cursor.by_date
+        page = SQL_LEDGER_PAGE_BY_DATE if by_date else SQL_LEDGER_PAGE
+        rows = conn.execute(
+            SQL_RUNNING_PAGE.format(page=page),
+            (opening, code, *key, end or _LEDGER_END, limit + 1),
+        ).fetchall()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    lines = [
+        AccTransaction(d, j, r, m or "", from_cents(de), from_cents(cr), from_cents(bal))
+        for d, _, _, j, r, m, de, cr, bal in rows
+    ]
+    next_cursor = None
+    if more:
+        d, entry_id, line_id = rows[-1][:3]
+        next_cursor = LedgerCursor(d, entry_id, line_id, rows[-1][8], by_date)
+    return LedgerPage(code, from_cents(opening), lines, next_cursor)
+
+
+def iter_ledger(
+    db_path: Path | str,
+    code: str,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    page_size: int = LEDGER_PAGE_SIZE,
+) -> Iterator[AccTransaction]:
+    """Parcourt tous les mouvements de *code* page par page (export CSV)."""
+    cursor = None
+    while True:
+        page = get_ledger_page(db_path, code, cursor, page_size, start, end)
+        yield from page.lines
+        cursor = page.next_cursor
+        if cursor is None:
+            return
+
+
+# --------------------------------------------------
+# Point-in-time trial balance: whole months come from the monthly snapshots
+# in account_period_balances, only the partial months at both ends of the
+# range are read from entry_lines.
+SQL_TRIAL_BALANCE = """
+SELECT t.account, IFNULL(a.name, ''), SUM(t.debit), SUM(t.credit)
+FROM (
+    SELECT account, debit, credit FROM account_period_balances
+    WHERE period BETWEEN ? AND ?
+    UNION ALL
+    SELECT el.account, el.debit, el.credit
+    FROM entries e JOIN entry_lines el ON el.entry_id = e.id
+    WHERE e.date BETWEEN ? AND ?
+    UNION ALL
+    SELECT el.account, el.debit, el.credit
+    FROM entries e JOIN entry_lines el ON el.entry_id = e.id
+    WHERE e.date BETWEEN ? AND ?
+) t
+LEFT JOIN accounts a ON a.code = t.account
+GROUP BY t.account
+HAVING SUM(t.debit) <> 0 OR SUM(t.credit) <> 0
+ORDER BY t.account
+"""
+_EMPTY = ("9999-99-99", "0000-00-00")
+
+
+@dataclass(slots=True)
+class TrialBalanceLine:
+    account: str
+    name: str
+    debit: float
+    credit: float
+    balance: float
+
+
+def _trial_ranges(start: Optional[str], end: str) -> Tuple[str, ...]:
+    """Return the parameters of :data:`SQL_TRIAL_BALANCE` for the range."""
+    d1 = Date.fromisoformat(end)
+    if start is None:
+        first = "0000-01"
+        d0 = None
+    else:
+        d0 = Date.fromisoformat(start)
+        if d0.day == 1:
+            first = f"{d0.year:04d}-{d0.month:02d}"
+        else:
+            nxt = d0.replace(day=28) + timedelta(days=4)
+            first = f"{nxt.year:04d}-{nxt.month:02d}"
+    if d1.day == calendar.monthrange(d1.year, d1.month)[1]:
+        last = f"{d1.year:04d}-{d1.month:02d}"
+    else:
+        prev = d1.replace(day=1) - timedelta(days=1)
+        last = f"{prev.year:04d}-{prev.month:02d}"
+    if first > last:
+        return (*_EMPTY, start or "0000-01-01", end, *_EMPTY)
+    head = (start, f"{first}-00") if d0 and d0.day != 1 else _EMPTY
+    tail = (f"{last}-99", end) if last < end[:7] else _EMPTY
+    return (first, last, *head, *tail)
+
+
+def get_trial_balance(
+    db_path: Path | str, end: str, start: Optional[str] = None
+) -> List[TrialBalanceLine]:
+    """Return per-account totals of lines dated from *start* to *end*.
+
+    Without *start* the balance covers every entry up to *end*.
+    """
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_TRIAL_BALANCE, _trial_ranges(start, end))
+        return [
+            TrialBalanceLine(
+                account=r[0],
+                name=r[1],
+                debit=from_cents(r[2]),
+                credit=from_cents(r[3]),
+                balance=from_cents(r[2] - r[3]),
+            )
+            for r in rows.fetchall()
+        ]
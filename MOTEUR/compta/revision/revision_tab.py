@@ -2,63 +2,59 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Optional
 from PySide6.QtCore import Qt, Slot
-from PySide6.QtWidgets import QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout
+from PySide6.QtWidgets import QWidget, QVBoxLayout, QTreeWidgetItem, QPushButton, QHBoxLayout
 
+from ..accounting.account_tree import AccountTree
+from ..accounting.db import get_account_tree
 from ..achats.signals import signals as achat_signals
-from .revision_services import init_view, get_accounts_with_balance
+from ..events import ChangeSet
+from .revision_services import init_view
 from .transactions_dialog import AccountTransactionsDialog
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-DB_PATH  = BASE_DIR / "compta.db"
+DB_PATH = BASE_DIR / "compta.db"
+
 
 class RevisionTab(QWidget):
-    """Balance générale dynamique."""
+    """Balance générale dynamique, repliable par classe et sous-classe."""
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
         init_view(DB_PATH)
         layout = QVBoxLayout(self)
-        self.table = QTableWidget(0,3)
-        self.table.setHorizontalHeaderLabels(["Compte","Intitulé","Solde N"])
-        self.table.verticalHeader().setVisible(False)
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
-        self.table.cellDoubleClicked.connect(self.show_details)
-        layout.addWidget(self.table)
+        self.tree = AccountTree(["Compte", "Intitulé", "Solde N"])
+        self.tree.itemDoubleClicked.connect(self.show_details)
+        layout.addWidget(self.tree)
 
         btn_row = QHBoxLayout()
         refresh = QPushButton("Rafraîchir")
         refresh.clicked.connect(self.refresh)
-        btn_row.addStretch(); btn_row.addWidget(refresh)
+        btn_row.addStretch()
+        btn_row.addWidget(refresh)
         layout.addLayout(btn_row)
 
-        achat_signals.entry_changed.connect(self.refresh)
+        achat_signals.entry_changed.connect(self.on_entry_changed)
         self.refresh()
 
     # ------------------------------------------------
     @Slot()
     def refresh(self) -> None:
-        self.table.setRowCount(0)
-        for code, name, bal in get_accounts_with_balance(DB_PATH):
-            r = self.table.rowCount()
-            self.table.insertRow(r)
-            item = QTableWidgetItem(code)
-            item.setData(Qt.UserRole, code)
-            self.table.setItem(r, 0, item)
-            self.table.setItem(r, 1, QTableWidgetItem(name))
-            # `bal` might be ``None`` if the SQL view returns NULL.
-            # Guard against it before formatting.
-            bal = bal if bal is not None else 0.0
-            bal_item = QTableWidgetItem(f"{bal:.2f}")
-            bal_item.setForeground(Qt.darkGreen if bal > 0 else Qt.red)
-            self.table.setItem(r, 2, bal_item)
+        """Recharge tout l'arbre des comptes."""
+        self.tree.load(get_account_tree(DB_PATH))
+
+    @Slot(object)
+    def on_entry_changed(self, changes: Optional[ChangeSet]) -> None:
+        if changes is None:
+            self.refresh()
+        elif changes.accounts:
+            # Les comptes touchés et leurs ancêtres, lus dans la table de clôture.
+            self.tree.update_nodes(get_account_tree(DB_PATH, changes.accounts))
 
     # ------------------------------------------------
-    @Slot(int,int)
-    def show_details(self,row:int,col:int)->None:
-        item = self.table.item(row,0)
-        if not item: return
-        code = item.data(Qt.UserRole)
-        name = self.table.item(row,1).text()
-        dlg  = AccountTransactionsDialog(DB_PATH, code, name, self)
+    @Slot(QTreeWidgetItem, int)
+    def show_details(self, item: QTreeWidgetItem, col: int) -> None:
+        if item.childCount():
+            return  # noeud de regroupement
+        code = item.data(0, Qt.UserRole)
+        dlg = AccountTransactionsDialog(DB_PATH, code, item.text(1), self)
         dlg.exec()
@@ -1,17 +1,35 @@
-from .supplier_tab import SupplierTab
 from .supplier_services import (
+    AgedPayable,
+    get_aged_payables,
     get_suppliers_with_balance,
     get_supplier_transactions,
     init_view,
     TransactionRow,
 )
-from .supplier_transactions_dialog import SupplierTransactionsDialog
 
 __all__ = [
     "SupplierTab",
+    "AgedPayable",
+    "AgedPayablesWidget",
+    "get_aged_payables",
     "get_suppliers_with_balance",
     "get_supplier_transactions",
     "init_view",
     "TransactionRow",
     "SupplierTransactionsDialog",
 ]
+
+_WIDGETS = {
+    "AgedPayablesWidget": "aged_payables",
+    "SupplierTab": "supplier_tab",
+    "SupplierTransactionsDialog": "supplier_transactions_dialog",
+}
+
+
+def __getattr__(name):
+    # Widgets load PySide6; import them on first access only.
+    if name in _WIDGETS:
+        from importlib import import_module
+
+        return getattr(import_module(f".{_WIDGETS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List, Optional
+
+from PySide6.QtCore import QDate, Qt, Slot
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import (
+    QDateEdit,
+    QHBoxLayout,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from MOTEUR.compta.achats.signals import signals as achat_signals
+from MOTEUR.compta.events import ChangeSet
+from .supplier_services import AGING_LABELS, AgedPayable, get_aged_payables
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DB_PATH = BASE_DIR / "compta.db"
+
+HEADERS = ["Fournisseur", *AGING_LABELS, "Total"]
+
+
+class AgedPayablesWidget(QWidget):
+    """Aged payables per supplier at a chosen date.
+
+    The report is computed when first shown and kept until a supplier
+    change; changes arriving while the widget is hidden are applied the
+    next time it is shown.
+    """
+
+    def __init__(self, parent: Optional[QWidget] = None) -> None:
+        super().__init__(parent)
+        self.rows: Optional[List[AgedPayable]] = None
+        layout = QVBoxLayout(self)
+
+        top = QHBoxLayout()
+        top.addStretch()
+        top.addWidget(QLabel("Au :"))
+        self.date_edit = QDateEdit(QDate.currentDate())
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDisplayFormat("dd/MM/yyyy")
+        self.date_edit.dateChanged.connect(self.refresh)
+        top.addWidget(self.date_edit)
+        layout.addLayout(top)
+
+        self.table = QTableWidget(0, len(HEADERS))
+        self.table.setHorizontalHeaderLabels(HEADERS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        achat_signals.supplier_changed.connect(self.on_supplier_changed)
+
+    # ------------------------------------------------------------------
+    @Slot()
+    def refresh(self) -> None:
+        """Recompute the report at the selected date."""
+        as_of = self.date_edit.date().toString("yyyy-MM-dd")
+        self.rows = get_aged_payables(DB_PATH, as_of)
+        self.show_rows(self.rows)
+
+    @Slot(object)
+    def on_supplier_changed(self, changes: Optional[ChangeSet]) -> None:
+        if self.isVisible():
+            self.refresh()
+        else:
+            self.rows = None
+
+    def showEvent(self, event) -> None:  # noqa: N802 - Qt override
+        if self.rows is None:
+            self.refresh()
+        super().showEvent(event)
+
+    def show_rows(self, rows: List[AgedPayable]) -> None:
+        self.table.setRowCount(0)
+        self.table.setRowCount(len(rows) + 1)
+        totals = [0.0] * (len(AGING_LABELS) + 1)
+        for r, row in enumerate(rows):
+            item = QTableWidgetItem(row.name)
+            item.setData(Qt.UserRole, row.supplier_id)
+            self.table.setItem(r, 0, item)
+            for c, value in enumerate((*row.buckets, row.total)):
+                self._set_amount(r, c + 1, value)
+                totals[c] += value
+        last = len(rows)
+        self.table.setItem(last, 0, QTableWidgetItem("Total"))
+        for c, value in enumerate(totals):
+            self._set_amount(last, c + 1, value)
+        for c in range(len(HEADERS)):
+            item = self.table.item(last, c)
+            font = QFont(item.font())
+            font.setBold(True)
+            item.setFont(font)
+        self.table.resizeColumnToContents(0)
+
+    def _set_amount(self, row: int, column: int, value: float) -> None:
+        item = QTableWidgetItem(f"{value:.2f}" if value else "")
+        item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+        self.table.setItem(row, column, item)
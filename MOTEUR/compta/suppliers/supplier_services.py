@@ -1,43 +1,142 @@
 from __future__ import annotations
 
+import json
 from dataclasses import dataclass
+from datetime import date as Date, timedelta
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, List, Optional, Tuple
 
-from ..db import connect
+from ..db import bootstrap, connection
+from ..models import from_cents
 
-SQL_CREATE_VIEW = """
-CREATE VIEW IF NOT EXISTS supplier_balance_v AS
+# Kept exactly as SQLite stores it in sqlite_master, so _create_view can
+# tell an outdated definition from the current one.
+SQL_CREATE_VIEW = """CREATE VIEW supplier_balance_v AS
 SELECT s.id      AS supplier_id,
        s.name    AS supplier_name,
-       ROUND(COALESCE(SUM(CASE WHEN el.debit>0 THEN el.debit ELSE -el.credit END), 0), 2) AS balance
+       COALESCE(SUM(CASE WHEN el.debit>0 THEN el.debit ELSE -el.credit END), 0) AS balance
 FROM suppliers s
-LEFT JOIN entries   e   ON e.ref IN (
-      SELECT piece FROM purchases WHERE supplier_id = s.id)
-LEFT JOIN entry_lines el ON el.entry_id = e.id
+JOIN entry_lines el ON el.supplier_id = s.id
 WHERE el.account IN ('401','408','4091')
-GROUP BY s.id;
+GROUP BY s.id"""
+SQL_VIEW_DEFINITION = (
+    "SELECT sql FROM sqlite_master WHERE type='view' AND name='supplier_balance_v'"
+)
+
+# Third-party lines carry their supplier (see achats.db.SQL_LINK_INDEXES),
+# so the balances are one GROUP BY walking idx_el_supplier, which covers it
+# and yields the groups in order.  The unary ``+`` keeps SQLite from going
+# through idx_el_letter instead, i.e. every third-party line with or without
+# a supplier.  ``{where}`` is empty or SQL_WHERE_IDS.
+SQL_SUPPLIER_BALANCES = """
+SELECT s.id, s.name, b.balance
+FROM (
+    SELECT supplier_id,
+           SUM(CASE WHEN debit>0 THEN debit ELSE -credit END) AS balance
+    FROM entry_lines
+    WHERE supplier_id IS NOT NULL AND +account IN ('401','408','4091') {where}
+    GROUP BY supplier_id
+) b
+JOIN suppliers s ON s.id = b.supplier_id
+ORDER BY s.name, s.id
+"""
+SQL_WHERE_IDS = "AND supplier_id IN (SELECT value FROM json_each(?))"
+
+# The running balance is a window sum over the whole history up to *end*,
+# computed before the *start* filter and the LIMIT/OFFSET, so any page keeps
+# its cumulative balance.
+SQL_SUPPLIER_TRANSACTIONS = """
+SELECT date, journal, ref, memo, debit, credit, balance FROM (
+    SELECT e.date, e.id AS eid, el.id AS lid, e.journal, e.ref, e.memo,
+           el.debit, el.credit,
+           SUM(el.debit - el.credit) OVER (
+               ORDER BY e.date, e.id, el.id ROWS UNBOUNDED PRECEDING
+           ) AS balance
+    FROM entry_lines el CROSS JOIN entries e ON e.id = el.entry_id
+    WHERE el.supplier_id = ? AND el.account IN ('401','408','4091')
+      AND e.date <= ?
+)
+WHERE date >= ?
+ORDER BY date, eid, lid
+LIMIT ? OFFSET ?
+"""
+
+
+# Overdue days closing each aging bucket; the first bucket holds what is not
+# due yet and the last one everything older than AGING_DAYS[-1].
+AGING_DAYS = (30, 60, 90)
+AGING_LABELS = ("Non échu", "1-30 j", "31-60 j", "61-90 j", "+90 j")
+
+# Amounts open at :as_of per supplier and aging bucket.  What is left to pay
+# today comes from purchases.paid_amount, reading open purchases only;
+# payments made after :as_of (idx_payments_date) are added back on top, so a
+# past date gives the figures of that day.  The bucket bounds are
+# due dates computed by _aging_params.
+SQL_AGED_PAYABLES = """
+WITH open_amounts AS (
+    SELECT supplier_id, due_date, ttc_amount - paid_amount AS amount
+    FROM purchases
+    WHERE payment_status IN ('A_PAYER','PARTIEL') AND +date <= :as_of
+    UNION ALL
+    SELECT p.supplier_id, p.due_date, pp.amount
+    FROM purchase_payments pp CROSS JOIN purchases p ON p.id = pp.purchase_id
+    WHERE pp.date > :as_of AND p.date <= :as_of
+)
+SELECT o.supplier_id, s.name,
+       SUM(CASE WHEN due_date >= :as_of THEN amount ELSE 0 END),
+       SUM(CASE WHEN due_date < :as_of AND due_date >= :d1 THEN amount ELSE 0 END),
+       SUM(CASE WHEN due_date < :d1 AND due_date >= :d2 THEN amount ELSE 0 END),
+       SUM(CASE WHEN due_date < :d2 AND due_date >= :d3 THEN amount ELSE 0 END),
+       SUM(CASE WHEN due_date < :d3 THEN amount ELSE 0 END),
+       SUM(amount)
+FROM open_amounts o JOIN suppliers s ON s.id = o.supplier_id
+GROUP BY o.supplier_id
+HAVING SUM(amount) <> 0
+ORDER BY s.name, s.id
 """
 
 
 def init_view(db_path: Path | str) -> None:
-    """Ensure :data:`supplier_balance_v` exists."""
-    with connect(db_path) as conn:
-        conn.execute(SQL_CREATE_VIEW)
-        conn.commit()
-
-
-def get_suppliers_with_balance(db_path: Path | str) -> List[Tuple[int, str, float]]:
-    """Return supplier id, name and balance (debit minus credit)."""
-    init_view(db_path)
-    with connect(db_path) as conn:
-        cur = conn.execute(
-            "SELECT supplier_id, supplier_name, balance FROM supplier_balance_v ORDER BY supplier_name"
-        )
-        return [(r[0], r[1], r[2]) for r in cur.fetchall()]
+    """Ensure :data:`supplier_balance_v` exists (once per process).
+
+    The functions below no longer read the view; it is kept for reports
+    and external tools querying it.
+    """
+    bootstrap(db_path, _create_view)
+
+
+def _create_view(conn) -> None:
+    """Create :data:`supplier_balance_v`, replacing an older definition."""
+    row = conn.execute(SQL_VIEW_DEFINITION).fetchone()
+    if row is None or row[0] != SQL_CREATE_VIEW:
+        _replace_view(conn)
+
+
+def _replace_view(conn) -> None:
+    """Recreate :data:`supplier_balance_v` from its current definition."""
+    conn.execute("DROP VIEW IF EXISTS supplier_balance_v")
+    conn.execute(SQL_CREATE_VIEW)
 
 
-@dataclass
+def get_suppliers_with_balance(
+    db_path: Path | str, supplier_ids: Optional[Iterable[int]] = None
+) -> List[Tuple[int, str, float]]:
+    """Return supplier id, name and balance (debit minus credit).
+
+    *supplier_ids* restricts the result to those suppliers, e.g. the ones
+    named by a :class:`~MOTEUR.compta.events.ChangeSet`.
+    """
+    if supplier_ids is None:
+        sql, params = SQL_SUPPLIER_BALANCES.format(where=""), ()
+    else:
+        sql = SQL_SUPPLIER_BALANCES.format(where=SQL_WHERE_IDS)
+        params = (json.dumps(sorted(supplier_ids)),)
+    with connection(db_path) as conn:
+        cur = conn.execute(sql, params)
+        return [(r[0], r[1], from_cents(r[2])) for r in cur.fetchall()]
+
+
+@dataclass(slots=True)
 class TransactionRow:
     date: str
     journal: str
@@ -48,33 +147,78 @@ class TransactionRow:
     balance: float
 
 
-def get_supplier_transactions(db_path: Path | str, supplier_id: int) -> List[TransactionRow]:
-    """Return accounting movements for *supplier_id* ordered by date."""
-    init_view(db_path)
-    query = (
-        "SELECT e.date, e.journal, e.ref, e.memo, el.debit, el.credit "
-        "FROM entries e JOIN entry_lines el ON el.entry_id=e.id "
-        "WHERE el.account IN ('401','408','4091') "
-        "AND e.ref IN (SELECT piece FROM purchases WHERE supplier_id=?) "
-        "ORDER BY e.date, e.id"
+def get_supplier_transactions(
+    db_path: Path | str,
+    supplier_id: int,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> List[TransactionRow]:
+    """Return accounting movements for *supplier_id* ordered by date.
+
+    Balances are cumulative from the first movement of the supplier, also
+    when *start*, *offset* or *limit* only keep part of the rows.
+    """
+    params = (
+        supplier_id,
+        end or "9999-12-31",
+        start or "",
+        -1 if limit is None else limit,
+        offset,
     )
-    with connect(db_path) as conn:
-        cur = conn.execute(query, (supplier_id,))
-        rows = cur.fetchall()
-
-    result: List[TransactionRow] = []
-    balance = 0.0
-    for date, journal, ref, memo, debit, credit in rows:
-        balance += debit - credit
-        result.append(
-            TransactionRow(
-                date=date,
-                journal=journal,
-                ref=ref,
-                label=memo or "",
-                debit=debit,
-                credit=credit,
-                balance=round(balance, 2),
-            )
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_SUPPLIER_TRANSACTIONS, params).fetchall()
+    return [
+        TransactionRow(
+            date=date,
+            journal=journal,
+            ref=ref,
+            label=memo or "",
+            debit=from_cents(debit),
+            credit=from_cents(credit),
+            balance=from_cents(balance),
+        )
+        for date, journal, ref, memo, debit, credit, balance in rows
+    ]
+
+
+@dataclass(slots=True)
+class AgedPayable:
+    """Open amount of a supplier split by aging bucket (see AGING_LABELS)."""
+
+    supplier_id: int
+    name: str
+    buckets: Tuple[float, ...]
+    total: float
+
+
+def _aging_params(as_of: str) -> dict:
+    day = Date.fromisoformat(as_of)
+    params = {"as_of": as_of}
+    for i, days in enumerate(AGING_DAYS, 1):
+        params[f"d{i}"] = (day - timedelta(days=days)).isoformat()
+    return params
+
+
+def get_aged_payables(
+    db_path: Path | str, as_of: Optional[str] = None
+) -> List[AgedPayable]:
+    """Return the aged payables at *as_of* (today by default).
+
+    Only suppliers with an open amount are listed, by name.  Overdue days
+    are counted from the due date of each purchase; a purchase due on
+    *as_of* is not overdue yet.
+    """
+    params = _aging_params(as_of or Date.today().isoformat())
+    with connection(db_path) as conn:
+        rows = conn.execute(SQL_AGED_PAYABLES, params).fetchall()
+    return [
+        AgedPayable(
+            supplier_id=r[0],
+            name=r[1],
+            buckets=tuple(from_cents(v) for v in r[2:-1]),
+            total=from_cents(r[-1]),
         )
-    return result
+        for r in rows
+    ]
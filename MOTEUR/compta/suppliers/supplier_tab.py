@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+from bisect import bisect_left
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from PySide6.QtCore import Qt, Slot
 from PySide6.QtWidgets import (
@@ -11,9 +12,12 @@ from PySide6.QtWidgets import (
     QTableWidgetItem,
     QPushButton,
     QHBoxLayout,
+    QTabWidget,
 )
 
 from MOTEUR.compta.achats.signals import signals as achat_signals
+from MOTEUR.compta.events import ChangeSet
+from .aged_payables import AgedPayablesWidget
 from .supplier_services import (
     init_view,
     get_suppliers_with_balance,
@@ -25,7 +29,7 @@ DB_PATH = BASE_DIR / "compta.db"
 
 
 class SupplierTab(QWidget):
-    """Tab showing suppliers and their balance."""
+    """Tab showing suppliers with their balance and the aged payables."""
 
     def __init__(self, parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
@@ -33,13 +37,22 @@ class SupplierTab(QWidget):
 
         layout = QVBoxLayout(self)
 
+        # (name, id) of each row in display order, and the key of each id,
+        # to locate the rows touched by a change set.
+        self._keys: List[Tuple[str, int]] = []
+        self._key_of: Dict[int, Tuple[str, int]] = {}
+
         self.table = QTableWidget(0, 2)
         self.table.setHorizontalHeaderLabels(["Fournisseur", "Montant"])
         self.table.verticalHeader().setVisible(False)
         self.table.setSelectionBehavior(QTableWidget.SelectRows)
         self.table.setEditTriggers(QTableWidget.NoEditTriggers)
         self.table.cellDoubleClicked.connect(self.open_details)
-        layout.addWidget(self.table)
+        self.aged = AgedPayablesWidget()
+        self.tabs = QTabWidget()
+        self.tabs.addTab(self.table, "Soldes")
+        self.tabs.addTab(self.aged, "Balance âgée")
+        layout.addWidget(self.tabs)
 
         btn_layout = QHBoxLayout()
         self.refresh_btn = QPushButton("Rafraîchir")
@@ -48,23 +61,67 @@ class SupplierTab(QWidget):
         btn_layout.addWidget(self.refresh_btn)
         layout.addLayout(btn_layout)
 
-        achat_signals.supplier_changed.connect(self.refresh)
+        achat_signals.supplier_changed.connect(self.on_supplier_changed)
         self.refresh()
 
     # ------------------------------------------------------------------
     @Slot()
     def refresh(self) -> None:
+        """Reload every supplier and the aged payables."""
+        self.aged.on_supplier_changed(None)
+        rows = get_suppliers_with_balance(DB_PATH)
         self.table.setRowCount(0)
-        for sid, name, balance in get_suppliers_with_balance(DB_PATH):
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            item = QTableWidgetItem(name)
-            item.setData(Qt.UserRole, sid)
-            self.table.setItem(row, 0, item)
-            bal_item = QTableWidgetItem(f"{balance:.2f}")
-            color = Qt.red if balance > 0 else Qt.darkGreen
-            bal_item.setForeground(color)
-            self.table.setItem(row, 1, bal_item)
+        self.table.setRowCount(len(rows))
+        self._keys = [(name, sid) for sid, name, _ in rows]
+        self._key_of = {key[1]: key for key in self._keys}
+        for row, (sid, name, balance) in enumerate(rows):
+            self._fill_row(row, sid, name, balance)
+
+    @Slot(object)
+    def on_supplier_changed(self, changes: Optional[ChangeSet]) -> None:
+        if changes is None:
+            self.refresh()
+        elif changes.suppliers:
+            self.refresh_suppliers(changes.suppliers)
+
+    def refresh_suppliers(self, supplier_ids: Iterable[int]) -> None:
+        """Re-query and repaint the rows of *supplier_ids* only."""
+        supplier_ids = set(supplier_ids)
+        rows = {
+            sid: (name, balance)
+            for sid, name, balance in get_suppliers_with_balance(
+                DB_PATH, supplier_ids
+            )
+        }
+        self.table.setUpdatesEnabled(False)
+        try:
+            for sid in supplier_ids:
+                key = self._key_of.get(sid)
+                new_key = (rows[sid][0], sid) if sid in rows else None
+                if key is not None and key != new_key:
+                    row = bisect_left(self._keys, key)
+                    self.table.removeRow(row)
+                    del self._keys[row]
+                    del self._key_of[sid]
+                if new_key is None:
+                    continue
+                row = bisect_left(self._keys, new_key)
+                if key != new_key:
+                    self.table.insertRow(row)
+                    self._keys.insert(row, new_key)
+                    self._key_of[sid] = new_key
+                self._fill_row(row, sid, *rows[sid])
+        finally:
+            self.table.setUpdatesEnabled(True)
+
+    def _fill_row(self, row: int, sid: int, name: str, balance: float) -> None:
+        item = QTableWidgetItem(name)
+        item.setData(Qt.UserRole, sid)
+        self.table.setItem(row, 0, item)
+        bal_item = QTableWidgetItem(f"{balance:.2f}")
+        color = Qt.red if balance > 0 else Qt.darkGreen
+        bal_item.setForeground(color)
+        self.table.setItem(row, 1, bal_item)
 
     # ------------------------------------------------------------------
     @Slot(int, int)
@@ -4,21 +4,27 @@ import sqlite3
 from pathlib import Path
 from typing import List, Tuple
 
+from ..db import bootstrap, migrate_to_cents
+from ..models import from_cents, to_cents
+
+SQL_CREATE_SALES = """
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    label TEXT NOT NULL,
+    amount INTEGER NOT NULL
+)"""
+
 
 def init_db(db_path: Path) -> None:
-    """Create the sales table if it does not already exist."""
-    with sqlite3.connect(db_path) as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sales (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT NOT NULL,
-                label TEXT NOT NULL,
-                amount REAL NOT NULL
-            )
-            """
-        )
-        conn.commit()
+    """Create the sales table if it does not already exist (once per process)."""
+    bootstrap(db_path, _create_schema)
+
+
+def _create_schema(conn) -> None:
+    """Create or upgrade the sales table within the caller's transaction."""
+    conn.execute(SQL_CREATE_SALES)
+    migrate_to_cents(conn, "sales", SQL_CREATE_SALES, ("amount",))
 
 
 def add_sale(db_path: Path, date: str, label: str, amount: float) -> int:
@@ -26,7 +32,7 @@ def add_sale(db_path: Path, date: str, label: str, amount: float) -> int:
     with sqlite3.connect(db_path) as conn:
         cursor = conn.execute(
             "INSERT INTO sales (date, label, amount) VALUES (?, ?, ?)",
-            (date, label, amount),
+            (date, label, to_cents(amount)),
         )
         conn.commit()
         return cursor.lastrowid
@@ -42,7 +48,7 @@ def update_sale(
                 "UPDATE sales SET date = ?, label = ?, amount = ? "
                 "WHERE id = ?"
             ),
-            (date, label, amount, sale_id),
+            (date, label, to_cents(amount), sale_id),
         )
         conn.commit()
 
@@ -60,4 +66,7 @@ def fetch_all_sales(db_path: Path) -> List[Tuple[int, str, str, float]]:
         cursor = conn.execute(
             "SELECT id, date, label, amount FROM sales ORDER BY date"
         )
-        return cursor.fetchall()
+        return [
+            (sale_id, date, label, from_cents(amount))
+            for sale_id, date, label, amount in cursor.fetchall()
+        ]
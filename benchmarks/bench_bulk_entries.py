@@ -0,0 +1,56 @@
+"""Throughput of ``create_entries_bulk`` against ``create_entry``.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_bulk_entries.py``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from pathlib import Path
+
+from MOTEUR.compta.accounting import db as accounting_db
+from MOTEUR.compta.db import close_all
+from MOTEUR.compta.models import Entry, EntryLine
+
+N_SINGLE = 2000
+N_BULK = 100_000
+
+
+def make_entries(n: int):
+    for i in range(n):
+        yield Entry(
+            "OD",
+            f"2024-{i % 12 + 1:02d}-15",
+            f"R{i}",
+            "Reprise",
+            [
+                EntryLine("601", debit=100.0),
+                EntryLine("44566", debit=20.0),
+                EntryLine("401", credit=120.0),
+            ],
+        )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "single.db"
+        accounting_db.init_db(db)
+        start = time.perf_counter()
+        for e in make_entries(N_SINGLE):
+            accounting_db.create_entry(db, e.journal, e.date, e.ref, e.memo, e.lines)
+        single = N_SINGLE * 3 / (time.perf_counter() - start) * 60
+
+        db = Path(tmp) / "bulk.db"
+        accounting_db.init_db(db)
+        start = time.perf_counter()
+        accounting_db.create_entries_bulk(db, make_entries(N_BULK))
+        bulk = N_BULK * 3 / (time.perf_counter() - start) * 60
+        close_all()
+
+    print(f"create_entry        {single:>12,.0f} lines/min")
+    print(f"create_entries_bulk {bulk:>12,.0f} lines/min")
+
+
+if __name__ == "__main__":
+    main()
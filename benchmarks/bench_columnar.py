@@ -0,0 +1,77 @@
+"""Memory and time of columnar ledger reads against row objects.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_columnar.py [lines]``; the
+default ledger holds one million lines.  Both variants total the debit and
+credit of each account over the whole ledger.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from MOTEUR.compta.accounting import db as accounting_db
+from MOTEUR.compta.db import close_all, connection
+from MOTEUR.compta.models import Entry, EntryLine, from_cents
+from MOTEUR.compta.revision import AccTransaction
+
+ACCOUNTS = ["601", "6063", "613", "626", "44566", "401", "512"]
+
+
+def make_entries(n_lines: int):
+    for i in range(n_lines // 2):
+        yield Entry("OD", f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", f"E{i}", None, [
+            EntryLine(ACCOUNTS[i % 5], debit=12.5),
+            EntryLine(ACCOUNTS[5 + i % 2], credit=12.5),
+        ])
+
+
+def with_objects(db):
+    with connection(db) as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(accounting_db.SQL_LEDGER_COLUMNS, ("0000-01-01", "9999-12-31"))
+        rows = [
+            (a, AccTransaction(d, j, str(e), "", from_cents(de), from_cents(cr), 0.0))
+            for e, d, j, a, de, cr in cur
+        ]
+    totals = {}
+    for account, t in rows:
+        de, cr = totals.get(account, (0.0, 0.0))
+        totals[account] = (de + t.debit, cr + t.credit)
+    return rows, totals
+
+
+def with_columns(db):
+    cols = accounting_db.get_ledger_columns(db)
+    return cols, cols.sum_by("account", "debit", "credit")
+
+
+def measure(label, func, db):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(db)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{label:14} {elapsed:6.2f} s  peak {peak / 1e6:8.1f} MB")
+
+
+def main() -> None:
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "cols.db"
+        accounting_db.init_db(db)
+        accounting_db.create_entries_bulk(db, make_entries(n_lines))
+        print(f"ledger: {n_lines:,} lines")
+        measure("row objects", with_objects, db)
+        measure("columns", with_columns, db)
+        close_all()
+
+
+if __name__ == "__main__":
+    main()
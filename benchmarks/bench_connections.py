@@ -0,0 +1,86 @@
+"""Latency of ``add_purchase`` and ``get_accounts_with_balance``.
+
+Compares the pooled :func:`MOTEUR.compta.db.connection` with the previous
+behaviour of opening a fresh connection for every call.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_connections.py``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from MOTEUR.compta import db as compta_db
+from MOTEUR.compta.accounting import db as accounting_db
+from MOTEUR.compta.achats import db as achats_db
+from MOTEUR.compta.models import Purchase
+from MOTEUR.compta.revision import revision_services
+from MOTEUR.compta.suppliers import supplier_services
+
+MODULES = [accounting_db, achats_db, revision_services, supplier_services]
+N_PURCHASES = 500
+N_BALANCES = 200
+
+
+@contextmanager
+def fresh_connection(db_path):
+    """Open, configure and close a connection on every call."""
+    conn = compta_db.connect(db_path)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def run(db: Path) -> tuple[float, float]:
+    achats_db.init_db(db)
+    with compta_db.connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('Bench')")
+        conn.execute("INSERT INTO accounts (code, name) VALUES ('601','Achats')")
+        conn.commit()
+
+    start = time.perf_counter()
+    for i in range(N_PURCHASES):
+        achats_db.add_purchase(
+            db,
+            Purchase(
+                None, "2025-01-01", f"B{i}", 1, "Bench", 120.0, 20,
+                "601", "2025-01-31", "A_PAYER",
+            ),
+        )
+    add_ms = (time.perf_counter() - start) * 1000 / N_PURCHASES
+
+    start = time.perf_counter()
+    for _ in range(N_BALANCES):
+        revision_services.get_accounts_with_balance(db)
+    bal_ms = (time.perf_counter() - start) * 1000 / N_BALANCES
+    compta_db.close_all()
+    return add_ms, bal_ms
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        originals = [m.connection for m in MODULES]
+        for m in MODULES:
+            m.connection = fresh_connection
+        try:
+            before = run(Path(tmp) / "before.db")
+        finally:
+            for m, orig in zip(MODULES, originals):
+                m.connection = orig
+        after = run(Path(tmp) / "after.db")
+
+    print(f"{'':28}{'fresh':>10}{'pooled':>10}")
+    print(f"{'add_purchase (ms)':28}{before[0]:>10.3f}{after[0]:>10.3f}")
+    print(
+        f"{'get_accounts_with_balance (ms)':28}"
+        f"{before[1]:>10.3f}{after[1]:>10.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
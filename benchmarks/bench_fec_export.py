@@ -0,0 +1,58 @@
+"""Throughput of ``export_fec`` on a synthetic ledger.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_fec_export.py [lines]``;
+the default ledger holds one million lines.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from MOTEUR.compta.accounting import db as accounting_db
+from MOTEUR.compta.db import close_all
+from MOTEUR.compta.models import Entry, EntryLine
+
+
+def make_entries(n_lines: int):
+    for i in range(n_lines // 4):
+        yield Entry(
+            "ACH",
+            f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            f"F{i:07d}",
+            f"Facture {i}",
+            [
+                EntryLine("601", debit=100.0),
+                EntryLine("44566", debit=20.0),
+                EntryLine("401", credit=60.0),
+                EntryLine("401", credit=60.0),
+            ],
+        )
+
+
+def main() -> None:
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "fec.db"
+        accounting_db.init_db(db)
+        accounting_db.add_journal(db, "ACH", "Achats")
+        accounting_db.create_entries_bulk(db, make_entries(n_lines))
+        for name, dest in [
+            ("plain", Path(tmp) / "fec.txt"),
+            ("gzip", Path(tmp) / "fec.txt.gz"),
+        ]:
+            start = time.perf_counter()
+            count = accounting_db.export_fec(db, 2024, dest)
+            elapsed = time.perf_counter() - start
+            size = dest.stat().st_size / 1e6
+            print(
+                f"export_fec {name:5} {count:>9,} lines {elapsed:6.2f} s "
+                f"{count / elapsed:>12,.0f} lines/s {size:8.1f} MB"
+            )
+        close_all()
+
+
+if __name__ == "__main__":
+    main()
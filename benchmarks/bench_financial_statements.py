@@ -0,0 +1,87 @@
+"""Timings of the bilan / compte de résultat engine on a synthetic ledger.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_financial_statements.py
+[lines]``; the default ledger holds one million lines over two years.  The
+engine reads the monthly balance snapshots, so its time should not grow
+with the number of lines; a direct aggregate over ``entry_lines`` is timed
+alongside for reference.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from MOTEUR.compta.accounting import db as accounting_db
+from MOTEUR.compta.db import close_all, connection
+from MOTEUR.compta.models import Entry, EntryLine
+from MOTEUR.compta.reports import get_financial_statements
+
+SUPPLIERS = [f"401{i:04d}" for i in range(50)]
+CUSTOMERS = [f"411{i:04d}" for i in range(50)]
+EXPENSES = ["6061", "6063", "607", "613", "622", "6251", "626", "641", "661"]
+REVENUE = ["701", "706", "707", "7088"]
+
+SQL_LINES_BASELINE = """
+SELECT el.account,
+       SUM(CASE WHEN e.date >= ? THEN el.debit - el.credit ELSE 0 END),
+       SUM(CASE WHEN e.date < ? THEN el.debit - el.credit ELSE 0 END)
+FROM entries e JOIN entry_lines el ON el.entry_id = e.id
+WHERE e.date BETWEEN ? AND ?
+GROUP BY el.account
+"""
+
+
+def make_entries(n_lines: int):
+    for i in range(n_lines // 4):
+        year = 2023 + i % 2
+        date = f"{year}-{i % 12 + 1:02d}-{i % 28 + 1:02d}"
+        if i % 3:
+            yield Entry("ACH", date, f"F{i:07d}", None, [
+                EntryLine(EXPENSES[i % len(EXPENSES)], debit=100.0),
+                EntryLine("44566", debit=20.0),
+                EntryLine(SUPPLIERS[i % len(SUPPLIERS)], credit=60.0),
+                EntryLine("512", credit=60.0),
+            ])
+        else:
+            yield Entry("VT", date, f"V{i:07d}", None, [
+                EntryLine(CUSTOMERS[i % len(CUSTOMERS)], debit=180.0),
+                EntryLine("512", debit=60.0),
+                EntryLine(REVENUE[i % len(REVENUE)], credit=200.0),
+                EntryLine("44571", credit=40.0),
+            ])
+
+
+def timed(label: str, func, repeat: int = 5) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:32} {best * 1000:9.2f} ms")
+
+
+def main() -> None:
+    n_lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "statements.db"
+        accounting_db.init_db(db)
+        accounting_db.create_entries_bulk(db, make_entries(n_lines))
+        print(f"ledger: {n_lines:,} lines")
+        timed("get_financial_statements", lambda: get_financial_statements(db, 2024))
+        with connection(db) as conn:
+            timed(
+                "entry_lines aggregate",
+                lambda: conn.execute(
+                    SQL_LINES_BASELINE,
+                    ("2024-01-01", "2024-01-01", "2023-01-01", "2024-12-31"),
+                ).fetchall(),
+                repeat=1,
+            )
+        close_all()
+
+
+if __name__ == "__main__":
+    main()
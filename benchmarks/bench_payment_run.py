@@ -0,0 +1,63 @@
+"""Month-end payment run against one ``pay_purchase`` call per invoice.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_payment_run.py [invoices]``.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from MOTEUR.compta.achats.db import (
+    get_due_purchases,
+    init_db,
+    pay_due_purchases,
+    pay_purchase,
+)
+from MOTEUR.compta.achats.importer import import_purchases
+from MOTEUR.compta.db import close_all
+
+
+def write_csv(path: Path, n: int) -> None:
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("date;piece;fournisseur;libelle;ttc;tva;compte;echeance\n")
+        for i in range(n):
+            fh.write(
+                f"2024-03-{i % 28 + 1:02d};F{i};Fournisseur {i % 300};Achat;"
+                f"{i % 997 + 1},20;20;601;2024-03-31\n"
+            )
+
+
+def book(tmp: str, name: str, n: int) -> Path:
+    src = Path(tmp) / f"{name}.csv"
+    write_csv(src, n)
+    db = Path(tmp) / f"{name}.db"
+    init_db(db)
+    import_purchases(db, src)
+    return db
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = book(tmp, "single", n)
+        start = time.perf_counter()
+        for due in get_due_purchases(db, "2024-03-31"):
+            pay_purchase(db, due.id, "2024-03-31", "VIR", due.amount)
+        single = time.perf_counter() - start
+
+        db = book(tmp, "run", n)
+        start = time.perf_counter()
+        run = pay_due_purchases(db, "2024-03-31")
+        batch = time.perf_counter() - start
+        close_all()
+
+    print(f"{n:,} invoices, {run.total:,.2f} paid")
+    print(f"pay_purchase loop   {single:8.3f} s")
+    print(f"pay_due_purchases   {batch:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
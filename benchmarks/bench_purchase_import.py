@@ -0,0 +1,49 @@
+"""Throughput of ``import_purchases`` on a generated CSV file.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_purchase_import.py``.
+"""
+
+from __future__ import annotations
+
+import tempfile
+from pathlib import Path
+
+from MOTEUR.compta.achats.db import init_db
+from MOTEUR.compta.achats.importer import import_purchases
+from MOTEUR.compta.db import close_all
+
+N_ROWS = 100_000
+N_SUPPLIERS = 500
+
+
+def write_csv(path: Path, n: int) -> None:
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("date;piece;fournisseur;libelle;ttc;tva;compte\n")
+        for i in range(n):
+            fh.write(
+                f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d};F{i};"
+                f"Fournisseur {i % N_SUPPLIERS};Achat {i};"
+                f"{(i % 997) + 1},20;20;60{i % 8 + 1}\n"
+            )
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "achats.csv"
+        write_csv(src, N_ROWS)
+        db = Path(tmp) / "import.db"
+        init_db(db)
+        dry = import_purchases(db, src, dry_run=True)
+        report = import_purchases(db, src)
+        close_all()
+
+    print(f"dry run  {dry.seconds:>8.2f} s  ({dry.valid:,} valid rows)")
+    print(
+        f"import   {report.seconds:>8.2f} s  "
+        f"({report.imported / report.seconds:,.0f} purchases/s, "
+        f"{report.new_suppliers} suppliers)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Purchase listings: whole result set against pages and the streaming mode.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_purchase_listing.py
+[purchases]``; times are the best of three runs and memory is the peak
+traced by :mod:`tracemalloc` while the listing is consumed.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from MOTEUR.compta.achats.db import (
+    LIST_COLUMNS,
+    fetch_purchase_page,
+    fetch_purchases,
+    init_db,
+    iter_purchases,
+)
+from MOTEUR.compta.achats.importer import import_purchases
+from MOTEUR.compta.db import close_all
+from MOTEUR.compta.models import PurchaseFilter
+
+N_SUPPLIERS = 50
+
+
+def write_csv(path: Path, n: int) -> None:
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("date;piece;fournisseur;libelle;ttc;tva;compte\n")
+        for i in range(n):
+            fh.write(
+                f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d};F{i};"
+                f"Fournisseur {i % N_SUPPLIERS};Achat {i};{i % 997 + 1},20;20;601\n"
+            )
+
+
+def measure(label: str, func) -> None:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:34} {best * 1000:9.1f} ms {peak / 2**20:8.1f} MiB")
+
+
+def consume(rows) -> None:
+    for _ in rows:
+        pass
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "achats.csv"
+        write_csv(src, n)
+        db = Path(tmp) / "listing.db"
+        init_db(db)
+        import_purchases(db, src)
+        every, one = PurchaseFilter(), PurchaseFilter(supplier_id=7)
+        print(f"book: {n:,} purchases, {N_SUPPLIERS} suppliers")
+        measure("fetch_purchases (all)", lambda: fetch_purchases(db, every))
+        measure("iter_purchases (all)", lambda: consume(iter_purchases(db, every)))
+        measure(
+            "iter_purchases (all, list columns)",
+            lambda: consume(iter_purchases(db, every, LIST_COLUMNS)),
+        )
+        measure("fetch_purchases (supplier)", lambda: fetch_purchases(db, one))
+        measure(
+            "first page (supplier)",
+            lambda: fetch_purchase_page(db, one, columns=LIST_COLUMNS),
+        )
+        close_all()
+
+
+if __name__ == "__main__":
+    main()
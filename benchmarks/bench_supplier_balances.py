@@ -0,0 +1,107 @@
+"""Supplier balances and transactions through the purchase links.
+
+Run with ``PYTHONPATH=. python benchmarks/bench_supplier_balances.py
+[purchases]``; the default book holds 50,000 purchases spread over 2,000
+suppliers, a third of them paid.  The former piece-matching queries are
+timed alongside for reference.
+"""
+
+from __future__ import annotations
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from MOTEUR.compta.achats.db import init_db
+from MOTEUR.compta.achats.importer import import_purchases
+from MOTEUR.compta.db import close_all, connection
+from MOTEUR.compta.suppliers import (
+    get_supplier_transactions,
+    get_suppliers_with_balance,
+)
+
+N_SUPPLIERS = 2000
+
+SQL_BALANCES_BY_PIECE = """
+SELECT s.id, s.name,
+       SUM(CASE WHEN el.debit>0 THEN el.debit ELSE -el.credit END)
+FROM suppliers s
+CROSS JOIN purchases   p  ON p.supplier_id = s.id
+CROSS JOIN entries     e  ON e.ref = p.piece
+CROSS JOIN entry_lines el ON el.entry_id = e.id
+WHERE el.account IN ('401','408','4091')
+GROUP BY s.id
+ORDER BY s.name
+"""
+
+SQL_TRANSACTIONS_BY_PIECE = """
+SELECT e.date, e.journal, e.ref, e.memo, el.debit, el.credit
+FROM purchases p CROSS JOIN entries e ON e.ref = p.piece
+CROSS JOIN entry_lines el ON el.entry_id = e.id
+WHERE p.supplier_id = ? AND el.account IN ('401','408','4091')
+ORDER BY e.date, e.id, el.id
+"""
+
+
+def write_csv(path: Path, n: int) -> None:
+    with path.open("w", encoding="utf-8") as fh:
+        fh.write("date;piece;fournisseur;libelle;ttc;tva;compte\n")
+        for i in range(n):
+            fh.write(
+                f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d};F{i};"
+                f"Fournisseur {i % N_SUPPLIERS};Achat;{i % 997 + 1},20;20;601\n"
+            )
+
+
+def timed(label: str, func, repeat: int = 5) -> None:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:32} {best * 1000:9.2f} ms")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "achats.csv"
+        write_csv(src, n)
+        db = Path(tmp) / "suppliers.db"
+        init_db(db)
+        import_purchases(db, src)
+        with connection(db) as conn:
+            conn.execute(
+                "INSERT INTO entries (journal, ref, date, memo, purchase_id, supplier_id) "
+                "SELECT 'BQ', piece, due_date, 'Paiement', id, supplier_id "
+                "FROM purchases WHERE id % 3 = 0"
+            )
+            conn.execute(
+                "INSERT INTO entry_lines (entry_id, account, debit, credit, purchase_id, supplier_id) "
+                "SELECT e.id, a.account, a.sign * p.ttc_amount, (1 - a.sign) * p.ttc_amount, "
+                "e.purchase_id, e.supplier_id FROM entries e "
+                "JOIN purchases p ON p.id = e.purchase_id "
+                "CROSS JOIN (SELECT '401' AS account, 1 AS sign UNION ALL SELECT '512', 0) a "
+                "WHERE e.journal = 'BQ'"
+            )
+            conn.commit()
+        print(f"book: {n:,} purchases, {N_SUPPLIERS:,} suppliers")
+        timed("get_suppliers_with_balance", lambda: get_suppliers_with_balance(db))
+        timed("get_supplier_transactions", lambda: get_supplier_transactions(db, 7))
+        with connection(db) as conn:
+            timed(
+                "balances by piece",
+                lambda: conn.execute(SQL_BALANCES_BY_PIECE).fetchall(),
+                repeat=1,
+            )
+            timed(
+                "transactions by piece",
+                lambda: conn.execute(SQL_TRANSACTIONS_BY_PIECE, (7,)).fetchall(),
+                repeat=1,
+            )
+        close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -28,9 +28,12 @@ from MOTEUR.compta.ventes.widget import VenteWidget
 from MOTEUR.compta.accounting.widget import AccountWidget
 from MOTEUR.scraping.widgets.profile_widget import ProfileWidget
 from MOTEUR.compta.dashboard.widget import DashboardWidget
+from MOTEUR.compta.db import close_all
+from migrations import apply_migrations
 import subprocess
 
 BASE_DIR = Path(__file__).resolve().parent
+COMPTA_DB = BASE_DIR / "MOTEUR" / "compta.db"
 
 
 class SidebarButton(QPushButton):
@@ -232,6 +235,15 @@ class MainWindow(QMainWindow):
                 btn.clicked.connect(
                     lambda _, b=btn: self.show_ventes_page(b)
                 )
+            elif name == "Grand Livre":
+                self.grand_livre_btn = btn
+                btn.clicked.connect(
+                    lambda _, b=btn: self.show_grand_livre_page(b)
+                )
+            elif name in ("Bilan", "Résultat"):
+                btn.clicked.connect(
+                    lambda _, n=name, b=btn: self.show_statement_page(n, b)
+                )
             else:
                 btn.clicked.connect(
                     lambda _, n=name, b=btn: self.display_content(
@@ -382,6 +394,25 @@ class MainWindow(QMainWindow):
         self.revision_page = RevisionTab()
         self.stack.addWidget(self.revision_page)
 
+        from MOTEUR.compta.revision import GrandLivreWidget
+
+        self.grand_livre_page = GrandLivreWidget()
+        self.stack.addWidget(self.grand_livre_page)
+
+        from MOTEUR.compta.reports import (
+            BALANCE_SHEET,
+            INCOME_STATEMENT,
+            StatementWidget,
+        )
+
+        # Bilan and Résultat pages, keyed by sidebar entry
+        self.statement_pages = {
+            "Bilan": StatementWidget(BALANCE_SHEET),
+            "Résultat": StatementWidget(INCOME_STATEMENT),
+        }
+        for page in self.statement_pages.values():
+            self.stack.addWidget(page)
+
         # Page for ventes
         self.ventes_page = VenteWidget()
         self.stack.addWidget(self.ventes_page)
@@ -470,6 +501,18 @@ class MainWindow(QMainWindow):
         button.setChecked(True)
         self.stack.setCurrentWidget(self.revision_page)
 
+    def show_grand_livre_page(self, button: SidebarButton) -> None:
+        """Display the general ledger page."""
+        self.clear_selection()
+        button.setChecked(True)
+        self.stack.setCurrentWidget(self.grand_livre_page)
+
+    def show_statement_page(self, name: str, button: SidebarButton) -> None:
+        """Display the balance sheet or income statement page."""
+        self.clear_selection()
+        button.setChecked(True)
+        self.stack.setCurrentWidget(self.statement_pages[name])
+
     def show_journals_page(self, button: SidebarButton) -> None:
         """Display the journals management page."""
         self.clear_selection()
@@ -504,7 +547,7 @@ class MainWindow(QMainWindow):
         """Open a comptabilité page from dashboard links."""
         btn = self.compta_buttons.get(name)
         if btn:
-            self.display_content(f"Comptabilité : {name}", btn)
+            btn.click()
 
     def show_settings(self) -> None:
         """Display the settings page."""
@@ -564,6 +607,8 @@ class MainWindow(QMainWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.aboutToQuit.connect(close_all)
+    apply_migrations(COMPTA_DB)
     interface = MainWindow()
     interface.show()
     sys.exit(app.exec())
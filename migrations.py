@@ -1,16 +1,719 @@
 from __future__ import annotations
 
+import logging
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Callable, List, Tuple
 
-from MOTEUR.compta.achats.db import init_db as init_purchase
-from MOTEUR.compta.db import connect
+from MOTEUR.compta.accounting.db import _create_schema as _ledger_schema
+from MOTEUR.compta.achats.db import _create_schema as _purchase_schema
+from MOTEUR.compta.db import connection, mark_bootstrapped, migrate_to_cents
+from MOTEUR.compta.revision.revision_services import (
+    _create_view as _revision_view,
+)
+from MOTEUR.compta.suppliers.supplier_services import (
+    _create_view as _supplier_view,
+)
+from MOTEUR.compta.ventes.db import _create_schema as _sales_schema
 
+logger = logging.getLogger(__name__)
 
-def apply_migrations(db_path: Path | str) -> None:
-    """Initialize or migrate the database schema."""
-    init_purchase(db_path)
-    sql_path = Path(__file__).with_name("migration_03.sql")
-    if sql_path.exists():
-        with connect(db_path) as conn, sql_path.open() as fh:
-            conn.executescript(fh.read())
-            conn.commit()
+# Module helpers bringing a database to the current schema without
+# migrations; apply_migrations marks them as done once it has run.
+BOOTSTRAP_STEPS = (
+    _ledger_schema,
+    _purchase_schema,
+    _sales_schema,
+    _revision_view,
+    _supplier_view,
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """Schema helpers run once when ``PRAGMA user_version`` is below it."""
+
+    version: int
+    name: str
+    steps: Tuple[Callable, ...]
+
+    def apply(self, conn) -> None:
+        for step in self.steps:
+            step(conn)
+
+
+@dataclass
+class MigrationReport:
+    """Timing of an applied migration."""
+
+    version: int
+    name: str
+    seconds: float
+
+
+def _exists(conn, kind: str, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type=? AND name=?", (kind, name)
+    ).fetchone() is not None
+
+
+def _add_column(conn, table: str, column: str, decl: str) -> None:
+    columns = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+# ----------------------------------------------------------------------
+# Each version below holds the DDL and backfill it introduced, frozen as
+# released: the module schemas keep evolving, these never change.  Steps
+# stay idempotent since a database may already have been created by the
+# module ``init_db`` helpers before its first migration.
+
+# 1 - ledger and purchase schema.  Also upgrades databases created before
+# versioning: legacy purchase columns, REAL amounts, missing balance tables.
+V1_CREATE_ACCOUNTS = """
+CREATE TABLE IF NOT EXISTS accounts (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    parent_code TEXT REFERENCES accounts(code)
+)"""
+
+V1_CREATE_ENTRIES = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    journal TEXT NOT NULL,
+    ref TEXT,
+    date TEXT NOT NULL,
+    memo TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+)"""
+
+V1_CREATE_LINES = """
+CREATE TABLE IF NOT EXISTS entry_lines (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    entry_id INTEGER NOT NULL REFERENCES entries(id) ON DELETE CASCADE,
+    account TEXT NOT NULL,
+    debit INTEGER NOT NULL DEFAULT 0 CHECK(debit>=0),
+    credit INTEGER NOT NULL DEFAULT 0 CHECK(credit>=0),
+    description TEXT,
+    letter_code TEXT
+)"""
+
+V1_CREATE_SEQUENCES = """
+CREATE TABLE IF NOT EXISTS sequences (
+    journal TEXT NOT NULL,
+    fiscal_year INTEGER NOT NULL,
+    next_number INTEGER NOT NULL,
+    PRIMARY KEY (journal, fiscal_year)
+)
+"""
+
+V1_CREATE_JOURNALS = """
+CREATE TABLE IF NOT EXISTS journals (
+    code TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+)"""
+
+V1_CREATE_CLOSED_YEARS = """
+CREATE TABLE IF NOT EXISTS closed_years (
+    year INTEGER PRIMARY KEY
+)"""
+
+V1_CREATE_BALANCES = """
+CREATE TABLE IF NOT EXISTS account_balances (
+    account TEXT PRIMARY KEY,
+    debit INTEGER NOT NULL DEFAULT 0,
+    credit INTEGER NOT NULL DEFAULT 0
+)"""
+
+V1_CREATE_PERIOD_BALANCES = """
+CREATE TABLE IF NOT EXISTS account_period_balances (
+    account TEXT NOT NULL,
+    period TEXT NOT NULL,
+    debit INTEGER NOT NULL DEFAULT 0,
+    credit INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (account, period)
+) WITHOUT ROWID"""
+
+V1_BALANCE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_balance_ins
+    AFTER INSERT ON entry_lines
+    BEGIN
+        INSERT INTO account_balances (account, debit, credit)
+        VALUES (NEW.account, NEW.debit, NEW.credit)
+        ON CONFLICT(account) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_balance_del
+    AFTER DELETE ON entry_lines
+    BEGIN
+        UPDATE account_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_balance_upd
+    AFTER UPDATE OF account, debit, credit ON entry_lines
+    BEGIN
+        UPDATE account_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account;
+        INSERT INTO account_balances (account, debit, credit)
+        VALUES (NEW.account, NEW.debit, NEW.credit)
+        ON CONFLICT(account) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+]
+
+V1_PERIOD_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_period_ins
+    AFTER INSERT ON entry_lines
+    BEGIN
+        INSERT INTO account_period_balances (account, period, debit, credit)
+        SELECT NEW.account, substr(e.date, 1, 7), NEW.debit, NEW.credit
+        FROM entries e WHERE e.id = NEW.entry_id
+        ON CONFLICT(account, period) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_period_del
+    AFTER DELETE ON entry_lines
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account
+          AND period = (
+              SELECT substr(date, 1, 7) FROM entries WHERE id = OLD.entry_id
+          );
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_el_period_upd
+    AFTER UPDATE OF account, debit, credit, entry_id ON entry_lines
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - OLD.debit,
+            credit = credit - OLD.credit
+        WHERE account = OLD.account
+          AND period = (
+              SELECT substr(date, 1, 7) FROM entries WHERE id = OLD.entry_id
+          );
+        INSERT INTO account_period_balances (account, period, debit, credit)
+        SELECT NEW.account, substr(e.date, 1, 7), NEW.debit, NEW.credit
+        FROM entries e WHERE e.id = NEW.entry_id
+        ON CONFLICT(account, period) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_entries_period_del
+    BEFORE DELETE ON entries
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - (
+                SELECT IFNULL(SUM(el.debit), 0) FROM entry_lines el
+                WHERE el.entry_id = OLD.id
+                  AND el.account = account_period_balances.account
+            ),
+            credit = credit - (
+                SELECT IFNULL(SUM(el.credit), 0) FROM entry_lines el
+                WHERE el.entry_id = OLD.id
+                  AND el.account = account_period_balances.account
+            )
+        WHERE period = substr(OLD.date, 1, 7)
+          AND account IN (
+              SELECT account FROM entry_lines WHERE entry_id = OLD.id
+          );
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_entries_period_upd
+    AFTER UPDATE OF date ON entries
+    WHEN substr(OLD.date, 1, 7) <> substr(NEW.date, 1, 7)
+    BEGIN
+        UPDATE account_period_balances SET
+            debit = debit - (
+                SELECT IFNULL(SUM(el.debit), 0) FROM entry_lines el
+                WHERE el.entry_id = NEW.id
+                  AND el.account = account_period_balances.account
+            ),
+            credit = credit - (
+                SELECT IFNULL(SUM(el.credit), 0) FROM entry_lines el
+                WHERE el.entry_id = NEW.id
+                  AND el.account = account_period_balances.account
+            )
+        WHERE period = substr(OLD.date, 1, 7)
+          AND account IN (
+              SELECT account FROM entry_lines WHERE entry_id = NEW.id
+          );
+        INSERT INTO account_period_balances (account, period, debit, credit)
+        SELECT account, substr(NEW.date, 1, 7), SUM(debit), SUM(credit)
+        FROM entry_lines WHERE entry_id = NEW.id
+        GROUP BY account
+        ON CONFLICT(account, period) DO UPDATE SET
+            debit = debit + excluded.debit,
+            credit = credit + excluded.credit;
+    END""",
+]
+
+V1_REBUILD_BALANCES = (
+    "INSERT INTO account_balances (account, debit, credit) "
+    "SELECT account, SUM(debit), SUM(credit) FROM entry_lines "
+    "GROUP BY account"
+)
+
+V1_REBUILD_PERIOD_BALANCES = (
+    "INSERT INTO account_period_balances (account, period, debit, credit) "
+    "SELECT el.account, substr(e.date, 1, 7), SUM(el.debit), SUM(el.credit) "
+    "FROM entry_lines el JOIN entries e ON e.id = el.entry_id "
+    "GROUP BY el.account, substr(e.date, 1, 7)"
+)
+
+V1_CREATE_SUPPLIERS = """
+CREATE TABLE IF NOT EXISTS suppliers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    vat_number TEXT,
+    address TEXT,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+)"""
+
+V1_CREATE_PURCHASES = """
+CREATE TABLE IF NOT EXISTS purchases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    piece TEXT NOT NULL,
+    supplier_id INTEGER NOT NULL REFERENCES suppliers(id),
+    label TEXT NOT NULL,
+    ttc_amount INTEGER NOT NULL CHECK(ttc_amount >= 0),
+    vat_rate REAL NOT NULL CHECK(vat_rate IN (0,2.1,5.5,10,20)),
+    account_code TEXT NOT NULL REFERENCES accounts(code),
+    due_date TEXT NOT NULL,
+    payment_status TEXT NOT NULL CHECK(
+        payment_status IN ('A_PAYER','PAYE','PARTIEL')
+    ),
+    payment_date TEXT,
+    payment_method TEXT,
+    is_advance INTEGER DEFAULT 0 CHECK(is_advance IN (0,1)),
+    is_invoice_received INTEGER DEFAULT 1 CHECK(is_invoice_received IN (0,1)),
+    attachment_path TEXT,
+    created_by TEXT,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+)"""
+
+V1_PURCHASE_INDEXES = [
+    (
+        "CREATE UNIQUE INDEX IF NOT EXISTS unq_supplier_piece "
+        "ON purchases(supplier_id, piece)"
+    ),
+    "CREATE INDEX IF NOT EXISTS idx_purchases_date ON purchases(date)",
+    (
+        "CREATE INDEX IF NOT EXISTS idx_purchases_supplier "
+        "ON purchases(supplier_id)"
+    ),
+]
+
+V1_LEDGER_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_entries_date ON entries(date)",
+    "CREATE INDEX IF NOT EXISTS idx_entries_ref ON entries(ref)",
+    "CREATE INDEX IF NOT EXISTS idx_el_entry ON entry_lines(entry_id)",
+    "CREATE INDEX IF NOT EXISTS idx_el_letter ON entry_lines(account, letter_code)",
+]
+
+
+def _v1_ledger(conn) -> None:
+    conn.execute(V1_CREATE_ACCOUNTS)
+    conn.execute(V1_CREATE_ENTRIES)
+    conn.execute(V1_CREATE_LINES)
+    migrated = migrate_to_cents(
+        conn, "entry_lines", V1_CREATE_LINES, ("debit", "credit")
+    )
+    conn.execute(V1_CREATE_SEQUENCES)
+    conn.execute(V1_CREATE_JOURNALS)
+    conn.execute(V1_CREATE_CLOSED_YEARS)
+    for sql in V1_LEDGER_INDEXES:
+        conn.execute(sql)
+    rebuild = migrated or not (
+        _exists(conn, "table", "account_balances")
+        and _exists(conn, "table", "account_period_balances")
+    )
+    conn.execute(V1_CREATE_BALANCES)
+    conn.execute(V1_CREATE_PERIOD_BALANCES)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_apb_period "
+        "ON account_period_balances(period, account)"
+    )
+    for sql in V1_BALANCE_TRIGGERS + V1_PERIOD_TRIGGERS:
+        conn.execute(sql)
+    if rebuild:
+        conn.execute("DELETE FROM account_balances")
+        conn.execute(V1_REBUILD_BALANCES)
+        conn.execute("DELETE FROM account_period_balances")
+        conn.execute(V1_REBUILD_PERIOD_BALANCES)
+
+
+def _v1_purchases(conn) -> None:
+    conn.execute(V1_CREATE_SUPPLIERS)
+    conn.execute(V1_CREATE_PURCHASES)
+    columns = {r[1] for r in conn.execute("PRAGMA table_info(purchases)")}
+    if "invoice_number" in columns and "piece" not in columns:
+        conn.execute("ALTER TABLE purchases ADD COLUMN piece TEXT")
+        conn.execute(
+            "UPDATE purchases SET piece=invoice_number WHERE piece IS NULL OR piece=''"
+        )
+    if {"ht_amount", "vat_amount"} <= columns and "ttc_amount" not in columns:
+        conn.execute("ALTER TABLE purchases ADD COLUMN ttc_amount REAL")
+        conn.execute("UPDATE purchases SET ttc_amount=ht_amount + vat_amount")
+    conn.execute("DROP TRIGGER IF EXISTS trg_purchase_vat")
+    conn.execute("DROP TRIGGER IF EXISTS trg_purchase_vat_up")
+    conn.execute("DROP INDEX IF EXISTS unq_supplier_invoice")
+    migrate_to_cents(conn, "purchases", V1_CREATE_PURCHASES, ("ttc_amount",))
+    for sql in V1_PURCHASE_INDEXES:
+        conn.execute(sql)
+
+
+# 2 - sales table.
+V2_CREATE_SALES = """
+CREATE TABLE IF NOT EXISTS sales (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    label TEXT NOT NULL,
+    amount INTEGER NOT NULL
+)"""
+
+
+def _v2_sales(conn) -> None:
+    conn.execute(V2_CREATE_SALES)
+    migrate_to_cents(conn, "sales", V2_CREATE_SALES, ("amount",))
+
+
+# 3 - balance views, with the indexes the account view was read through.
+V3_CREATE_ACCOUNT_VIEW = """
+CREATE VIEW IF NOT EXISTS account_balance_v AS
+SELECT a.code                  AS account_code,
+       a.name                  AS account_name,
+       IFNULL(SUM(el.debit - el.credit), 0) AS balance
+FROM   accounts a
+LEFT JOIN entry_lines el ON el.account = a.code
+GROUP BY a.code;
+"""
+
+V3_CREATE_SUPPLIER_VIEW = """
+CREATE VIEW IF NOT EXISTS supplier_balance_v AS
+SELECT s.id      AS supplier_id,
+       s.name    AS supplier_name,
+       COALESCE(SUM(CASE WHEN el.debit>0 THEN el.debit ELSE -el.credit END), 0) AS balance
+FROM suppliers s
+LEFT JOIN entries   e   ON e.ref IN (
+      SELECT piece FROM purchases WHERE supplier_id = s.id)
+LEFT JOIN entry_lines el ON el.entry_id = e.id
+WHERE el.account IN ('401','408','4091')
+GROUP BY s.id;
+"""
+V3_VIEW_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_el_account ON entry_lines(account)",
+    "CREATE INDEX IF NOT EXISTS idx_entries_ref ON entries(ref)",
+]
+
+
+def _v3_views(conn) -> None:
+    conn.execute(V3_CREATE_ACCOUNT_VIEW)
+    for sql in V3_VIEW_INDEXES:
+        conn.execute(sql)
+    conn.execute(V3_CREATE_SUPPLIER_VIEW)
+
+
+# 4 - hot-path indexes replacing single-column ones.
+V4_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_entries_ref_journal ON entries(ref, journal)",
+    (
+        "CREATE INDEX IF NOT EXISTS idx_purchases_supplier_date "
+        "ON purchases(supplier_id, date)"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_purchases_status_date "
+        "ON purchases(payment_status, date)"
+    ),
+]
+V4_OBSOLETE_INDEXES = ("idx_entries_ref", "idx_el_account", "idx_purchases_supplier")
+
+
+def _v4_indexes(conn) -> None:
+    for sql in V4_INDEXES:
+        conn.execute(sql)
+    for name in V4_OBSOLETE_INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+# 5 - account closure (every prefix of every account code, up to 20).
+V5_CREATE_CLOSURE = """
+CREATE TABLE IF NOT EXISTS account_closure (
+    ancestor TEXT NOT NULL,
+    descendant TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    PRIMARY KEY (ancestor, descendant)
+) WITHOUT ROWID"""
+V5_PREFIXES = (
+    "INSERT OR IGNORE INTO account_closure (ancestor, descendant, depth) "
+    "SELECT substr({code}, 1, n.value), {code}, length({code}) - n.value "
+    "FROM {source}"
+    f"json_each('{list(range(1, 21))}') n "
+    "WHERE n.value <= length({code})"
+)
+V5_CLOSURE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_ins
+    AFTER INSERT ON accounts
+    BEGIN
+        {V5_PREFIXES.format(code="NEW.code", source="")};
+    END""",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_balances_closure_ins
+    AFTER INSERT ON account_balances
+    BEGIN
+        {V5_PREFIXES.format(code="NEW.account", source="")};
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_accounts_closure_del
+    AFTER DELETE ON accounts
+    WHEN NOT EXISTS (SELECT 1 FROM account_balances WHERE account = OLD.code)
+    BEGIN
+        DELETE FROM account_closure WHERE descendant = OLD.code;
+    END""",
+]
+V5_REBUILD_CLOSURE = V5_PREFIXES.format(
+    code="c.code",
+    source="(SELECT code FROM accounts UNION "
+    "SELECT account FROM account_balances) c, ",
+)
+
+
+def _v5_closure(conn) -> None:
+    rebuild = not _exists(conn, "table", "account_closure")
+    conn.execute(V5_CREATE_CLOSURE)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_closure_descendant "
+        "ON account_closure(descendant)"
+    )
+    for sql in V5_CLOSURE_TRIGGERS:
+        conn.execute(sql)
+    if rebuild:
+        conn.execute(V5_REBUILD_CLOSURE)
+
+
+# 6 - purchase and supplier links on entries and lines, filled from the
+# piece references, and the supplier view reading them.
+V6_LINK_ENTRIES = """
+UPDATE entries SET purchase_id = p.id, supplier_id = p.supplier_id
+FROM (SELECT MIN(id) AS id FROM purchases GROUP BY piece) m
+JOIN purchases p ON p.id = m.id
+WHERE p.piece = entries.ref AND entries.purchase_id IS NULL
+"""
+
+V6_LINK_LINES = """
+UPDATE entry_lines SET purchase_id = e.purchase_id, supplier_id = e.supplier_id
+FROM entries e
+WHERE e.id = entry_lines.entry_id AND e.purchase_id IS NOT NULL
+  AND entry_lines.purchase_id IS NULL
+"""
+
+V6_LINK_INDEXES = [
+    (
+        "CREATE INDEX IF NOT EXISTS idx_entries_purchase "
+        "ON entries(purchase_id) WHERE purchase_id IS NOT NULL"
+    ),
+    (
+        "CREATE INDEX IF NOT EXISTS idx_el_purchase "
+        "ON entry_lines(purchase_id) WHERE purchase_id IS NOT NULL"
+    ),
+    # Covers the supplier balances and transactions.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_el_supplier "
+        "ON entry_lines(supplier_id, account, debit, credit) "
+        "WHERE supplier_id IS NOT NULL"
+    ),
+]
+
+V6_CREATE_SUPPLIER_VIEW = """
+CREATE VIEW IF NOT EXISTS supplier_balance_v AS
+SELECT s.id      AS supplier_id,
+       s.name    AS supplier_name,
+       COALESCE(SUM(CASE WHEN el.debit>0 THEN el.debit ELSE -el.credit END), 0) AS balance
+FROM suppliers s
+JOIN entry_lines el ON el.supplier_id = s.id
+WHERE el.account IN ('401','408','4091')
+GROUP BY s.id;
+"""
+
+
+def _v6_links(conn) -> None:
+    for table in ("entries", "entry_lines"):
+        _add_column(conn, table, "purchase_id", "INTEGER")
+        _add_column(conn, table, "supplier_id", "INTEGER")
+    if not _exists(conn, "index", "idx_entries_purchase"):
+        conn.execute(V6_LINK_ENTRIES)
+        conn.execute(V6_LINK_LINES)
+    for sql in V6_LINK_INDEXES:
+        conn.execute(sql)
+    conn.execute("DROP VIEW IF EXISTS supplier_balance_v")
+    conn.execute(V6_CREATE_SUPPLIER_VIEW)
+
+
+# 7 - purchase payments, backfilled from the linked bank entries.
+V7_CREATE_PAYMENTS = """
+CREATE TABLE IF NOT EXISTS purchase_payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    purchase_id INTEGER NOT NULL REFERENCES purchases(id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    method TEXT,
+    amount INTEGER NOT NULL CHECK(amount >= 0),
+    entry_id INTEGER REFERENCES entries(id) ON DELETE CASCADE
+)"""
+
+V7_PAYMENT_INDEXES = [
+    (
+        "CREATE INDEX IF NOT EXISTS idx_payments_purchase "
+        "ON purchase_payments(purchase_id, date)"
+    ),
+    # Lets SQLite check the foreign key when an entry is deleted.
+    (
+        "CREATE INDEX IF NOT EXISTS idx_payments_entry "
+        "ON purchase_payments(entry_id)"
+    ),
+]
+
+V7_PAYMENT_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payments_ins
+    AFTER INSERT ON purchase_payments
+    BEGIN
+        UPDATE purchases SET
+            paid_amount = paid_amount + NEW.amount,
+            payment_status = CASE
+                WHEN paid_amount + NEW.amount >= ttc_amount THEN 'PAYE'
+                ELSE 'PARTIEL' END,
+            payment_date = NEW.date,
+            payment_method = NEW.method
+        WHERE id = NEW.purchase_id;
+    END""",
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_payments_del
+    AFTER DELETE ON purchase_payments
+    BEGIN
+        UPDATE purchases SET
+            paid_amount = paid_amount - OLD.amount,
+            payment_status = CASE
+                WHEN paid_amount - OLD.amount <= 0 THEN 'A_PAYER'
+                WHEN paid_amount - OLD.amount >= ttc_amount THEN 'PAYE'
+                ELSE 'PARTIEL' END
+        WHERE id = OLD.purchase_id;
+    END""",
+]
+
+V7_BACKFILL_PAYMENTS = """
+INSERT INTO purchase_payments (purchase_id, date, method, amount, entry_id)
+SELECT e.purchase_id, e.date, p.payment_method, SUM(el.debit), e.id
+FROM entries e
+JOIN purchases p ON p.id = e.purchase_id
+JOIN entry_lines el ON el.entry_id = e.id
+WHERE e.journal = 'BQ' AND e.purchase_id IS NOT NULL
+  AND el.account IN ('401','408','4091')
+GROUP BY e.id
+ORDER BY e.id
+"""
+
+
+def _v7_payments(conn) -> None:
+    _add_column(conn, "purchases", "paid_amount", "INTEGER NOT NULL DEFAULT 0")
+    backfill = not _exists(conn, "table", "purchase_payments")
+    conn.execute(V7_CREATE_PAYMENTS)
+    for sql in V7_PAYMENT_INDEXES + V7_PAYMENT_TRIGGERS:
+        conn.execute(sql)
+    if backfill:
+        conn.execute(V7_BACKFILL_PAYMENTS)
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_purchases_due ON purchases(due_date) "
+        "WHERE payment_status IN ('A_PAYER','PARTIEL')"
+    )
+
+
+# 8 - payments by date, for the aged payables.
+def _v8_payment_dates(conn) -> None:
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_payments_date ON purchase_payments(date)"
+    )
+
+
+# Append new versions with the next number and their own step; never
+# renumber or edit an applied one.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "ledger and purchase schema", (_v1_ledger, _v1_purchases)),
+    Migration(2, "sales table", (_v2_sales,)),
+    Migration(3, "balance views", (_v3_views,)),
+    Migration(4, "hot-path indexes", (_v4_indexes,)),
+    Migration(5, "account closure", (_v5_closure,)),
+    Migration(6, "purchase links on entries", (_v6_links,)),
+    Migration(7, "purchase payments", (_v7_payments,)),
+    Migration(8, "aged payables index", (_v8_payment_dates,)),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(db_path: Path | str) -> int:
+    """Return the schema version recorded in *db_path*."""
+    with connection(db_path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(db_path: Path | str) -> List[MigrationReport]:
+    """Bring *db_path* up to :data:`SCHEMA_VERSION`.
+
+    An up-to-date database costs a single ``PRAGMA user_version`` read.
+    Pending steps run in order inside one transaction together with the
+    version bump, so a failure leaves the database untouched.  Return the
+    timing of each applied step.
+
+    Afterwards the module ``init_db``/``init_view`` helpers know the schema
+    is in place and no longer touch it for the rest of the process.
+    """
+    if schema_version(db_path) >= SCHEMA_VERSION:
+        _mark_all(db_path)
+        return []
+    reports: List[MigrationReport] = []
+    with connection(db_path, immediate=True) as conn:
+        # Re-read under the write lock in case another process migrated.
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS:
+            if migration.version <= current:
+                continue
+            start = time.perf_counter()
+            migration.apply(conn)
+            reports.append(
+                MigrationReport(
+                    migration.version,
+                    migration.name,
+                    time.perf_counter() - start,
+                )
+            )
+            logger.info(
+                "Applied migration %03d %s in %.3f s",
+                migration.version,
+                migration.name,
+                reports[-1].seconds,
+            )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    _mark_all(db_path)
+    return reports
+
+
+def _mark_all(db_path: Path | str) -> None:
+    mark_bootstrapped(db_path, BOOTSTRAP_STEPS)
@@ -1,6 +1,26 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
 root = Path(__file__).resolve().parents[1]
 if str(root) not in sys.path:
     sys.path.insert(0, str(root))
+
+from MOTEUR.compta.db import close_all  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _close_pooled_connections():
+    yield
+    close_all()
+
+
+@pytest.fixture
+def qapp():
+    """Return the QApplication of the widget tests, created offscreen."""
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
@@ -1,10 +1,18 @@
+import sqlite3
+
 from MOTEUR.compta.accounting.db import (
     init_db,
     add_account,
     update_account,
     delete_account,
     fetch_accounts,
+    create_entry,
+    get_account_rollup,
+    get_account_tree,
+    rebuild_account_closure,
 )
+from MOTEUR.compta.db import close
+from MOTEUR.compta.models import EntryLine
 
 
 def test_accounts_crud(tmp_path):
@@ -25,3 +33,59 @@ def test_accounts_crud(tmp_path):
     delete_account(db, "701")
     accts = fetch_accounts(db)
     assert all(code != "701" for code, _ in accts)
+
+
+def _post(db, ref, debit_account, credit_account, amount):
+    create_entry(db, "OD", "2025-01-01", ref, "", [
+        EntryLine(debit_account, debit=amount),
+        EntryLine(credit_account, credit=amount),
+    ])
+
+
+def test_account_tree_rolls_up_sub_accounts(tmp_path):
+    db = tmp_path / "tree.db"
+    init_db(db)
+    add_account(db, "601", "Achats")
+    add_account(db, "6011", "Matières")
+    _post(db, "R1", "6011", "512", 10.0)
+    _post(db, "R2", "606300", "512", 5.0)
+
+    tree = {n.code: (n.name, n.balance) for n in get_account_tree(db)}
+    assert list(tree) == ["5", "51", "512", "6", "60", "601", "6011", "606", "606300"]
+    assert tree["6"] == (None, 15.0)
+    assert tree["601"] == ("Achats", 10.0)
+    assert tree["512"] == (None, -15.0)
+    assert get_account_rollup(db, "60").balance == 15.0
+    assert get_account_rollup(db, "7").balance == 0.0
+
+    subset = [n.code for n in get_account_tree(db, ["606300"])]
+    assert subset == ["6", "60", "606", "606300"]
+
+
+def test_account_closure_follows_account_rows(tmp_path):
+    db = tmp_path / "tree.db"
+    init_db(db)
+    add_account(db, "4011", "Fournisseur A")
+    add_account(db, "512", "Banque")
+    _post(db, "R1", "4011", "512", 3.0)
+    delete_account(db, "4011")  # still has a balance, stays in the tree
+    add_account(db, "7071", "Ventes")
+    delete_account(db, "7071")
+
+    codes = [n.code for n in get_account_tree(db)]
+    assert "4011" in codes
+    assert not [c for c in codes if c.startswith("7")]
+    assert get_account_rollup(db, "40").balance == 3.0
+
+
+def test_account_closure_rebuilt_for_existing_databases(tmp_path):
+    db = tmp_path / "tree.db"
+    init_db(db)
+    _post(db, "R1", "601", "512", 2.0)
+    close(db)
+    with sqlite3.connect(db) as conn:
+        conn.execute("DROP TABLE account_closure")
+    init_db(db)
+    assert get_account_rollup(db, "6").balance == 2.0
+    rebuild_account_closure(db)
+    assert [n.code for n in get_account_tree(db, ["512"])] == ["5", "51", "512"]
@@ -1,12 +1,17 @@
 from pathlib import Path
 
+import pytest
+
 from MOTEUR.compta.achats.db import (
     init_db,
     add_purchase,
     pay_purchase,
     get_vat_summary,
+    fetch_purchase_page,
+    fetch_purchases,
+    iter_purchases,
 )
-from MOTEUR.compta.models import Purchase
+from MOTEUR.compta.models import Purchase, PurchaseFilter
 from MOTEUR.compta.db import connect
 from MOTEUR.compta.accounting.db import entry_balanced
 
@@ -85,3 +90,38 @@ def test_payment_creates_entry(tmp_path: Path) -> None:
             ("INV1",),
         )
         assert cur.fetchone()[0] == 1
+
+
+def test_purchase_pages_follow_date_and_id(tmp_path: Path) -> None:
+    db = tmp_path / "p.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('A'), ('B')")
+        conn.commit()
+    for i in range(7):
+        add_purchase(
+            db,
+            Purchase(None, f"2024-01-0{i % 3 + 1}", f"F{i}", i % 2 + 1, "Achat",
+                     10.0 + i, 20, "601", "2024-02-05", "A_PAYER"),
+        )
+    flt = PurchaseFilter()
+    expected = [p.piece for p in fetch_purchases(db, flt)]
+    assert expected == ["F0", "F3", "F6", "F1", "F4", "F2", "F5"]
+
+    pieces, cursor = [], None
+    while True:
+        page = fetch_purchase_page(db, flt, cursor, limit=2, columns=("piece",))
+        assert len(page.rows) <= 2
+        pieces += [r[0] for r in page.rows]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert pieces == expected
+
+    rows = list(iter_purchases(db, PurchaseFilter(supplier_id=1), ("piece", "ttc_amount"), 2))
+    assert rows == [("F0", 10.0), ("F6", 16.0), ("F4", 14.0), ("F2", 12.0)]
+    assert [p.ttc_amount for p in iter_purchases(db, flt, page_size=3)] == [
+        10.0, 13.0, 16.0, 11.0, 14.0, 12.0, 15.0
+    ]
+    with pytest.raises(ValueError):
+        fetch_purchases(db, flt, ("piece", "1; DROP TABLE purchases"))
@@ -0,0 +1,55 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from MOTEUR.compta.accounting.db import (
+    create_entries_bulk,
+    entry_balanced,
+    init_db,
+)
+from MOTEUR.compta.achats.signals import signals
+from MOTEUR.compta.db import connect
+from MOTEUR.compta.models import Entry, EntryLine
+
+
+def _entry(i: int, amount: float = 10.0) -> Entry:
+    return Entry(
+        "OD",
+        "2024-03-01",
+        f"R{i}",
+        "Reprise",
+        [
+            EntryLine("601", debit=amount),
+            EntryLine("401", credit=10.0),
+        ],
+    )
+
+
+def test_bulk_insert_balanced(tmp_path: Path) -> None:
+    db = tmp_path / "bulk.db"
+    init_db(db)
+    called = MagicMock()
+    signals.entry_changed.connect(called)
+    try:
+        ids = create_entries_bulk(db, (_entry(i) for i in range(25)), chunk_size=10)
+    finally:
+        signals.entry_changed.disconnect(called)
+    assert len(ids) == 25
+    assert called.call_count == 1
+    assert all(entry_balanced(db, i) for i in ids)
+    with connect(db) as conn:
+        refs = [r[0] for r in conn.execute("SELECT ref FROM entries ORDER BY id")]
+        lines = conn.execute("SELECT COUNT(*) FROM entry_lines").fetchone()[0]
+    assert refs == [f"R{i}" for i in range(25)]
+    assert lines == 50
+
+
+def test_bulk_insert_rolls_back_unbalanced(tmp_path: Path) -> None:
+    db = tmp_path / "bulk_ko.db"
+    init_db(db)
+    entries = [_entry(0), _entry(1, amount=9.0), _entry(2)]
+    with pytest.raises(ValueError, match="position 1"):
+        create_entries_bulk(db, entries)
+    with connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
@@ -0,0 +1,114 @@
+from pathlib import Path
+
+import pytest
+
+from MOTEUR.compta.accounting.db import (
+    close_fiscal_year,
+    closed_years,
+    create_entries_bulk,
+    create_entry,
+    init_db,
+)
+from MOTEUR.compta.db import close, close_all, connect
+from MOTEUR.compta.models import Entry, EntryLine
+
+
+def _post(db: Path, date: str, debit: str, credit: str, amount: float) -> None:
+    create_entry(
+        db, "OD", date, "", "",
+        [EntryLine(debit, debit=amount), EntryLine(credit, credit=amount)],
+    )
+
+
+def _an_lines(db: Path, year: int) -> dict:
+    with connect(db) as conn:
+        rows = conn.execute(
+            "SELECT el.account, el.debit - el.credit FROM entry_lines el "
+            "JOIN entries e ON e.id = el.entry_id "
+            "WHERE e.journal='AN' AND e.date=?",
+            (f"{year}-01-01",),
+        ).fetchall()
+    return {r[0]: r[1] for r in rows}
+
+
+def test_close_fiscal_year_posts_carry_forward(tmp_path: Path) -> None:
+    db = tmp_path / "close.db"
+    init_db(db)
+    _post(db, "2024-01-10", "512", "101", 1000.0)
+    _post(db, "2024-02-10", "601", "401", 300.0)
+    _post(db, "2024-03-10", "401", "512", 300.0)
+    _post(db, "2024-04-10", "411", "706", 500.0)
+
+    entry_id = close_fiscal_year(db, 2024)
+    assert entry_id is not None
+    assert _an_lines(db, 2025) == {
+        "101": -100000,
+        "411": 50000,
+        "512": 70000,
+        "120": -20000,
+    }
+    assert closed_years(db) == {2024}
+    assert close_fiscal_year(db, 2024) is None
+
+    with pytest.raises(ValueError, match="2024 is closed"):
+        _post(db, "2024-12-31", "601", "401", 1.0)
+    with pytest.raises(ValueError, match="2024 is closed"):
+        create_entries_bulk(
+            db,
+            [
+                Entry(
+                    "OD", "2024-06-01", "X", "",
+                    [EntryLine("601", debit=1.0), EntryLine("401", credit=1.0)],
+                )
+            ],
+        )
+
+    # Next year starts from the carry-forward, not from 2024 movements.
+    _post(db, "2025-05-01", "607", "512", 800.0)
+    close_fiscal_year(db, 2025)
+    assert _an_lines(db, 2026) == {
+        "101": -100000,
+        "120": -20000,
+        "411": 50000,
+        "512": -10000,
+        "129": 80000,
+    }
+
+
+def test_close_fiscal_year_refuses_earlier_year(tmp_path: Path) -> None:
+    db = tmp_path / "order.db"
+    init_db(db)
+    _post(db, "2024-01-10", "512", "101", 1000.0)
+    _post(db, "2025-01-10", "512", "101", 500.0)
+    close_fiscal_year(db, 2025)
+    with pytest.raises(ValueError, match="2025 is already closed"):
+        close_fiscal_year(db, 2024)
+    assert closed_years(db) == {2025}
+
+
+def test_close_fiscal_year_refuses_unclassed_accounts(tmp_path: Path) -> None:
+    db = tmp_path / "unclassed.db"
+    init_db(db)
+    _post(db, "2024-01-10", "512", "101", 1000.0)
+    _post(db, "2024-02-10", "801", "101", 50.0)
+    with pytest.raises(ValueError, match="801"):
+        close_fiscal_year(db, 2024)
+    assert closed_years(db) == frozenset()
+    _post(db, "2024-03-10", "101", "801", 50.0)
+    assert close_fiscal_year(db, 2024) is not None
+
+
+@pytest.mark.parametrize("release", [close, lambda db: close_all()])
+def test_closed_years_are_forgotten_with_connections(tmp_path: Path, release) -> None:
+    db = tmp_path / "closing.db"
+    init_db(db)
+    _post(db, "2024-03-01", "512", "101", 100.0)
+    close_fiscal_year(db, 2024)
+    with pytest.raises(ValueError, match="2024 is closed"):
+        _post(db, "2024-06-01", "601", "512", 1.0)
+
+    release(db)
+    db.unlink()
+    init_db(db)
+    _post(db, "2024-06-01", "601", "512", 1.0)
+    assert closed_years(db) == frozenset()
@@ -0,0 +1,46 @@
+import pytest
+
+from MOTEUR.compta.accounting.db import create_entries_bulk, get_ledger_columns, init_db
+from MOTEUR.compta.columnar import CATEGORY, CENTS, TEXT, Columns
+from MOTEUR.compta.models import Entry, EntryLine, Purchase
+from MOTEUR.compta.revision import AccTransaction
+
+
+def test_columns_encode_categories_and_sum():
+    cols = Columns([("account", CATEGORY), ("debit", CENTS), ("memo", TEXT)])
+    cols.extend([("512", 100, "a"), ("401", None, "b"), ("512", 250, "c")])
+    assert len(cols) == 3
+    assert cols.categories["account"] == ["512", "401"]
+    assert list(cols["account"]) == [0, 1, 0]
+    assert cols.values("account") == ["512", "401", "512"]
+    assert cols.total("debit") == 350
+    assert cols.sum_by("account", "debit") == {"512": (350,), "401": (0,)}
+    assert list(cols.rows())[1] == ("401", 0, "b")
+    with pytest.raises(ValueError):
+        Columns([("x", "float")])
+
+
+def test_ledger_columns_match_lines(tmp_path):
+    db = tmp_path / "cols.db"
+    init_db(db)
+    create_entries_bulk(db, [
+        Entry("ACH", f"2024-0{i % 3 + 1}-10", f"F{i}", None, [
+            EntryLine("601", debit=10.0), EntryLine("401", credit=10.0),
+        ])
+        for i in range(30)
+    ])
+    cols = get_ledger_columns(db, "2024-01-01", "2024-02-29")
+    assert len(cols) == 40
+    assert cols.categories["date"] == ["2024-01-10", "2024-02-10"]
+    assert cols.sum_by("account", "debit", "credit") == {
+        "601": (20000, 0), "401": (0, 20000),
+    }
+
+
+def test_row_classes_use_slots():
+    for obj in (
+        EntryLine("601"),
+        Purchase(None, "2024-01-01", "F1", 1, "x", 1.0, 20, "601", "2024-01-31", "A_PAYER"),
+        AccTransaction("2024-01-01", "OD", "R", "", 1.0, 0.0, 1.0),
+    ):
+        assert not hasattr(obj, "__dict__")
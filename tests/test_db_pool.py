@@ -0,0 +1,141 @@
+import threading
+
+import pytest
+
+from MOTEUR.compta.db import close_all, connection, storage_diagnostics
+
+
+def test_connection_reused_per_thread(tmp_path):
+    db = tmp_path / "pool.db"
+    with connection(db) as first:
+        pass
+    with connection(str(db)) as second:
+        assert second is first
+
+    seen = []
+
+    def worker():
+        with connection(db) as conn:
+            seen.append(conn)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert seen[0] is not first
+
+
+def test_nested_blocks_commit_once(tmp_path):
+    db = tmp_path / "nested.db"
+    with connection(db) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with pytest.raises(RuntimeError):
+        with connection(db) as conn:
+            conn.execute("INSERT INTO t VALUES (1)")
+            with connection(db) as inner:
+                inner.execute("INSERT INTO t VALUES (2)")
+            assert conn.in_transaction
+            raise RuntimeError
+    with connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_public_writes_join_the_caller_transaction(tmp_path):
+    from MOTEUR.compta.achats.db import add_purchase, add_supplier, init_db
+    from MOTEUR.compta.models import Purchase
+
+    db = tmp_path / "caller.db"
+    init_db(db)
+    with pytest.raises(RuntimeError):
+        with connection(db, immediate=True) as conn:
+            sid = add_supplier(db, "ACME")
+            add_purchase(
+                db,
+                Purchase(None, "2024-01-01", "F1", sid, "x", 120.0, 20, "601",
+                         "2024-01-31", "A_PAYER"),
+            )
+            assert conn.in_transaction
+            raise RuntimeError
+    with connection(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM suppliers").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] == 0
+
+
+def test_close_all_reopens(tmp_path):
+    db = tmp_path / "close.db"
+    with connection(db) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    close_all()
+    with connection(db) as other:
+        assert other is not conn
+        assert other.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+
+
+def test_interactive_profile_uses_wal(tmp_path):
+    info = storage_diagnostics(tmp_path / "wal.db")
+    assert info["profile"] == "interactive"
+    assert info["journal_mode"] == "wal"
+    assert info["synchronous"] == 1  # NORMAL
+
+
+def test_bulk_profile_restored_after_block(tmp_path):
+    db = tmp_path / "bulk.db"
+    with connection(db, profile="bulk") as conn:
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -200000
+        assert storage_diagnostics(db)["profile"] == "bulk"
+    assert storage_diagnostics(db)["profile"] == "interactive"
+
+
+def test_reader_not_blocked_by_writer(tmp_path):
+    db = tmp_path / "concurrent.db"
+    with connection(db) as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+
+    writing = threading.Event()
+    done = threading.Event()
+
+    def writer():
+        with connection(db, profile="bulk") as conn:
+            conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(100)])
+            writing.set()
+            done.wait(5)
+
+    t = threading.Thread(target=writer)
+    t.start()
+    writing.wait(5)
+    with connection(db) as conn:
+        count = conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+    done.set()
+    t.join()
+    assert count == 1
+
+
+def test_schema_bootstrapped_once_per_process(tmp_path):
+    from MOTEUR.compta.achats.db import init_db
+    from MOTEUR.compta.suppliers.supplier_services import (
+        get_suppliers_with_balance,
+    )
+
+    db = tmp_path / "boot.db"
+    init_db(db)
+    get_suppliers_with_balance(db)
+    statements = []
+    with connection(db) as conn:
+        conn.set_trace_callback(statements.append)
+    init_db(db)
+    get_suppliers_with_balance(db)
+    with connection(db) as conn:
+        conn.set_trace_callback(None)
+    ddl = ("CREATE", "DROP", "ALTER")
+    assert statements
+    assert not [s for s in statements if s.lstrip().upper().startswith(ddl)]
+
+    # Closing the pool forgets the cache, e.g. for in-memory databases.
+    close_all()
+    statements.clear()
+    with connection(db) as conn:
+        conn.set_trace_callback(statements.append)
+        init_db(db)
+        conn.set_trace_callback(None)
+    assert [s for s in statements if s.lstrip().upper().startswith(ddl)]
@@ -0,0 +1,142 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from MOTEUR.compta import events
+from MOTEUR.compta.accounting.db import create_entry, init_db
+from MOTEUR.compta.db import connection
+from MOTEUR.compta.models import EntryLine
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class Recorder:
+    def __init__(self):
+        self.events = []
+        self.changes = []
+
+    def publish(self, event, changes=None):
+        self.events.append(event)
+        self.changes.append(changes)
+
+
+def _lines():
+    return [EntryLine("601", debit=1), EntryLine("401", credit=1)]
+
+
+def test_core_imports_without_qt():
+    code = (
+        "import sys\n"
+        "import MOTEUR.compta.accounting.db, MOTEUR.compta.achats.db\n"
+        "import MOTEUR.compta.revision, MOTEUR.compta.suppliers, migrations\n"
+        "assert not [m for m in sys.modules if m.startswith('PySide6')]\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+
+
+def test_batched_events_are_coalesced(tmp_path):
+    db = tmp_path / "ev.db"
+    init_db(db)
+    recorder = Recorder()
+    previous = events.set_dispatcher(recorder)
+    try:
+        with events.batched():
+            for i in range(5):
+                create_entry(db, "OD", "2024-01-01", f"R{i}", "", _lines())
+            with events.batched():
+                events.publish(events.SUPPLIER_CHANGED)
+            assert recorder.events == []
+        assert recorder.events == [events.ENTRY_CHANGED, events.SUPPLIER_CHANGED]
+        merged = recorder.changes[0]
+        assert len(merged.entries) == 5
+        assert merged.accounts == {"601", "401"}
+        assert recorder.changes[1] is None
+        create_entry(db, "OD", "2024-01-02", "R5", "", _lines())
+        assert recorder.events[-1] == events.ENTRY_CHANGED
+        assert len(recorder.events) == 3
+    finally:
+        events.set_dispatcher(previous)
+
+
+def test_events_wait_for_the_outer_commit(tmp_path):
+    db = tmp_path / "tx.db"
+    init_db(db)
+    recorder = Recorder()
+    previous = events.set_dispatcher(recorder)
+    try:
+        with connection(db):
+            create_entry(db, "OD", "2024-01-01", "R1", "", _lines())
+            create_entry(db, "OD", "2024-01-02", "R2", "", _lines())
+            assert recorder.events == []
+        assert recorder.events == [events.ENTRY_CHANGED]
+        assert len(recorder.changes[0].entries) == 2
+
+        with pytest.raises(RuntimeError):
+            with connection(db):
+                create_entry(db, "OD", "2024-01-03", "R3", "", _lines())
+                raise RuntimeError
+        assert len(recorder.events) == 1
+    finally:
+        events.set_dispatcher(previous)
+
+
+def test_batch_only_holds_its_own_thread():
+    recorder = Recorder()
+    previous = events.set_dispatcher(recorder)
+    try:
+        with events.batched():
+            worker = threading.Thread(
+                target=events.publish, args=(events.SUPPLIER_CHANGED,)
+            )
+            worker.start()
+            worker.join()
+            assert recorder.events == [events.SUPPLIER_CHANGED]
+            events.publish(events.ENTRY_CHANGED)
+            assert recorder.events == [events.SUPPLIER_CHANGED]
+        assert recorder.events == [events.SUPPLIER_CHANGED, events.ENTRY_CHANGED]
+    finally:
+        events.set_dispatcher(previous)
+
+
+def test_null_dispatcher_is_default_without_listener():
+    previous = events.set_dispatcher(None)
+    try:
+        assert isinstance(events.get_dispatcher(), events.NullDispatcher)
+        events.publish(events.ENTRY_CHANGED)
+    finally:
+        events.set_dispatcher(previous)
+
+
+def test_purchase_changes_name_rows(tmp_path):
+    from MOTEUR.compta.achats.db import (
+        add_purchase,
+        add_supplier,
+        delete_purchase,
+        init_db as init_purchases,
+    )
+    from MOTEUR.compta.models import Purchase
+
+    db = tmp_path / "cs.db"
+    init_purchases(db)
+    sid = add_supplier(db, "ACME")
+    recorder = Recorder()
+    previous = events.set_dispatcher(recorder)
+    try:
+        pid = add_purchase(
+            db,
+            Purchase(None, "2024-01-01", "F1", sid, "x", 120.0, 20, "601",
+                     "2024-01-31", "A_PAYER"),
+        )
+        delete_purchase(db, pid)
+    finally:
+        events.set_dispatcher(previous)
+    by_event = list(zip(recorder.events, recorder.changes))
+    assert by_event[0][0] == events.ENTRY_CHANGED
+    assert by_event[0][1].accounts == {"601", "44566", "401"}
+    assert by_event[1][1].suppliers == {sid}
+    assert by_event[1][1].purchases == {pid}
+    deleted = [c for e, c in by_event[2:] if e == events.ENTRY_CHANGED]
+    assert deleted[0].accounts == {"601", "44566", "401"}
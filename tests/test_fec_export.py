@@ -1,5 +1,8 @@
+import sqlite3
 from pathlib import Path
 
+import pytest
+
 from MOTEUR.compta.achats.db import init_db, add_purchase
 from MOTEUR.compta.accounting.db import export_fec
 from MOTEUR.compta.models import Purchase
@@ -34,3 +37,75 @@ def test_export_fec_generates_file(tmp_path: Path) -> None:
         lines = fh.readlines()
     # header + 3 lines
     assert len(lines) == 4
+
+
+def test_export_fec_columns_and_gzip(tmp_path: Path) -> None:
+    import gzip
+
+    from MOTEUR.compta.accounting.db import FEC_HEADER, add_journal
+
+    db = tmp_path / "p.db"
+    init_db(db)
+    from MOTEUR.compta.db import connect
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('Test')")
+        conn.commit()
+    add_journal(db, "ACH", "Achats")
+    for date in ("2023-12-31", "2024-03-01", "2024-01-05", "2025-01-01"):
+        add_purchase(
+            db,
+            Purchase(
+                None, date, f"INV{date}", 1, "Test", 1234.5, 20,
+                "601", "2024-02-05", "A_PAYER",
+            ),
+        )
+    dest = tmp_path / "fec.txt.gz"
+    assert export_fec(db, 2024, dest) == 6
+    with gzip.open(dest, "rt", encoding="utf-8") as fh:
+        rows = [line.rstrip("\n").split("\t") for line in fh]
+    assert rows[0] == FEC_HEADER
+    assert all(len(r) == 18 for r in rows)
+    first = dict(zip(FEC_HEADER, rows[1]))
+    assert first["JournalLib"] == "Achats"
+    assert first["EcritureDate"] == "20240105"
+    assert first["PieceRef"] == "INV2024-01-05"
+    assert first["Debit"] == "1028,75"
+    assert rows[3][FEC_HEADER.index("Credit")] == "1234,50"
+    assert rows[-1][FEC_HEADER.index("EcritureDate")] == "20240301"
+
+
+def test_export_fec_fills_auxiliary_and_lettering(tmp_path: Path) -> None:
+    from MOTEUR.compta.accounting.db import FEC_HEADER, auto_letter
+    from MOTEUR.compta.achats.db import add_supplier, pay_purchase
+
+    db = tmp_path / "p.db"
+    init_db(db)
+    sid = add_supplier(db, "Papeterie\tMartin")
+    pid = add_purchase(
+        db,
+        Purchase(None, "2024-01-05", "INV1", sid, "Papier", 120.0, 20, "601",
+                 "2024-02-05", "A_PAYER"),
+    )
+    pay_purchase(db, pid, "2024-02-03", "VIR", 120.0)
+    auto_letter(db)
+    dest = tmp_path / "fec.txt"
+    export_fec(db, 2024, dest)
+    with dest.open(encoding="utf-8") as fh:
+        rows = [dict(zip(FEC_HEADER, line.rstrip("\n").split("\t"))) for line in fh][1:]
+    supplier = [r for r in rows if r["CompteNum"] == "401"]
+    assert len(supplier) == 2
+    for r in supplier:
+        assert r["CompAuxNum"] == str(sid)
+        assert r["CompAuxLib"] == "Papeterie Martin"
+        assert r["EcritureLet"] == "A"
+        assert r["DateLet"] == "20240203"
+    others = [r for r in rows if r["CompteNum"] != "401"]
+    assert {(r["CompAuxNum"], r["CompAuxLib"], r["DateLet"]) for r in others} == {("", "", "")}
+
+
+def test_export_fec_leaves_no_file_on_error(tmp_path: Path) -> None:
+    db = tmp_path / "empty.db"
+    dest = tmp_path / "fec.txt"
+    with pytest.raises(sqlite3.OperationalError):
+        export_fec(db, 2024, dest)
+    assert not dest.exists()
@@ -0,0 +1,116 @@
+from pathlib import Path
+
+from MOTEUR.compta.accounting.db import auto_letter, create_entry
+from MOTEUR.compta.achats.db import add_purchase, init_db, pay_purchase
+from MOTEUR.compta.db import connect
+from MOTEUR.compta.models import EntryLine, Purchase
+
+
+def _codes(db: Path) -> dict:
+    with connect(db) as conn:
+        rows = conn.execute(
+            "SELECT e.journal, e.ref, el.letter_code FROM entry_lines el "
+            "JOIN entries e ON e.id = el.entry_id WHERE el.account='401' "
+            "ORDER BY el.id"
+        ).fetchall()
+    return [tuple(r) for r in rows]
+
+
+def test_auto_letter_full_partial_and_amount(tmp_path: Path) -> None:
+    db = tmp_path / "letter.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('Test')")
+        conn.commit()
+
+    def purchase(piece: str, amount: float) -> int:
+        return add_purchase(
+            db,
+            Purchase(
+                None, "2025-01-01", piece, 1, "Test", amount, 0,
+                "601", "2025-01-31", "A_PAYER",
+            ),
+        )
+
+    pay_purchase(db, purchase("INV1", 100.0), "2025-01-10", "VIR", 100.0)
+    pid2 = purchase("INV2", 200.0)
+    pay_purchase(db, pid2, "2025-01-10", "VIR", 50.0)
+    purchase("INV3", 300.0)
+    create_entry(
+        db, "BQ", "2025-01-20", "VIR-42", "Virement",
+        [EntryLine("401", debit=300.0), EntryLine("512", credit=300.0)],
+    )
+    with connect(db) as conn:
+        conn.execute(
+            "UPDATE entry_lines SET supplier_id=1 WHERE account='401' AND "
+            "entry_id=(SELECT id FROM entries WHERE ref='VIR-42')"
+        )
+        conn.commit()
+
+    result = auto_letter(db)
+    assert (result.full, result.partial, result.lines) == (2, 1, 6)
+    assert _codes(db) == [
+        ("ACH", "INV1", "A"),
+        ("BQ", "INV1", "A"),
+        ("ACH", "INV2", "b"),
+        ("BQ", "INV2", "b"),
+        ("ACH", "INV3", "C"),
+        ("BQ", "VIR-42", "C"),
+    ]
+
+    # Nothing new: partial group keeps its code.
+    assert auto_letter(db).lines == 0
+
+    pay_purchase(db, pid2, "2025-01-25", "VIR", 150.0)
+    result = auto_letter(db)
+    assert (result.full, result.partial) == (1, 0)
+    assert {code for _, ref, code in _codes(db) if ref == "INV2"} == {"D"}
+
+
+def test_auto_letter_keeps_suppliers_apart(tmp_path: Path) -> None:
+    db = tmp_path / "letter.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('A'), ('B')")
+        conn.commit()
+
+    def purchase(sid: int, piece: str, amount: float) -> int:
+        return add_purchase(
+            db,
+            Purchase(
+                None, "2025-01-01", piece, sid, "Test", amount, 0,
+                "601", "2025-01-31", "A_PAYER",
+            ),
+        )
+
+    # Same piece number at both suppliers, only A's invoice is paid.
+    pay_purchase(db, purchase(1, "F1", 100.0), "2025-01-10", "VIR", 100.0)
+    purchase(2, "F1", 100.0)
+    # Same amount: A's invoice G1 and a bank transfer to B.
+    purchase(1, "G1", 40.0)
+    create_entry(
+        db, "BQ", "2025-01-20", "VIR-B", "Virement B",
+        [EntryLine("401", debit=40.0), EntryLine("512", credit=40.0)],
+    )
+    with connect(db) as conn:
+        conn.execute(
+            "UPDATE entry_lines SET supplier_id=2 WHERE account='401' AND "
+            "entry_id=(SELECT id FROM entries WHERE ref='VIR-B')"
+        )
+        conn.commit()
+
+    result = auto_letter(db)
+    assert (result.full, result.partial, result.lines) == (1, 0, 2)
+    with connect(db) as conn:
+        rows = conn.execute(
+            "SELECT e.journal, e.ref, el.supplier_id, el.letter_code "
+            "FROM entry_lines el JOIN entries e ON e.id = el.entry_id "
+            "WHERE el.account='401' ORDER BY el.id"
+        ).fetchall()
+    assert [tuple(r) for r in rows] == [
+        ("ACH", "F1", 1, "A"),
+        ("BQ", "F1", 1, "A"),
+        ("ACH", "F1", 2, None),
+        ("ACH", "G1", 1, None),
+        ("BQ", "VIR-B", 2, None),
+    ]
@@ -0,0 +1,141 @@
+import re
+import sqlite3
+
+from migrations import SCHEMA_VERSION, apply_migrations, schema_version
+from MOTEUR.compta.achats.db import add_supplier, init_db as init_purchases
+from MOTEUR.compta.db import connection
+from MOTEUR.compta.revision.revision_services import init_view as init_account_view
+from MOTEUR.compta.suppliers.supplier_services import init_view as init_supplier_view
+from MOTEUR.compta.ventes.db import init_db as init_sales
+from MOTEUR.compta.revision.revision_services import get_accounts_with_balance
+
+
+def test_fresh_database_reaches_schema_version(tmp_path):
+    db = tmp_path / "m.db"
+    reports = apply_migrations(db)
+    assert [r.version for r in reports] == list(range(1, SCHEMA_VERSION + 1))
+    assert all(r.seconds >= 0 for r in reports)
+    assert schema_version(db) == SCHEMA_VERSION
+    assert add_supplier(db, "ACME")
+    assert get_accounts_with_balance(db) == []
+
+
+def _normalize(sql):
+    """Return *sql* without the layout SQLite keeps from the original text.
+
+    Columns added by ``ALTER TABLE`` are appended to the stored ``CREATE
+    TABLE`` with their own spacing, so whitespace around parentheses and
+    commas is dropped, and ``IF NOT EXISTS`` is not kept by every version.
+    """
+    sql = re.sub(r"\s+", " ", sql.replace("IF NOT EXISTS ", ""))
+    sql = re.sub(r"\s*([(),])\s*", r"\1", sql)
+    return sql.strip().rstrip(";")
+
+
+def _schema(db):
+    with connection(db) as conn:
+        objects = conn.execute(
+            "SELECT type, name, tbl_name, sql FROM sqlite_master "
+            "WHERE name NOT LIKE 'sqlite_%' ORDER BY type, name"
+        ).fetchall()
+        schema = {}
+        for kind, name, table, sql in objects:
+            columns = ()
+            if kind == "table":
+                columns = tuple(
+                    tuple(c) for c in conn.execute(f"PRAGMA table_info({name})")
+                )
+            schema[(kind, name)] = (table, _normalize(sql or ""), columns)
+        return schema
+
+
+def test_migrations_match_module_schemas(tmp_path):
+    migrated, bootstrapped = tmp_path / "m.db", tmp_path / "b.db"
+    apply_migrations(migrated)
+    init_purchases(bootstrapped)
+    init_sales(bootstrapped)
+    init_account_view(bootstrapped)
+    init_supplier_view(bootstrapped)
+    assert _schema(migrated) == _schema(bootstrapped)
+
+
+def test_up_to_date_database_is_skipped(tmp_path):
+    db = tmp_path / "m.db"
+    apply_migrations(db)
+    assert apply_migrations(db) == []
+
+
+def test_legacy_database_is_upgraded(tmp_path):
+    db = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        CREATE TABLE sales (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT, label TEXT, amount REAL);
+        INSERT INTO sales (date, label, amount) VALUES ('2024-01-01', 'x', 12.34);
+        """
+    )
+    conn.close()
+    reports = apply_migrations(db)
+    assert len(reports) == SCHEMA_VERSION
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT amount FROM sales").fetchone()[0] == 1234
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+
+
+def test_entries_are_linked_to_purchases(tmp_path):
+    db = tmp_path / "links.db"
+    conn = sqlite3.connect(db)
+    conn.executescript(
+        """
+        CREATE TABLE suppliers (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT);
+        CREATE TABLE accounts (code TEXT PRIMARY KEY, name TEXT);
+        CREATE TABLE purchases (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT, piece TEXT, supplier_id INTEGER, label TEXT,
+            ttc_amount INTEGER, vat_rate REAL, account_code TEXT,
+            due_date TEXT, payment_status TEXT, payment_date TEXT,
+            payment_method TEXT);
+        CREATE TABLE entries (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            journal TEXT, ref TEXT, date TEXT, memo TEXT);
+        CREATE TABLE entry_lines (id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER, account TEXT, debit INTEGER, credit INTEGER,
+            description TEXT, letter_code TEXT);
+        INSERT INTO suppliers (name) VALUES ('A'), ('B');
+        INSERT INTO purchases (date, piece, supplier_id, label, ttc_amount,
+            vat_rate, account_code, due_date, payment_status)
+        VALUES ('2024-01-01', 'F1', 1, 'x', 10000, 0, '601', '2024-02-01', 'PARTIEL'),
+               ('2024-01-02', 'F2', 2, 'y', 5000, 0, '601', '2024-02-01', 'A_PAYER');
+        INSERT INTO entries (journal, ref, date, memo)
+        VALUES ('ACH', 'F1', '2024-01-01', 'x'), ('BQ', 'F1', '2024-01-05', 'p'),
+               ('ACH', 'F2', '2024-01-02', 'y'), ('OD', 'X', '2024-01-03', 'z');
+        INSERT INTO entry_lines (entry_id, account, debit, credit)
+        VALUES (1, '601', 10000, 0), (1, '401', 0, 10000),
+               (2, '401', 4000, 0), (2, '512', 0, 4000),
+               (3, '601', 5000, 0), (3, '401', 0, 5000),
+               (4, '512', 100, 0), (4, '401', 0, 100);
+        """
+    )
+    conn.close()
+    apply_migrations(db)
+    conn = sqlite3.connect(db)
+    links = conn.execute(
+        "SELECT entry_id, purchase_id, supplier_id FROM entry_lines ORDER BY id"
+    ).fetchall()
+    view = conn.execute(
+        "SELECT supplier_id, balance FROM supplier_balance_v ORDER BY 1"
+    ).fetchall()
+    paid = conn.execute(
+        "SELECT paid_amount, payment_status FROM purchases ORDER BY id"
+    ).fetchall()
+    payments = conn.execute(
+        "SELECT purchase_id, date, amount, entry_id FROM purchase_payments"
+    ).fetchall()
+    conn.close()
+    assert links == [
+        (1, 1, 1), (1, 1, 1), (2, 1, 1), (2, 1, 1),
+        (3, 2, 2), (3, 2, 2), (4, None, None), (4, None, None),
+    ]
+    assert view == [(1, -6000), (2, -5000)]
+    assert paid == [(4000, "PARTIEL"), (0, "A_PAYER")]
+    assert payments == [(1, "2024-01-05", 4000, 2)]
@@ -0,0 +1,97 @@
+from decimal import Decimal
+from pathlib import Path
+
+from MOTEUR.compta.accounting.db import entry_balanced
+from MOTEUR.compta.achats.db import add_purchase, get_vat_summary, init_db
+from MOTEUR.compta.db import connect, migrate_to_cents
+from MOTEUR.compta.models import Purchase, from_cents, to_cents, to_decimal
+from MOTEUR.compta.revision import get_accounts_with_balance
+
+
+def test_cents_conversion() -> None:
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents("19.995") == 2000
+    assert to_cents(Decimal("-1.005")) == -101
+    assert from_cents(12345) == 123.45
+    assert to_decimal(12345) == Decimal("123.45")
+
+
+def test_amounts_stored_as_integer_cents(tmp_path: Path) -> None:
+    db = tmp_path / "cents.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('Test')")
+        conn.commit()
+    for i in range(3):
+        add_purchase(
+            db,
+            Purchase(
+                None, "2024-01-05", f"INV{i}", 1, "Test", 10.01, 5.5,
+                "601", "2024-02-05", "A_PAYER",
+            ),
+        )
+    with connect(db) as conn:
+        rows = conn.execute(
+            "SELECT typeof(debit), typeof(credit) FROM entry_lines"
+        ).fetchall()
+        ttc = conn.execute("SELECT ttc_amount FROM purchases").fetchone()[0]
+    assert {tuple(r) for r in rows} == {("integer", "integer")}
+    assert ttc == 1001
+    summary = get_vat_summary(db, "2024-01-01", "2024-12-31")
+    assert summary[0].base == 28.47
+    assert summary[0].vat == 1.56
+    balances = {c: b for c, _, b in get_accounts_with_balance(db)}
+    assert balances["601"] == 28.47
+
+
+def test_legacy_real_amounts_migrated(tmp_path: Path) -> None:
+    db = tmp_path / "legacy.db"
+    with connect(db) as conn:
+        conn.execute(
+            "CREATE TABLE entries (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "journal TEXT NOT NULL, ref TEXT, date TEXT NOT NULL, memo TEXT, "
+            "created_at TEXT)"
+        )
+        conn.execute(
+            "CREATE TABLE entry_lines (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "entry_id INTEGER NOT NULL REFERENCES entries(id), "
+            "account TEXT NOT NULL, debit REAL NOT NULL DEFAULT 0, "
+            "credit REAL NOT NULL DEFAULT 0, description TEXT, "
+            "letter_code TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO entries (journal, ref, date) "
+            "VALUES ('OD', 'X', '2024-01-01')"
+        )
+        conn.execute(
+            "INSERT INTO entry_lines (entry_id, account, debit, credit) "
+            "VALUES (1, '601', 0.1, 0), (1, '601', 0.2, 0), (1, '401', 0, 0.3)"
+        )
+        conn.commit()
+
+    init_db(db)
+
+    with connect(db) as conn:
+        types = {
+            r[1]: r[2]
+            for r in conn.execute("PRAGMA table_info(entry_lines)")
+        }
+        lines = conn.execute(
+            "SELECT id, debit, credit FROM entry_lines ORDER BY id"
+        ).fetchall()
+    assert types["debit"] == "INTEGER"
+    assert [tuple(r) for r in lines] == [(1, 10, 0), (2, 20, 0), (3, 0, 30)]
+    assert entry_balanced(db, 1)
+
+
+def test_cents_migration_keeps_views(tmp_path: Path) -> None:
+    create = (
+        "CREATE TABLE IF NOT EXISTS sales "
+        "(id INTEGER PRIMARY KEY AUTOINCREMENT, amount INTEGER)"
+    )
+    with connect(tmp_path / "views.db") as conn:
+        conn.execute("CREATE TABLE sales (id INTEGER PRIMARY KEY AUTOINCREMENT, amount REAL)")
+        conn.execute("CREATE VIEW sales_total_v AS SELECT SUM(amount) AS total FROM sales")
+        conn.execute("INSERT INTO sales (amount) VALUES (1.5), (2.25)")
+        assert migrate_to_cents(conn, "sales", create, ("amount",))
+        assert conn.execute("SELECT total FROM sales_total_v").fetchone()[0] == 375
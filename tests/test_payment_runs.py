@@ -0,0 +1,142 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from MOTEUR.compta.accounting.db import entry_balanced
+from MOTEUR.compta.achats.db import (
+    add_purchase,
+    add_supplier,
+    delete_purchase,
+    get_due_purchases,
+    init_db,
+    pay_due_purchases,
+    pay_purchase,
+    update_purchase,
+)
+from MOTEUR.compta.achats.signals import signals
+from MOTEUR.compta.db import connect
+from MOTEUR.compta.models import Purchase
+from MOTEUR.compta.suppliers import get_suppliers_with_balance
+
+
+def _purchase(db: Path, sid: int, piece: str, ttc: float, due: str, **kw) -> int:
+    return add_purchase(
+        db,
+        Purchase(None, "2025-01-05", piece, sid, "Achat", ttc, 20, "601", due,
+                 "A_PAYER", **kw),
+    )
+
+
+def _paid(db: Path) -> dict:
+    with connect(db) as conn:
+        return {
+            r[0]: (r[1], r[2])
+            for r in conn.execute(
+                "SELECT piece, paid_amount, payment_status FROM purchases"
+            )
+        }
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Path:
+    path = tmp_path / "pay.db"
+    init_db(path)
+    return path
+
+
+def test_pay_purchase_records_payments(db: Path) -> None:
+    sid = add_supplier(db, "A")
+    pid = _purchase(db, sid, "F1", 120.0, "2025-01-31")
+    pay_purchase(db, pid, "2025-01-10", "CHQ", 20.0)
+    assert _paid(db) == {"F1": (2000, "PARTIEL")}
+    pay_purchase(db, pid, "2025-01-20", "VIR", 100.0)
+    assert _paid(db) == {"F1": (12000, "PAYE")}
+    with connect(db) as conn:
+        payments = conn.execute(
+            "SELECT date, method, amount FROM purchase_payments ORDER BY id"
+        ).fetchall()
+    assert [tuple(r) for r in payments] == [
+        ("2025-01-10", "CHQ", 2000), ("2025-01-20", "VIR", 10000)
+    ]
+    delete_purchase(db, pid)
+    with connect(db) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM purchase_payments").fetchone()[0] == 0
+
+
+def test_payment_run_pays_due_purchases(db: Path) -> None:
+    a, b = add_supplier(db, "A"), add_supplier(db, "B")
+    partial = _purchase(db, a, "F1", 120.0, "2025-01-31")
+    _purchase(db, a, "F2", 60.0, "2025-02-15", is_advance=1)
+    _purchase(db, b, "F3", 30.0, "2025-01-20", is_invoice_received=0)
+    _purchase(db, b, "F4", 10.0, "2025-03-31")
+    pay_purchase(db, partial, "2025-01-10", "VIR", 20.0)
+
+    due = get_due_purchases(db, "2025-02-28")
+    assert [(d.piece, d.amount, d.account) for d in due] == [
+        ("F3", 30.0, "408"), ("F1", 100.0, "401"), ("F2", 60.0, "4091")
+    ]
+    assert [d.piece for d in get_due_purchases(db, "2025-02-28", [b])] == ["F3"]
+
+    entry_called, supplier_called = MagicMock(), MagicMock()
+    signals.entry_changed.connect(entry_called)
+    signals.supplier_changed.connect(supplier_called)
+    try:
+        run = pay_due_purchases(db, "2025-02-28", "VIR")
+    finally:
+        signals.entry_changed.disconnect(entry_called)
+        signals.supplier_changed.disconnect(supplier_called)
+
+    assert run.total == 190.0 and len(run.entry_ids) == 3
+    assert entry_called.call_count == 1 and supplier_called.call_count == 1
+    assert entry_called.call_args.args[0].accounts == {"512", "401", "408", "4091"}
+    assert all(entry_balanced(db, i) for i in run.entry_ids)
+    assert _paid(db) == {
+        "F1": (12000, "PAYE"),
+        "F2": (6000, "PAYE"),
+        "F3": (3000, "PAYE"),
+        "F4": (0, "A_PAYER"),
+    }
+    assert dict((sid, bal) for sid, _, bal in get_suppliers_with_balance(db)) == {
+        a: 0.0,
+        b: -10.0,
+    }
+    assert pay_due_purchases(db, "2025-02-28").purchase_ids == []
+
+
+def test_payment_run_by_supplier(db: Path) -> None:
+    a, b = add_supplier(db, "A"), add_supplier(db, "B")
+    _purchase(db, a, "F1", 12.0, "2025-01-31")
+    _purchase(db, b, "F2", 24.0, "2025-01-31")
+    run = pay_due_purchases(
+        db, "2025-02-05", "VIR", due_before="2025-01-31", supplier_ids=[b]
+    )
+    assert run.total == 24.0
+    assert _paid(db) == {"F1": (0, "A_PAYER"), "F2": (2400, "PAYE")}
+
+
+def test_edit_keeps_payment_state(db: Path) -> None:
+    sid = add_supplier(db, "A")
+    pid = _purchase(db, sid, "F1", 120.0, "2025-01-31")
+    pay_purchase(db, pid, "2025-01-10", "CHQ", 50.0)
+    pur = Purchase(pid, "2025-01-05", "F1", sid, "Achat", 40.0, 20, "601",
+                   "2025-01-31", "A_PAYER")
+    update_purchase(db, pur)
+    assert _paid(db) == {"F1": (5000, "PAYE")}
+    pur.ttc_amount = 80.0
+    update_purchase(db, pur)
+    assert _paid(db) == {"F1": (5000, "PARTIEL")}
+    with connect(db) as conn:
+        row = conn.execute("SELECT payment_date, payment_method FROM purchases").fetchone()
+    assert tuple(row) == ("2025-01-10", "CHQ")
+
+
+def test_new_purchase_cannot_be_paid(db: Path) -> None:
+    sid = add_supplier(db, "A")
+    with pytest.raises(ValueError):
+        add_purchase(
+            db,
+            Purchase(None, "2025-01-05", "F1", sid, "Achat", 120.0, 20, "601",
+                     "2025-01-31", "PAYE"),
+        )
+    assert _paid(db) == {}
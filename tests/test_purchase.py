@@ -1,10 +1,23 @@
 import sqlite3
 import pytest
 
-from MOTEUR.compta.achats.db import init_db, add_purchase, pay_purchase
+from MOTEUR.compta.achats.db import (
+    init_db,
+    add_purchase,
+    pay_purchase,
+    update_purchase,
+)
 from MOTEUR.compta.models import Purchase
 from MOTEUR.compta.db import connect
-from MOTEUR.compta.accounting.db import entry_balanced
+from MOTEUR.compta.accounting.db import (
+    _update_entry,
+    auto_letter,
+    check_account_balances,
+    create_entry,
+    entry_balanced,
+)
+from MOTEUR.compta.db import connection
+from MOTEUR.compta.models import EntryLine
 import uuid
 
 DB = ""
@@ -117,6 +130,155 @@ def test_payment_updates_status_and_entry_balanced():
     assert entry_balanced(DB, eid)
 
 
+def _ach_lines(piece):
+    with connect(DB) as conn:
+        return conn.execute(
+            "SELECT e.id, el.id, el.account, el.debit, el.credit, el.letter_code "
+            "FROM entries e JOIN entry_lines el ON el.entry_id = e.id "
+            "WHERE e.journal='ACH' AND e.ref=? ORDER BY el.id",
+            (piece,),
+        ).fetchall()
+
+
+def test_update_purchase_rewrites_entry_in_place():
+    setup_db()
+    pur = Purchase(
+        None, "2025-01-10", "INV3", 1, "Test", 120.0, 20, "601",
+        "2025-02-10", "A_PAYER",
+    )
+    add_purchase(DB, pur)
+    before = _ach_lines("INV3")
+    with connect(DB) as conn:
+        conn.execute(
+            "UPDATE entry_lines SET letter_code='AA' WHERE id=?", (before[2][1],)
+        )
+        conn.commit()
+
+    pur.piece = "INV3B"
+    pur.ttc_amount = 60.0
+    pur.date = "2025-02-03"
+    update_purchase(DB, pur)
+
+    after = _ach_lines("INV3B")
+    assert _ach_lines("INV3") == []
+    assert [r[:3] for r in after] == [r[:3] for r in before]
+    assert [(r[3], r[4]) for r in after] == [(5000, 0), (1000, 0), (0, 6000)]
+    # The 401 line no longer settles its group: the code is reopened.
+    assert after[2][5] == "aa"
+    assert entry_balanced(DB, after[0][0])
+    assert check_account_balances(DB) == []
+    with connect(DB) as conn:
+        periods = dict(
+            conn.execute(
+                "SELECT period, debit FROM account_period_balances "
+                "WHERE account='601'"
+            ).fetchall()
+        )
+    assert periods == {"2025-01": 0, "2025-02": 5000}
+
+
+def test_update_purchase_moves_lines_to_new_accounts():
+    setup_db()
+    pur = Purchase(
+        None, "2025-01-10", "INV4", 1, "Test", 120.0, 20, "601",
+        "2025-02-10", "A_PAYER",
+    )
+    add_purchase(DB, pur)
+    before = _ach_lines("INV4")
+    with connect(DB) as conn:
+        conn.execute(
+            "UPDATE entry_lines SET letter_code='AB' WHERE id=?", (before[2][1],)
+        )
+        conn.commit()
+
+    pur.account_code = "602"
+    pur.is_invoice_received = 0
+    update_purchase(DB, pur)
+
+    after = _ach_lines("INV4")
+    assert [r[1] for r in after] == [r[1] for r in before]
+    assert [r[2] for r in after] == ["602", "44566", "408"]
+    assert after[2][5] is None
+    assert check_account_balances(DB) == []
+
+
+def _letter_codes(piece):
+    with connect(DB) as conn:
+        return [
+            r[0]
+            for r in conn.execute(
+                "SELECT el.letter_code FROM entries e "
+                "JOIN entry_lines el ON el.entry_id = e.id "
+                "WHERE e.ref=? AND el.account='401' ORDER BY el.id",
+                (piece,),
+            )
+        ]
+
+
+def test_update_purchase_reopens_lettering_on_amount_change():
+    setup_db()
+    pur = Purchase(
+        None, "2025-01-10", "INV5", 1, "Test", 120.0, 20, "601",
+        "2025-02-10", "A_PAYER",
+    )
+    pur.id = add_purchase(DB, pur)
+    pay_purchase(DB, pur.id, "2025-01-20", "VIR", 120.0)
+    auto_letter(DB)
+    assert _letter_codes("INV5") == ["A", "A"]
+
+    pur.label = "Autre libellé"
+    update_purchase(DB, pur)
+    assert _letter_codes("INV5") == ["A", "A"]
+
+    pur.ttc_amount = 100.0
+    update_purchase(DB, pur)
+    assert _letter_codes("INV5") == ["a", "a"]
+    assert auto_letter(DB).lines == 0
+    assert _letter_codes("INV5") == ["a", "a"]
+
+
+def test_update_unknown_purchase_writes_nothing():
+    setup_db()
+    pur = Purchase(
+        999, "2025-01-10", "AUTO", 1, "Test", 120.0, 20, "607",
+        "2025-02-10", "A_PAYER",
+    )
+    with pytest.raises(ValueError):
+        update_purchase(DB, pur)
+    assert pur.piece == "AUTO"
+    with connect(DB) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sequences").fetchone()[0] == 0
+        assert conn.execute(
+            "SELECT COUNT(*) FROM accounts WHERE code='607'"
+        ).fetchone()[0] == 0
+
+
+def test_update_entry_keeps_line_descriptions():
+    setup_db()
+    eid = create_entry(
+        DB, "OD", "2025-01-10", "OD1", "Test",
+        [EntryLine("512", debit=10.0, description="banque"), EntryLine("101", credit=10.0)],
+    )
+    with connection(DB) as conn:
+        _update_entry(
+            conn, eid, "2025-01-10", "OD1", "Test",
+            [
+                EntryLine("512", debit=10.0, description="banque bis"),
+                EntryLine("101", credit=6.0, description="capital"),
+                EntryLine("102", credit=4.0, description="fonds"),
+            ],
+        )
+        conn.commit()
+    with connect(DB) as conn:
+        rows = conn.execute(
+            "SELECT account, description FROM entry_lines WHERE entry_id=? ORDER BY id",
+            (eid,),
+        ).fetchall()
+    assert [tuple(r) for r in rows] == [
+        ("512", "banque bis"), ("101", "capital"), ("102", "fonds")
+    ]
+
+
 def test_init_db_migrates_old_schema():
     global DB
     DB = f"file:mem{uuid.uuid4().hex}?mode=memory&cache=shared"
@@ -0,0 +1,153 @@
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from MOTEUR.compta.accounting.db import close_fiscal_year, create_entry, entry_balanced
+from MOTEUR.compta.achats.db import init_db
+from MOTEUR.compta.achats.importer import import_purchases, read_purchase_rows
+from MOTEUR.compta.achats.signals import signals
+from MOTEUR.compta.db import connect
+from MOTEUR.compta.models import EntryLine
+
+HEADER = "date;piece;fournisseur;libelle;ttc;tva;compte"
+
+
+def _write(path: Path, *rows: str) -> Path:
+    path.write_text("\n".join((HEADER,) + rows) + "\n", encoding="utf-8")
+    return path
+
+
+def _count(db: Path, table: str) -> int:
+    with connect(db) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.fixture
+def db(tmp_path: Path) -> Path:
+    path = tmp_path / "import.db"
+    init_db(path)
+    return path
+
+
+def test_dry_run_writes_nothing(db: Path, tmp_path: Path) -> None:
+    src = _write(
+        tmp_path / "achats.csv",
+        "2024-03-01;F1;Acme;Papier;120,00;20;6064",
+        "2024-03-02;F2;Globex;Encre;60;20;6064",
+    )
+    report = import_purchases(db, src, dry_run=True)
+    assert report.ok and report.valid == 2 and report.imported == 0
+    assert report.new_suppliers == 2 and report.new_accounts == 1
+    assert _count(db, "purchases") == 0
+    assert _count(db, "suppliers") == 0
+    assert _count(db, "entries") == 0
+
+
+def test_import_creates_suppliers_and_entries(db: Path, tmp_path: Path) -> None:
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers(name) VALUES ('Acme')")
+        conn.commit()
+    src = _write(
+        tmp_path / "achats.csv",
+        "01/03/2024;F1;ACME;Papier;1 200,00;20;6064",
+        "2024-03-02;AUTO;Globex;Encre;55;10;6064",
+        "2024-03-03;F3;Globex;Port;10;0;6241",
+    )
+    report = import_purchases(db, src, chunk_size=2)
+    assert report.ok and report.imported == 3
+    assert report.new_suppliers == 1 and report.new_accounts == 2
+    with connect(db) as conn:
+        suppliers = [r[0] for r in conn.execute("SELECT name FROM suppliers ORDER BY id")]
+        purchases = conn.execute(
+            "SELECT p.date, p.piece, s.name, p.ttc_amount, p.due_date FROM purchases p "
+            "JOIN suppliers s ON s.id = p.supplier_id ORDER BY p.id"
+        ).fetchall()
+        entries = conn.execute(
+            "SELECT id, journal, ref FROM entries ORDER BY id"
+        ).fetchall()
+    assert suppliers == ["Acme", "Globex"]
+    assert purchases[0][:4] == ("2024-03-01", "F1", "Acme", 120000)
+    assert purchases[0][4] == "2024-03-31"
+    assert purchases[1][1].startswith("AC")
+    assert [e[1] for e in entries] == ["ACH"] * 3
+    assert [e[2] for e in entries] == [p[1] for p in purchases]
+    assert all(entry_balanced(db, e[0]) for e in entries)
+
+
+def test_invalid_rows_are_reported(db: Path, tmp_path: Path) -> None:
+    create_entry(
+        db, "OD", "2023-06-01", "X", "Ouverture",
+        [EntryLine("512", debit=1), EntryLine("101", credit=1)],
+    )
+    close_fiscal_year(db, 2023)
+    src = _write(
+        tmp_path / "achats.csv",
+        "2024-03-01;F1;Acme;Papier;120;20;6064",
+        "2024-03-01;F1;acme;Doublon;120;20;6064",
+        "2024-03-01;F2;Acme;Taux;120;19;6064",
+        "2024-03-01;F3;;Sans fournisseur;120;20;6064",
+        "2023-12-31;F4;Acme;Clos;120;20;6064",
+        "2024-13-01;F5;Acme;Date;120;20;6064",
+    )
+    report = import_purchases(db, src)
+    assert report.imported == 1
+    assert [i.line for i in report.issues] == [3, 4, 5, 6, 7]
+    messages = [i.message for i in report.issues]
+    assert "already exists" in messages[0]
+    assert "VAT rate 19" in messages[1]
+    assert "fournisseur" in messages[2]
+    assert "closed" in messages[3]
+    assert "invalid date" in messages[4]
+    assert _count(db, "purchases") == 1
+
+
+def test_import_events_are_coalesced(db: Path, tmp_path: Path) -> None:
+    src = _write(
+        tmp_path / "achats.csv",
+        *(f"2024-03-{i % 28 + 1:02d};F{i};S{i % 3};Achat;12;20;6064" for i in range(10)),
+    )
+    entry_called, supplier_called = MagicMock(), MagicMock()
+    signals.entry_changed.connect(entry_called)
+    signals.supplier_changed.connect(supplier_called)
+    try:
+        report = import_purchases(db, src, chunk_size=3)
+    finally:
+        signals.entry_changed.disconnect(entry_called)
+        signals.supplier_changed.disconnect(supplier_called)
+    assert report.imported == 10
+    assert entry_called.call_count == 1
+    assert supplier_called.call_count == 1
+    changes = supplier_called.call_args.args[0]
+    assert len(changes.suppliers) == 3 and len(changes.purchases) == 10
+
+
+def test_headers_are_normalised(tmp_path: Path) -> None:
+    src = tmp_path / "achats.csv"
+    src.write_text(
+        "\ufeffDate,Pièce,Fournisseur,Libellé,Montant TTC,Taux TVA,Compte\n"
+        "2024-01-01,F1,Acme,Papier,\"1,5\",20,6064\n",
+        encoding="utf-8",
+    )
+    [(line, row)] = list(read_purchase_rows(src))
+    assert line == 2
+    assert row["ttc"] == "1,5" and row["tva"] == "20" and row["piece"] == "F1"
+
+
+def test_paid_status_is_rejected(db: Path, tmp_path: Path) -> None:
+    src = tmp_path / "achats.csv"
+    src.write_text(
+        HEADER + ";statut\n"
+        "2024-03-01;F1;Acme;Papier;120;20;6064;PAYE\n"
+        "2024-03-01;F2;Acme;Encre;60;20;6064;a_payer\n",
+        encoding="utf-8",
+    )
+    report = import_purchases(db, src)
+    assert report.imported == 1
+    assert [i.line for i in report.issues] == [2]
+    assert "PAYE" in report.issues[0].message
+    with connect(db) as conn:
+        rows = conn.execute(
+            "SELECT piece, paid_amount, payment_status FROM purchases"
+        ).fetchall()
+    assert [tuple(r) for r in rows] == [("F2", 0, "A_PAYER")]
@@ -0,0 +1,235 @@
+"""EXPLAIN QUERY PLAN checks for the hot SQL of the accounting modules.
+
+Every statement below must reach its rows through an index.  A plan step
+``SCAN <table>`` fails the test unless the table is listed as allowed, which
+is only the case for statements returning a whole table (listings).
+"""
+
+import re
+
+import pytest
+
+from migrations import apply_migrations
+from MOTEUR.compta.accounting import db as accounting
+from MOTEUR.compta.achats import db as achats
+from MOTEUR.compta.db import connection
+from MOTEUR.compta.models import Entry, EntryLine, Purchase, PurchaseCursor, PurchaseFilter
+from MOTEUR.compta.reports import statements
+from MOTEUR.compta.revision import revision_services as revision
+from MOTEUR.compta.suppliers import supplier_services as suppliers
+
+QMARKS3 = "?,?,?"
+IDS = '["1", "2"]'
+DATE = "2024-06-30"
+CLOSING = ("2024-01", "2024-12", "4", "5")
+
+# (name, sql, params, tables allowed to be scanned)
+HOT_QUERIES = [
+    ("fetch_lines", accounting.SQL_FETCH_LINES, (1,), ()),
+    ("entry_line_ids", accounting.SQL_ENTRY_LINE_IDS, (1,), ()),
+    ("reopen_letter", accounting.SQL_REOPEN_LETTER, ("401", 1), ()),
+    ("unbalanced_range", accounting.SQL_UNBALANCED_RANGE, (1, 9), ()),
+    ("range_accounts", accounting.SQL_RANGE_ACCOUNTS, (1, 9), ()),
+    ("closing_balances", accounting.SQL_CLOSING_BALANCES, CLOSING, ()),
+    ("closing_result", accounting.SQL_CLOSING_RESULT, CLOSING, ()),
+    ("unclassed_balances", accounting.SQL_UNCLASSED_BALANCES, CLOSING[:2], ()),
+    ("fec_lines", accounting.SQL_FEC_LINES, ("2024-01-01", DATE), ()),
+    (
+        "letter_codes",
+        accounting.SQL_LETTER_CODES.format(qmarks=QMARKS3),
+        accounting.THIRD_PARTY_ACCOUNTS,
+        (),
+    ),
+    (
+        "open_lines",
+        accounting.SQL_OPEN_LINES.format(qmarks=QMARKS3),
+        accounting.THIRD_PARTY_ACCOUNTS,
+        (),
+    ),
+    (
+        "account_tree",
+        accounting.SQL_ACCOUNT_TREE.format(where=""),
+        (accounting.ROLLUP_LEVELS,),
+        ("c",),
+    ),
+    (
+        "account_tree_subset",
+        accounting.SQL_ACCOUNT_TREE.format(where=accounting.SQL_TREE_SUBSET),
+        (IDS, accounting.ROLLUP_LEVELS),
+        (),
+    ),
+    ("account_rollup", accounting.SQL_ACCOUNT_ROLLUP, ("6",), ()),
+    ("purchase_entry", achats.SQL_PURCHASE_ENTRY, (1,), ()),
+    ("due_purchases", achats.SQL_DUE_PURCHASES.format(where=""), (DATE,), ()),
+    (
+        "due_purchases_by_supplier",
+        achats.SQL_DUE_PURCHASES.format(where=achats.SQL_WHERE_SUPPLIERS),
+        (DATE, IDS),
+        (),
+    ),
+    ("relink_lines", achats.SQL_RELINK_LINES, (2, 1), ()),
+    ("vat_summary", achats.SQL_VAT_SUMMARY, ("2024-01-01", DATE), ()),
+    (
+        "purchases_by_supplier",
+        *achats._purchase_query(PurchaseFilter(supplier_id=1)),
+        (),
+    ),
+    (
+        "purchases_by_status",
+        *achats._purchase_query(PurchaseFilter(status="A_PAYER")),
+        (),
+    ),
+    (
+        "purchases_by_period",
+        *achats._purchase_query(PurchaseFilter(start="2024-01-01", end=DATE)),
+        (),
+    ),
+    (
+        "purchases_page",
+        *achats._purchase_query(
+            PurchaseFilter(), achats.LIST_COLUMNS, PurchaseCursor(DATE, 5), 501
+        ),
+        (),
+    ),
+    (
+        "purchases_page_by_supplier",
+        *achats._purchase_query(
+            PurchaseFilter(supplier_id=1), None, PurchaseCursor(DATE, 5), 501
+        ),
+        (),
+    ),
+    (
+        "accounts_with_balance",
+        revision.SQL_ACCOUNTS_WITH_BALANCE.format(where=""),
+        (),
+        ("a",),
+    ),
+    (
+        "accounts_with_balance_subset",
+        revision.SQL_ACCOUNTS_WITH_BALANCE.format(where=revision.SQL_WHERE_CODES),
+        (IDS,),
+        (),
+    ),
+    (
+        "account_transactions",
+        revision.SQL_ACCOUNT_TRANSACTIONS,
+        ("401", DATE, "", -1, 0),
+        (),
+    ),
+    (
+        "ledger_page",
+        revision.SQL_LEDGER_PAGE,
+        ("512", DATE, 10, 20, "9999-12-31", 201),
+        (),
+    ),
+    (
+        "ledger_running_page",
+        revision.SQL_RUNNING_PAGE.format(page=revision.SQL_LEDGER_PAGE),
+        (0, "512", DATE, 10, 20, "9999-12-31", 201),
+        (),
+    ),
+    (
+        "ledger_page_by_date",
+        revision.SQL_LEDGER_PAGE_BY_DATE,
+        ("512", DATE, 10, 20, "9999-12-31", 201),
+        (),
+    ),
+    ("ledger_density", revision.SQL_LEDGER_DENSITY, ("512",), ()),
+    (
+        "ledger_opening",
+        revision.SQL_LEDGER_OPENING,
+        ("512", "2024-06", "512", "2024-06-01", "2024-06-15"),
+        (),
+    ),
+    (
+        "trial_balance",
+        revision.SQL_TRIAL_BALANCE,
+        revision._trial_ranges("2024-01-15", "2024-06-20"),
+        ("t",),
+    ),
+    (
+        "supplier_balances",
+        suppliers.SQL_SUPPLIER_BALANCES.format(where=""),
+        (),
+        ("b",),
+    ),
+    (
+        "supplier_balances_subset",
+        suppliers.SQL_SUPPLIER_BALANCES.format(where=suppliers.SQL_WHERE_IDS),
+        (IDS,),
+        ("b",),
+    ),
+    (
+        "supplier_transactions",
+        suppliers.SQL_SUPPLIER_TRANSACTIONS,
+        (1, DATE, "", -1, 0),
+        (),
+    ),
+    (
+        "aged_payables",
+        suppliers.SQL_AGED_PAYABLES,
+        suppliers._aging_params(DATE),
+        ("o",),
+    ),
+    (
+        "statement_totals",
+        statements.SQL_STATEMENT_TOTALS,
+        statements._statement_params(2024, ()),
+        (),
+    ),
+]
+
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+def full_scans(conn, sql, params):
+    """Return the tables fully scanned by *sql*."""
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    scans = []
+    for row in plan:
+        detail = row[3]
+        match = _SCAN.match(detail)
+        if match and "VIRTUAL TABLE" not in detail and "CONSTANT ROW" not in detail:
+            scans.append(match.group(1))
+    return scans
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    db = tmp_path_factory.mktemp("plans") / "plans.db"
+    apply_migrations(db)
+    sid = achats.add_supplier(db, "ACME")
+    for i in range(20):
+        achats.add_purchase(
+            db,
+            Purchase(None, f"2024-{i % 12 + 1:02d}-10", f"F{i}", sid, "x",
+                     120.0, 20, "601", "2024-12-31", "A_PAYER"),
+        )
+    accounting.create_entries_bulk(
+        db,
+        (
+            Entry("OD", "2024-03-01", f"OD{i}", None,
+                  [EntryLine("512", debit=1), EntryLine("401", credit=1)])
+            for i in range(50)
+        ),
+    )
+    yield db
+
+
+@pytest.mark.parametrize(
+    "name, sql, params, allowed", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES]
+)
+def test_hot_query_uses_indexes(seeded, name, sql, params, allowed):
+    with connection(seeded) as conn:
+        scans = [t for t in full_scans(conn, sql, params) if t not in allowed]
+    assert scans == [], f"{name} scans {scans}"
+
+
+def test_legacy_indexes_replaced(seeded):
+    with connection(seeded) as conn:
+        names = {
+            r[0]
+            for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")
+        }
+    assert {"idx_entries_ref_journal", "idx_purchases_supplier_date"} <= names
+    assert not names & {"idx_entries_ref", "idx_el_account", "idx_purchases_supplier"}
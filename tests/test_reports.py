@@ -0,0 +1,116 @@
+import csv
+from pathlib import Path
+
+from MOTEUR.compta.accounting.db import close_fiscal_year, create_entry, init_db
+from MOTEUR.compta.models import EntryLine
+from MOTEUR.compta.reports import (
+    export_statements,
+    get_balance_sheet,
+    get_financial_statements,
+    get_income_statement,
+)
+
+
+def _seed(db: Path) -> None:
+    init_db(db)
+    create_entry(db, "OD", "2023-01-05", "C1", "Capital", [
+        EntryLine("512", debit=1000.0), EntryLine("101", credit=1000.0),
+    ])
+    create_entry(db, "ACH", "2023-03-05", "F1", "Achat", [
+        EntryLine("607", debit=200.0), EntryLine("44566", debit=40.0),
+        EntryLine("401", credit=240.0),
+    ])
+    create_entry(db, "VT", "2023-04-05", "V1", "Vente", [
+        EntryLine("411", debit=600.0), EntryLine("707", credit=500.0),
+        EntryLine("44571", credit=100.0),
+    ])
+    create_entry(db, "VT", "2024-04-05", "V2", "Prestation", [
+        EntryLine("512", debit=300.0), EntryLine("706", credit=300.0),
+    ])
+    create_entry(db, "BQ", "2024-05-05", "B1", "Découvert", [
+        EntryLine("401", debit=240.0), EntryLine("512", credit=1600.0),
+        EntryLine("6061", debit=1360.0),
+    ])
+
+
+def _rows(statement):
+    return {r.label: (r.current, r.previous) for r in statement.rows}
+
+
+def test_income_statement_compares_with_previous_year(tmp_path: Path) -> None:
+    db = tmp_path / "rep.db"
+    _seed(db)
+    income = get_income_statement(db, 2024)
+    rows = _rows(income)
+    assert rows["Achats de marchandises"] == (0.0, 200.0)
+    assert rows["Achats et charges externes"] == (1360.0, 0.0)
+    assert rows["Ventes de marchandises"] == (0.0, 500.0)
+    assert rows["Production vendue"] == (300.0, 0.0)
+    assert income.result() == (-1060.0, 300.0)
+
+
+def test_balance_sheet_balances_and_splits_by_side(tmp_path: Path) -> None:
+    db = tmp_path / "rep.db"
+    _seed(db)
+    sheet = get_balance_sheet(db, 2024)
+    rows = _rows(sheet)
+    assert sheet.total("Actif") == sheet.total("Passif") == (640.0, 1640.0)
+    assert rows["Disponibilités"] == (0.0, 1000.0)
+    assert rows["Concours bancaires"] == (300.0, 0.0)
+    assert rows["Dettes fournisseurs"] == (0.0, 240.0)
+    assert rows["Résultat de l'exercice"] == (-760.0, 300.0)
+
+
+def test_statements_unchanged_by_closing(tmp_path: Path) -> None:
+    db = tmp_path / "rep.db"
+    _seed(db)
+    before = get_financial_statements(db, 2024)
+    close_fiscal_year(db, 2023)
+    after = get_financial_statements(db, 2024)
+    assert [_rows(s) for s in after] == [_rows(s) for s in before]
+
+
+def test_export_statements_csv(tmp_path: Path) -> None:
+    db = tmp_path / "rep.db"
+    _seed(db)
+    dest = tmp_path / "etats.csv"
+    count = export_statements(db, 2024, dest)
+    with open(dest, newline="", encoding="utf-8") as fh:
+        rows = list(csv.reader(fh, delimiter=";"))
+    assert rows[0] == ["Etat", "Rubrique", "Poste", "N", "N-1"]
+    assert count == len(rows) - 1 - 4  # header and one total per section
+    assert ["bilan", "Actif", "Total actif", "640.00", "1640.00"] in rows
+    assert ["resultat", "Produits", "Production vendue", "300.00", "0.00"] in rows
+
+
+def test_statement_widget_shows_totals(tmp_path: Path, monkeypatch) -> None:
+    import os
+
+    from PySide6.QtWidgets import QApplication
+
+    from MOTEUR.compta.achats.signals import signals
+    from MOTEUR.compta.reports import statement_widget
+
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    app = QApplication.instance() or QApplication([])
+    db = tmp_path / "rep.db"
+    _seed(db)
+    monkeypatch.setattr(statement_widget, "DB_PATH", db)
+    widget = statement_widget.StatementWidget("resultat")
+    try:
+        widget.year_spin.setValue(2024)
+        table = widget.table
+        last = table.rowCount() - 1
+        assert table.horizontalHeaderItem(1).text() == "2024"
+        assert [table.item(last, c).text() for c in range(3)] == [
+            "Résultat", "-1060.00", "300.00",
+        ]
+        create_entry(db, "VT", "2024-06-01", "V3", "", [
+            EntryLine("512", debit=60.0), EntryLine("706", credit=60.0),
+        ])
+        assert widget._stale  # hidden widget recomputes when shown
+        widget.show()
+        assert table.item(table.rowCount() - 1, 1).text() == "-1000.00"
+    finally:
+        signals.entry_changed.disconnect(widget.on_entry_changed)
+        widget.close()
@@ -1,9 +1,27 @@
 from pathlib import Path
 
-from MOTEUR.compta.achats.db import init_db, add_purchase
-from MOTEUR.compta.models import Purchase
+import pytest
+
+from MOTEUR.compta.accounting.db import (
+    check_account_balances,
+    create_entry,
+    rebuild_account_balances,
+)
+from MOTEUR.compta.achats.db import (
+    init_db,
+    add_purchase,
+    delete_purchase,
+    update_purchase,
+)
+from MOTEUR.compta.models import EntryLine, Purchase
 from MOTEUR.compta.db import connect
-from MOTEUR.compta.revision import get_accounts_with_balance, get_account_transactions
+from MOTEUR.compta.revision import (
+    get_accounts_with_balance,
+    get_account_transactions,
+    get_trial_balance,
+    get_ledger_page,
+    iter_ledger,
+)
 
 
 def test_balance_view_updated_on_new_entry(tmp_path: Path) -> None:
@@ -12,7 +30,8 @@ def test_balance_view_updated_on_new_entry(tmp_path: Path) -> None:
     with connect(db) as conn:
         conn.execute("INSERT INTO suppliers (name) VALUES ('Test')")
         conn.commit()
-    pur = Purchase(None, "2025-01-01", "INV1", 1, "Test", 100.0, 0, "606300", "2025-02-01", "A_PAYER")
+    pur = Purchase(None, "2025-01-01", "INV1", 1, "Test", 100.0, 0, "606300", "2025-02-01",
+                   "A_PAYER")
     add_purchase(db, pur)
     balances = {code: bal for code, _, bal in get_accounts_with_balance(db)}
     assert balances["606300"] > 0
@@ -41,3 +60,222 @@ def test_account_without_entries_has_zero_balance(tmp_path: Path) -> None:
 
     balances = {code: bal for code, _, bal in get_accounts_with_balance(db)}
     assert balances["1000"] == 0.0
+
+
+def test_materialized_balances_follow_edits(tmp_path: Path) -> None:
+    db = tmp_path / "rev_mat.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('Test')")
+        conn.commit()
+    pur = Purchase(None, "2025-01-01", "INV1", 1, "Un", 100.0, 0, "606300", "2025-02-01", "A_PAYER")
+    pid = add_purchase(db, pur)
+    pur.ttc_amount = 80.0
+    pur.account_code = "606100"
+    update_purchase(db, pur)
+    add_purchase(db, Purchase(None, "2025-01-02", "INV2", 1, "Deux", 50.0, 0, "606300",
+                              "2025-03-01", "A_PAYER"))
+    delete_purchase(db, pid)
+
+    balances = {code: bal for code, _, bal in get_accounts_with_balance(db)}
+    assert balances["606100"] == 0.0
+    assert balances["606300"] == 50.0
+    assert check_account_balances(db) == []
+
+
+def test_balance_checker_and_rebuild(tmp_path: Path) -> None:
+    db = tmp_path / "rev_check.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.execute("INSERT INTO suppliers (name) VALUES ('Test')")
+        conn.commit()
+    add_purchase(db, Purchase(None, "2025-01-01", "INV1", 1, "Un", 100.0, 0, "606300",
+                              "2025-02-01", "A_PAYER"))
+    with connect(db) as conn:
+        conn.execute("UPDATE account_balances SET debit = 0 WHERE account='606300'")
+        conn.commit()
+
+    assert check_account_balances(db) == [("606300", 0.0, 100.0)]
+    rebuild_account_balances(db)
+    assert check_account_balances(db) == []
+
+
+def _post(db: Path, date: str, amount: float) -> int:
+    return create_entry(
+        db, "OD", date, date, "",
+        [EntryLine("601", debit=amount), EntryLine("512", credit=amount)],
+    )
+
+
+def test_trial_balance_for_date_ranges(tmp_path: Path) -> None:
+    db = tmp_path / "rev_tb.db"
+    init_db(db)
+    for date, amount in [
+        ("2025-01-10", 1.0),
+        ("2025-01-31", 2.0),
+        ("2025-02-01", 4.0),
+        ("2025-02-28", 8.0),
+        ("2025-03-15", 16.0),
+    ]:
+        _post(db, date, amount)
+
+    def debit_601(end, start=None):
+        return {t.account: t.debit for t in get_trial_balance(db, end, start)}.get("601", 0.0)
+
+    assert debit_601("2025-12-31") == 31.0
+    assert debit_601("2025-02-28") == 15.0
+    assert debit_601("2025-03-14") == 15.0
+    assert debit_601("2025-02-27", "2025-01-11") == 6.0
+    assert debit_601("2025-03-31", "2025-02-01") == 28.0
+    assert debit_601("2025-01-20", "2025-01-05") == 1.0
+    tb = {t.account: t for t in get_trial_balance(db, "2025-03-31")}
+    assert tb["512"].balance == -31.0
+
+
+def test_trial_balance_follows_date_change_and_delete(tmp_path: Path) -> None:
+    db = tmp_path / "rev_tb2.db"
+    init_db(db)
+    eid = _post(db, "2025-01-10", 5.0)
+    other = _post(db, "2025-01-12", 7.0)
+    with connect(db) as conn:
+        conn.execute("UPDATE entries SET date='2025-03-01' WHERE id=?", (eid,))
+        conn.execute("DELETE FROM entries WHERE id=?", (other,))
+        conn.commit()
+        snapshot = conn.execute(
+            "SELECT period, debit FROM account_period_balances "
+            "WHERE account='601' AND debit <> 0"
+        ).fetchall()
+    assert [tuple(r) for r in snapshot] == [("2025-03", 500)]
+    assert get_trial_balance(db, "2025-02-28") == []
+
+
+def test_revision_tab_refreshes_changed_accounts(tmp_path: Path, monkeypatch, qapp) -> None:
+    from unittest.mock import MagicMock
+
+    from PySide6.QtWidgets import QTreeWidgetItemIterator
+
+    from MOTEUR.compta.achats.signals import signals
+    from MOTEUR.compta.revision import revision_tab
+
+    db = tmp_path / "tab.db"
+    init_db(db)
+    with connect(db) as conn:
+        conn.executemany(
+            "INSERT INTO accounts (code, name) VALUES (?, ?)",
+            [("401", "Fournisseurs"), ("512", "Banque"), ("601", "Achats")],
+        )
+        conn.commit()
+    monkeypatch.setattr(revision_tab, "DB_PATH", db)
+    tab = revision_tab.RevisionTab()
+    try:
+        assert len(tab.tree._items) == 9  # 3 accounts, 2 levels above each
+        tab.refresh = MagicMock()
+        create_entry(db, "OD", "2025-01-01", "R1", "", [
+            EntryLine("601", debit=10.0), EntryLine("401", credit=10.0),
+        ])
+        with connect(db) as conn:
+            conn.execute("INSERT INTO accounts (code, name) VALUES ('6063', 'Fourn.')")
+            conn.commit()
+        create_entry(db, "OD", "2025-01-02", "R2", "", [
+            EntryLine("6063", debit=5.0), EntryLine("512", credit=5.0),
+        ])
+        assert not tab.refresh.called
+        rows = []
+        it = QTreeWidgetItemIterator(tab.tree)
+        while it.value():
+            item = it.value()
+            parent = item.parent().text(0) if item.parent() else None
+            rows.append((item.text(0), parent, item.text(2)))
+            it += 1
+        assert rows == [
+            ("4", None, "-10.00"), ("40", "4", "-10.00"), ("401", "40", "-10.00"),
+            ("5", None, "-5.00"), ("51", "5", "-5.00"), ("512", "51", "-5.00"),
+            ("6", None, "15.00"), ("60", "6", "15.00"), ("601", "60", "10.00"),
+            ("606", "60", "5.00"), ("6063", "606", "5.00"),
+        ]
+    finally:
+        signals.entry_changed.disconnect(tab.on_entry_changed)
+
+
+def _seed_ledger(db: Path, n: int = 25) -> None:
+    init_db(db)
+    for i in range(n):
+        # Dates out of posting order, several entries per day.
+        day = (i * 7) % 28 + 1
+        create_entry(db, "BQ", f"2025-{i % 3 + 1:02d}-{day:02d}", f"B{i}", "", [
+            EntryLine("512", debit=float(i + 1)), EntryLine("401", credit=float(i + 1)),
+        ])
+
+
+@pytest.mark.parametrize("ratio", [0.0, 2.0], ids=["by_date", "by_account"])
+def test_ledger_pages_follow_full_listing(tmp_path: Path, monkeypatch, ratio) -> None:
+    from MOTEUR.compta.revision import revision_services
+
+    monkeypatch.setattr(revision_services, "LEDGER_DENSE_RATIO", ratio)
+    db = tmp_path / "gl.db"
+    _seed_ledger(db)
+    expected = get_account_transactions(db, "512")
+    lines, cursor, pages = [], None, 0
+    while True:
+        page = get_ledger_page(db, "512", cursor, limit=7)
+        assert page.next_cursor is None or page.next_cursor.by_date == (ratio == 0.0)
+        assert page.opening_balance == (lines[-1].balance if lines else 0.0)
+        lines += page.lines
+        pages += 1
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert pages == 4
+    assert lines == expected
+    assert list(iter_ledger(db, "512", page_size=4)) == expected
+
+
+def test_ledger_page_from_date_has_opening_balance(tmp_path: Path) -> None:
+    db = tmp_path / "gl.db"
+    _seed_ledger(db)
+    expected = get_account_transactions(db, "512")
+    before = [t for t in expected if t.date < "2025-02-15"]
+    page = get_ledger_page(db, "512", start="2025-02-15", end="2025-02-28", limit=100)
+    assert page.opening_balance == before[-1].balance
+    assert page.lines == [t for t in expected if "2025-02-15" <= t.date <= "2025-02-28"]
+    assert page.next_cursor is None
+
+
+def test_ledger_table_fetches_pages_on_scroll(tmp_path: Path) -> None:
+    import os
+
+    from PySide6.QtWidgets import QApplication
+
+    from MOTEUR.compta.revision.ledger_table import LedgerTable
+
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    app = QApplication.instance() or QApplication([])
+    db = tmp_path / "gl.db"
+    _seed_ledger(db, 60)
+    table = LedgerTable(page_size=20)
+    table.resize(400, 200)
+    table.show()
+    table.set_account(db, "512")
+    assert table.rowCount() == 20
+    app.processEvents()
+    bar = table.verticalScrollBar()
+    bar.setValue(bar.maximum())
+    assert table.rowCount() == 40
+    table.fetch_more()
+    assert table.rowCount() == 60 and not table.can_fetch_more()
+    assert table.item(59, 6).text() == f"{sum(range(1, 61)):.2f}"
+    table.close()
+
+
+def test_account_transactions_keep_balance_with_filters(tmp_path: Path) -> None:
+    db = tmp_path / "gl.db"
+    _seed_ledger(db)
+    full = get_account_transactions(db, "512")
+    assert [t.balance for t in full[:3]] == [
+        full[0].debit, full[0].debit + full[1].debit,
+        full[0].debit + full[1].debit + full[2].debit,
+    ]
+    assert get_account_transactions(db, "512", offset=10, limit=5) == full[10:15]
+    window = [t for t in full if "2025-02-01" <= t.date <= "2025-02-28"]
+    assert get_account_transactions(db, "512", "2025-02-01", "2025-02-28") == window
+    assert get_account_transactions(db, "512", "2025-02-01", limit=2) == window[:2]
@@ -1,15 +1,15 @@
 from pathlib import Path
-
-import os
 from unittest.mock import MagicMock
 
-from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import Qt
 
 from MOTEUR.compta.achats.db import (
     init_db,
     add_purchase,
+    delete_purchase,
     pay_purchase,
     add_supplier,
+    update_purchase,
 )
 from MOTEUR.compta.achats.signals import signals
 from MOTEUR.compta.achats import widget as achat_widget
@@ -18,6 +18,7 @@ from MOTEUR.compta.db import connect
 from MOTEUR.compta.suppliers import (
     get_suppliers_with_balance,
     get_supplier_transactions,
+    init_view,
 )
 
 
@@ -55,12 +56,51 @@ def test_supplier_transactions_fetch(tmp_path: Path) -> None:
     rows = get_supplier_transactions(db, 1)
     assert [r.ref for r in rows] == ["INV1", "INV1", "INV2"]
     assert [r.balance for r in rows] == [-100.0, -50.0, -250.0]
+    assert get_supplier_transactions(db, 1, offset=1, limit=1) == rows[1:2]
+    assert get_supplier_transactions(db, 1, start="2025-01-10") == rows[1:]
+    assert get_supplier_transactions(db, 1, end="2025-01-15") == rows[:2]
+
+
+def test_init_view_replaces_outdated_definition(tmp_path: Path) -> None:
+    db = tmp_path / "s.db"
+    setup_demo(db)
+    with connect(db) as conn:
+        conn.execute(
+            "CREATE VIEW supplier_balance_v AS SELECT s.id AS supplier_id, "
+            "s.name AS supplier_name, 0 AS balance FROM suppliers s "
+            "JOIN purchases p ON p.supplier_id = s.id"
+        )
+        conn.commit()
+    add_purchase(db, Purchase(None, "2025-01-01", "INV1", 1, "Test", 100.0, 0,
+                              "601", "2025-01-31", "A_PAYER"))
+    init_view(db)
+    with connect(db) as conn:
+        rows = conn.execute("SELECT supplier_id, balance FROM supplier_balance_v").fetchall()
+    assert [tuple(r) for r in rows] == [(1, -10000)]
+
+
+def test_supplier_change_and_deletion_follow_links(tmp_path: Path) -> None:
+    db = tmp_path / "s.db"
+    setup_demo(db)
+    pur = Purchase(None, "2025-01-01", "INV1", 1, "Test", 100.0, 0, "601", "2025-01-31", "A_PAYER")
+    pid = add_purchase(db, pur)
+    pay_purchase(db, pid, "2025-01-10", "VIR", 30.0)
+    add_purchase(db, Purchase(None, "2025-01-02", "INV1", 2, "Homonyme", 10.0, 0, "601",
+                              "2025-01-31", "A_PAYER"))
+
+    pur.supplier_id = 2
+    pur.piece = "INV1B"
+    update_purchase(db, pur)
+    balances = {sid: bal for sid, _, bal in get_suppliers_with_balance(db)}
+    assert balances == {2: -80.0}
+    assert [r.ref for r in get_supplier_transactions(db, 2)] == ["INV1B", "INV1", "INV1"]
 
+    delete_purchase(db, pid)
+    assert get_suppliers_with_balance(db) == [(2, "B", -10.0)]
+    assert get_suppliers_with_balance(db, [1]) == []
 
-def test_auto_supplier_creation(tmp_path: Path) -> None:
-    os.environ["QT_QPA_PLATFORM"] = "offscreen"
-    app = QApplication.instance() or QApplication([])
 
+def test_auto_supplier_creation(tmp_path: Path, qapp) -> None:
     db = tmp_path / "auto.db"
     achat_widget.db_path = db
     w = achat_widget.AchatWidget()
@@ -88,3 +128,118 @@ def test_supplier_signal(tmp_path: Path) -> None:
     signals.supplier_changed.connect(called)
     add_supplier(db, "Test")
     assert called.called
+
+
+def test_supplier_tab_refreshes_changed_rows(tmp_path: Path, monkeypatch, qapp) -> None:
+    from MOTEUR.compta.suppliers import supplier_tab
+
+    db = tmp_path / "tab.db"
+    setup_demo(db)
+    add_purchase(db, Purchase(None, "2025-01-01", "INV1", 2, "B", 50.0, 0, "601", "2025-01-31",
+                              "A_PAYER"))
+    monkeypatch.setattr(supplier_tab, "DB_PATH", db)
+    tab = supplier_tab.SupplierTab()
+    try:
+        assert tab.table.rowCount() == 1
+        tab.refresh = MagicMock()
+        add_purchase(db, Purchase(None, "2025-01-02", "INV2", 1, "A", 100.0, 0, "601",
+                                  "2025-01-31", "A_PAYER"))
+        pid = add_purchase(db, Purchase(None, "2025-01-03", "INV3", 2, "B", 10.0, 0, "601",
+                                        "2025-01-31", "A_PAYER"))
+        assert not tab.refresh.called
+        rows = [
+            (tab.table.item(r, 0).text(), tab.table.item(r, 1).text())
+            for r in range(tab.table.rowCount())
+        ]
+        assert rows == [("A", "-100.00"), ("B", "-60.00")]
+        from MOTEUR.compta.achats.db import delete_purchase
+
+        delete_purchase(db, pid)
+        assert tab.table.item(1, 1).text() == "-50.00"
+    finally:
+        signals.supplier_changed.disconnect(tab.on_supplier_changed)
+
+
+def test_supplier_tab_orders_duplicate_names_by_id(tmp_path: Path, monkeypatch, qapp) -> None:
+    from MOTEUR.compta.suppliers import supplier_tab
+
+    db = tmp_path / "dup.db"
+    setup_demo(db)
+    dup = [add_supplier(db, "Dup") for _ in range(3)]
+    for i, sid in enumerate(reversed(dup)):
+        add_purchase(db, Purchase(None, "2025-01-01", f"D{i}", sid, "Dup",
+                                  10.0 * (i + 1), 0, "601", "2025-01-31", "A_PAYER"))
+    assert [sid for sid, *_ in get_suppliers_with_balance(db)] == dup
+    monkeypatch.setattr(supplier_tab, "DB_PATH", db)
+    tab = supplier_tab.SupplierTab()
+    try:
+        add_purchase(db, Purchase(None, "2025-01-02", "D9", dup[1], "Dup", 5.0, 0,
+                                  "601", "2025-01-31", "A_PAYER"))
+        shown = [
+            (tab.table.item(r, 0).data(Qt.UserRole), tab.table.item(r, 1).text())
+            for r in range(tab.table.rowCount())
+        ]
+        assert shown == [(dup[0], "-30.00"), (dup[1], "-25.00"), (dup[2], "-10.00")]
+    finally:
+        signals.supplier_changed.disconnect(tab.on_supplier_changed)
+
+
+def test_aged_payables_buckets(tmp_path: Path) -> None:
+    from MOTEUR.compta.suppliers import get_aged_payables
+
+    db = tmp_path / "aged.db"
+    setup_demo(db)
+    for piece, sid, ttc, due in (
+        ("F1", 1, 100.0, "2025-04-10"),  # not due
+        ("F2", 1, 50.0, "2025-03-31"),   # 1 day
+        ("F3", 1, 20.0, "2025-03-01"),   # 31 days
+        ("F4", 2, 30.0, "2025-01-30"),   # 61 days
+        ("F5", 2, 40.0, "2024-12-01"),   # 121 days
+        ("F6", 2, 10.0, "2025-04-01"),   # due on as_of
+    ):
+        add_purchase(db, Purchase(None, "2024-11-15", piece, sid, "x", ttc, 0, "601", due,
+                                  "A_PAYER"))
+    pay_purchase(db, 2, "2025-03-15", "VIR", 20.0)
+    pay_purchase(db, 5, "2025-04-15", "VIR", 40.0)
+
+    rows = get_aged_payables(db, "2025-04-01")
+    assert [(r.name, r.buckets, r.total) for r in rows] == [
+        ("A", (100.0, 30.0, 20.0, 0.0, 0.0), 150.0),
+        ("B", (10.0, 0.0, 0.0, 30.0, 40.0), 80.0),
+    ]
+    after = {r.name: r.total for r in get_aged_payables(db, "2025-04-30")}
+    assert after == {"A": 150.0, "B": 40.0}
+    assert get_aged_payables(db, "2024-11-01") == []
+
+
+def test_aged_payables_widget_is_cached(tmp_path: Path, monkeypatch, qapp) -> None:
+    from MOTEUR.compta.suppliers import aged_payables
+
+    db = tmp_path / "aged_w.db"
+    setup_demo(db)
+    add_purchase(db, Purchase(None, "2025-01-01", "INV1", 1, "A", 100.0, 0, "601", "2025-01-31",
+                              "A_PAYER"))
+    monkeypatch.setattr(aged_payables, "DB_PATH", db)
+    calls = MagicMock(wraps=aged_payables.get_aged_payables)
+    monkeypatch.setattr(aged_payables, "get_aged_payables", calls)
+    w = aged_payables.AgedPayablesWidget()
+    try:
+        assert calls.call_count == 0
+        w.show()
+        w.hide()
+        w.show()
+        assert calls.call_count == 1
+        assert w.table.rowCount() == 2
+        assert w.table.item(0, 0).text() == "A"
+        assert w.table.item(1, len(aged_payables.HEADERS) - 1).text() == "100.00"
+
+        w.hide()
+        add_purchase(db, Purchase(None, "2025-01-02", "INV2", 2, "B", 5.0, 0, "601", "2025-01-31",
+                                  "A_PAYER"))
+        assert calls.call_count == 1
+        w.show()
+        assert calls.call_count == 2
+        assert w.table.rowCount() == 3
+    finally:
+        signals.supplier_changed.disconnect(w.on_supplier_changed)
+        w.close()